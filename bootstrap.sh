@@ -1,30 +1,106 @@
 #!/bin/bash
 # Bootstrap Script for EV Market Intelligence
 # Sets up the environment and runs the update
+#
+# Modes (BOOTSTRAP_MODE or first argument):
+#   cold  - clone into a fresh temporary directory and delete it afterwards (default)
+#   warm  - keep a persistent workspace, update it with an incremental fetch and
+#           reuse the derived state kept in it; unpushed commits are rebased onto
+#           upstream, conflicts in regenerated data/*.json files take upstream's
+#           copy, and any other conflict stops the run
 
 set -e
 
 # Configuration
-REPO_URL="https://github.com/robertogennaccari-1/ev-market-intelligence.git"
-WORK_DIR="/tmp/ev-intelligence-$(date +%s)"
-DASHBOARD_REPO_DIR="/home/ubuntu/ev-news-dashboard"
+REPO_URL="${REPO_URL:-https://github.com/robertogennaccari-1/ev-market-intelligence.git}"
+DASHBOARD_REPO_DIR="${DASHBOARD_REPO_DIR:-/home/ubuntu/ev-news-dashboard}"
+BOOTSTRAP_MODE="${1:-${BOOTSTRAP_MODE:-cold}}"
+BOOTSTRAP_MODE="${BOOTSTRAP_MODE#--}"
+
+if [ "$BOOTSTRAP_MODE" = "warm" ]; then
+    WORK_DIR="${WORKSPACE_DIR:-$HOME/.cache/ev-intelligence/workspace}"
+elif [ "$BOOTSTRAP_MODE" = "cold" ]; then
+    WORK_DIR="/tmp/ev-intelligence-$(date +%s)"
+else
+    echo "Unknown bootstrap mode: $BOOTSTRAP_MODE (expected cold or warm)" >&2
+    exit 2
+fi
 
 # Logging
 log() {
     echo "[$(date '+%Y-%m-%d %H:%M:%S')] $1"
 }
 
-log "=== EV Market Intelligence Bootstrap Started ==="
+log "=== EV Market Intelligence Bootstrap Started ($BOOTSTRAP_MODE) ==="
 
-# 1. Clone repository
-log "Step 1/5: Cloning repository..."
-git clone "$REPO_URL" "$WORK_DIR"
-cd "$WORK_DIR"
+# 1. Clone or update repository
+if [ "$BOOTSTRAP_MODE" = "warm" ] && [ -d "$WORK_DIR/.git" ]; then
+    log "Step 1/5: Updating workspace at $WORK_DIR..."
+    cd "$WORK_DIR"
+    git remote set-url origin "$REPO_URL"
+    if ! git fetch --quiet origin; then
+        log "✗ Fetching $REPO_URL failed" >&2
+        exit 1
+    fi
+    if [ -n "$(git status --porcelain)" ]; then
+        log "✗ Workspace $WORK_DIR has uncommitted changes; commit or discard them first" >&2
+        exit 1
+    fi
+    # Local auto-update commits that were never pushed are replayed on top of upstream.
+    # They carry history snapshots and archived news that no later run recreates,
+    # so they are never dropped: conflicts in the regenerated data/*.json latest
+    # files take upstream's copy, which this run rebuilds, and any other conflict
+    # stops the run
+    LOCAL_COMMITS="$(git rev-list --count "@{upstream}..HEAD")"
+    if [ "$LOCAL_COMMITS" -eq 0 ]; then
+        git merge --ff-only --quiet "@{upstream}"
+    elif ! git rebase --quiet "@{upstream}" > /dev/null 2>&1; then
+        while [ -d "$(git rev-parse --git-path rebase-merge)" ] || [ -d "$(git rev-parse --git-path rebase-apply)" ]; do
+            CONFLICTS="$(git diff --name-only --diff-filter=U)"
+            OTHER_CONFLICTS="$(echo "$CONFLICTS" | grep -v '^data/[^/]*\.json$' || true)"
+            if [ -z "$CONFLICTS" ] || [ -n "$OTHER_CONFLICTS" ]; then
+                git rebase --abort
+                log "✗ Local commits in $WORK_DIR conflict with $REPO_URL; resolve them by hand" >&2
+                echo "${OTHER_CONFLICTS:-$CONFLICTS}" >&2
+                git log --oneline "@{upstream}..HEAD" >&2
+                exit 1
+            fi
+            log "⚠ Taking upstream's copy of regenerated files: $(echo $CONFLICTS)"
+            # During a rebase "ours" is the upstream side being replayed onto
+            for path in $CONFLICTS; do
+                if git checkout --ours -- "$path" 2> /dev/null; then
+                    git add -- "$path"
+                else
+                    # Deleted upstream
+                    git rm --quiet -- "$path"
+                fi
+            done
+            if git diff --cached --quiet; then
+                git rebase --skip > /dev/null 2>&1 || true
+            else
+                GIT_EDITOR=true git rebase --continue > /dev/null 2>&1 || true
+            fi
+        done
+    fi
+    log "✓ Workspace at $(git rev-parse --short HEAD)"
+else
+    log "Step 1/5: Cloning repository..."
+    mkdir -p "$(dirname "$WORK_DIR")"
+    git clone "$REPO_URL" "$WORK_DIR"
+    cd "$WORK_DIR"
+fi
 
 # 2. Check Python dependencies
 log "Step 2/5: Checking Python environment..."
 python3 --version
 
+# Derived state (history index, registration cache, run checkpoint) stays in the
+# workspace and is revalidated by its own size/mtime and input-hash checks
+if [ "$BOOTSTRAP_MODE" = "warm" ]; then
+    # Run the update inside the workspace
+    export PROJECT_DIR="$WORK_DIR"
+fi
+
 # 3. Run update script
 log "Step 3/5: Running update script..."
 bash ev_intelligence_update.sh
@@ -33,7 +109,9 @@ bash ev_intelligence_update.sh
 log "Step 4/5: Checking dashboard..."
 if [ -d "$DASHBOARD_REPO_DIR" ]; then
     log "Dashboard found, updating data files..."
-    cp data/*.json "$DASHBOARD_REPO_DIR/client/public/"
+    # Same publish as the pipeline: the current generation is swapped in as a whole
+    python3 -c 'import sys; from scripts.pipeline_scheduler import publish_dashboard; publish_dashboard("data", sys.argv[1])' \
+        "$DASHBOARD_REPO_DIR"
     log "✓ Dashboard data updated"
 else
     log "⚠ Dashboard not found at $DASHBOARD_REPO_DIR"
@@ -41,8 +119,12 @@ fi
 
 # 5. Cleanup
 log "Step 5/5: Cleanup..."
-cd /tmp
-rm -rf "$WORK_DIR"
+if [ "$BOOTSTRAP_MODE" = "warm" ]; then
+    log "Keeping workspace at $WORK_DIR"
+else
+    cd /tmp
+    rm -rf "$WORK_DIR"
+fi
 
 log "=== EV Market Intelligence Bootstrap Completed ==="
 
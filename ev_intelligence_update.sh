@@ -5,8 +5,8 @@
 set -e
 
 # Configuration
-PROJECT_DIR="/home/ubuntu/ev-market-intelligence"
-DASHBOARD_DIR="/home/ubuntu/ev-news-dashboard"
+PROJECT_DIR="${PROJECT_DIR:-/home/ubuntu/ev-market-intelligence}"
+DASHBOARD_DIR="${DASHBOARD_DIR:-/home/ubuntu/ev-news-dashboard}"
 LOG_FILE="$PROJECT_DIR/logs/ev_update.log"
 
 # Create logs directory if it doesn't exist
@@ -22,44 +22,21 @@ log "=== EV Intelligence Update Started ==="
 # Change to project directory
 cd "$PROJECT_DIR"
 
-# 1. Run news collector
-log "Step 1/6: Collecting EV news..."
-if python3 scripts/ev_news_collector.py >> "$LOG_FILE" 2>&1; then
-    log "✓ News collection completed"
+# 1. Run pipeline stages
+# News collection and rankings generation run in parallel; delta, dashboard
+# update and summary start as soon as the files they read are written.
+# A failed stage only skips the stages that depend on its outputs.
+log "Step 1/2: Running pipeline stages..."
+PIPELINE_FAILED=0
+if python3 scripts/pipeline_scheduler.py --dashboard-dir "$DASHBOARD_DIR" >> "$LOG_FILE" 2>&1; then
+    log "✓ Pipeline stages completed"
 else
-    log "✗ News collection failed"
-    exit 1
+    PIPELINE_FAILED=1
+    log "✗ One or more pipeline stages failed (see $LOG_FILE)"
 fi
 
-# 2. Generate rankings
-log "Step 2/6: Generating rankings..."
-if python3 scripts/create_corrected_rankings.py >> "$LOG_FILE" 2>&1; then
-    log "✓ Rankings generation completed"
-else
-    log "✗ Rankings generation failed"
-    exit 1
-fi
-
-# 3. Calculate delta
-log "Step 3/6: Calculating rankings delta..."
-if python3 scripts/calculate_rankings_delta.py >> "$LOG_FILE" 2>&1; then
-    log "✓ Delta calculation completed"
-else
-    log "✗ Delta calculation failed"
-    exit 1
-fi
-
-# 4. Update dashboard data
-log "Step 4/6: Updating dashboard data..."
-if [ -d "$DASHBOARD_DIR" ]; then
-    cp data/*.json "$DASHBOARD_DIR/client/public/"
-    log "✓ Dashboard data updated"
-else
-    log "⚠ Dashboard directory not found, skipping dashboard update"
-fi
-
-# 5. Commit to GitHub (optional, requires credentials)
-log "Step 5/6: Committing to GitHub..."
+# 2. Commit to GitHub (optional, requires credentials)
+log "Step 2/2: Committing to GitHub..."
 git add -A
 if git diff --staged --quiet; then
     log "⚠ No changes to commit"
@@ -79,12 +56,11 @@ else
     fi
 fi
 
-# 6. Generate summary
-log "Step 6/6: Generating summary..."
-if [ -f "data/ev_rankings_delta.json" ]; then
-    TOTAL_ALERTS=$(python3 -c "import json; data=json.load(open('data/ev_rankings_delta.json')); print(data.get('summary', {}).get('total_alerts', 0))")
-    HIGH_SEVERITY=$(python3 -c "import json; data=json.load(open('data/ev_rankings_delta.json')); print(data.get('summary', {}).get('high_severity_alerts', 0))")
-    log "Summary: $TOTAL_ALERTS total alerts, $HIGH_SEVERITY high severity"
+# Commit whatever stages completed, but report the failure to the caller
+if [ "$PIPELINE_FAILED" -ne 0 ]; then
+    log "=== EV Intelligence Update Completed With Failures ==="
+    log ""
+    exit 1
 fi
 
 log "=== EV Intelligence Update Completed Successfully ==="
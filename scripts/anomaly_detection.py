@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+EV Anomaly Detector - Flags statistically unusual sales moves across history
+Builds a robust baseline (median and MAD of period-over-period changes) for
+every model x region series at once and scores the latest change against it
+"""
+import os
+import sys
+from typing import Dict, List, Any, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.history_store import get_history_store
+from scripts.sales_forecast import snapshots_by_quarter
+
+
+# Scales MAD to the standard deviation of a normal distribution
+MAD_SCALE = 1.4826
+# Scales mean absolute deviation likewise, used when MAD is zero
+MEAN_AD_SCALE = 1.2533
+
+
+def _median(values: List[float]) -> float:
+    """Median of a non-empty list"""
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def robust_scores(changes: List[List[Optional[float]]], min_history: int) -> List[Optional[Tuple[float, float, float]]]:
+    """
+    Score the last change of every row of a series x change matrix
+    Returns (score, baseline median, baseline spread) per row, or None when a row
+    has too little history or no spread to judge against
+    """
+    results: List[Optional[Tuple[float, float, float]]] = []
+    
+    for row in changes:
+        latest = row[-1] if row else None
+        baseline = [value for value in row[:-1] if value is not None]
+        if latest is None or len(baseline) < min_history:
+            results.append(None)
+            continue
+        
+        center = _median(baseline)
+        deviations = [abs(value - center) for value in baseline]
+        spread = MAD_SCALE * _median(deviations)
+        if spread == 0:
+            spread = MEAN_AD_SCALE * sum(deviations) / len(deviations)
+        if spread == 0:
+            results.append(None)
+            continue
+        
+        results.append(((latest - center) / spread, center, spread))
+    
+    return results
+
+
+class AnomalyDetector:
+    """Detects unusual sales changes per model and region from ranking history"""
+    
+    # Robust z-score above which a change is flagged
+    ANOMALY_SCORE = 3.5
+    HIGH_SEVERITY_SCORE = 7.0
+    # Baseline changes required before a series is scored
+    MIN_HISTORY = 4
+    
+    VEHICLE_TYPES = {"BEV": "bev_rankings", "PHEV": "phev_rankings"}
+    
+    def __init__(self, history_dir: str = None):
+        """Initialize detector with the history directory"""
+        if history_dir is None:
+            history_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "history"
+            )
+        self.history_dir = history_dir
+    
+    def build_changes(self) -> Tuple[List[Tuple[str, str, str, str]], List[List[Optional[float]]], List[Optional[float]]]:
+        """
+        Build the series x change matrix from history
+        Series are (vehicle_type, manufacturer, model, region) with region "global"
+        for total sales; changes are quarter over quarter, each quarter represented
+        by its latest snapshot, so irregular snapshot spacing does not skew the baseline
+        """
+        series_index: Dict[Tuple[str, str, str, str], int] = {}
+        columns: List[Dict[int, float]] = []
+        
+        for _, snapshot in snapshots_by_quarter(get_history_store(self.history_dir).load_all()):
+            # A quarter without a snapshot leaves every series without a change on either side
+            snapshot = snapshot or {}
+            column = {}
+            for vehicle_type, key in self.VEHICLE_TYPES.items():
+                for row in snapshot.get(key, []):
+                    manufacturer, model = row["manufacturer"], row["model"]
+                    series = (vehicle_type, manufacturer, model, "global")
+                    column[series_index.setdefault(series, len(series_index))] = row["sales_units"]
+                    for region, units in row.get("regions", {}).items():
+                        series = (vehicle_type, manufacturer, model, region)
+                        column[series_index.setdefault(series, len(series_index))] = units
+            columns.append(column)
+        
+        changes: List[List[Optional[float]]] = [[] for _ in series_index]
+        latest: List[Optional[float]] = [None] * len(series_index)
+        
+        # Difference each pair of adjacent columns; a series missing from either side has no change
+        for previous, current in zip(columns, columns[1:]):
+            for i, row in enumerate(changes):
+                before, after = previous.get(i), current.get(i)
+                row.append(after - before if before is not None and after is not None else None)
+        if columns:
+            for i, value in columns[-1].items():
+                latest[i] = value
+        
+        return list(series_index), changes, latest
+    
+    def detect(self) -> List[Dict[str, Any]]:
+        """Return anomalies in the latest change, most unusual first"""
+        series, changes, latest = self.build_changes()
+        anomalies = []
+        
+        for (vehicle_type, manufacturer, model, region), row, current, result in zip(
+                series, changes, latest, robust_scores(changes, self.MIN_HISTORY)):
+            if result is None:
+                continue
+            score, center, spread = result
+            if abs(score) < self.ANOMALY_SCORE:
+                continue
+            
+            anomalies.append({
+                "vehicle_type": vehicle_type,
+                "manufacturer": manufacturer,
+                "model": model,
+                "region": region,
+                "current_sales": current,
+                "change": row[-1],
+                "baseline_change": round(center, 1),
+                "baseline_spread": round(spread, 1),
+                "robust_score": round(score, 2)
+            })
+        
+        anomalies.sort(key=lambda a: abs(a["robust_score"]), reverse=True)
+        return anomalies
+    
+    def generate_alerts(self, anomalies: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Turn anomalies into delta alerts"""
+        alerts = []
+        
+        for anomaly in anomalies:
+            region = "" if anomaly["region"] == "global" else f" in {anomaly['region']}"
+            direction = "rose" if anomaly["change"] > 0 else "fell"
+            alerts.append({
+                "type": "anomaly",
+                "severity": "high" if abs(anomaly["robust_score"]) >= self.HIGH_SEVERITY_SCORE else "medium",
+                "message": f"Unusual move: {anomaly['manufacturer']} {anomaly['model']} ({anomaly['vehicle_type']}) sales{region} {direction} by {abs(anomaly['change']):,} units, {abs(anomaly['robust_score']):.1f} deviations from its typical change of {anomaly['baseline_change']:+,.0f}"
+            })
+        
+        return alerts
+    
+    def run(self) -> List[Dict[str, Any]]:
+        """Main execution method"""
+        print("=" * 60)
+        print("EV Anomaly Detector - Starting")
+        print("=" * 60)
+        
+        anomalies = self.detect()
+        for alert in self.generate_alerts(anomalies):
+            print(f"  [{alert['severity'].upper()}] {alert['message']}")
+        
+        print("=" * 60)
+        print("EV Anomaly Detector - Complete")
+        print(f"Anomalies: {len(anomalies)}")
+        print("=" * 60)
+        
+        return anomalies
+
+
+if __name__ == "__main__":
+    detector = AnomalyDetector()
+    detector.run()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+EV Data API Server - Serves rankings, deltas and news from an in-memory snapshot
+Loads the published data files once, answers paginated and filtered queries,
+and hot-reloads when the pipeline publishes new files
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.publisher import PUBLISHED_DOCUMENTS, read_current_generation
+
+
+HTTP_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error"
+}
+
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 512
+
+# Entity tags in an If-None-Match list: "*" or optionally weak quoted tags
+ENTITY_TAG_PATTERN = re.compile(r'\*|(?:W/)?"[^"]*"')
+
+
+class SnapshotCache:
+    """Keeps the latest published data files in memory"""
+    
+    FILES = PUBLISHED_DOCUMENTS
+    
+    def __init__(self, data_dir: str = None):
+        """Initialize cache with data directory"""
+        if data_dir is None:
+            data_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "data"
+            )
+        self.data_dir = data_dir
+        self.current_link = os.path.join(data_dir, "current")
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.signatures: Dict[str, Tuple[str, int, int]] = {}
+        self.generation: Optional[int] = None
+        self.version = 0
+        self.loaded_at: Optional[str] = None
+        self.news_items: List[Dict[str, Any]] = []
+    
+    def _source_dir(self) -> str:
+        """Directory to read from: the published generation if there is one, else the data directory"""
+        if os.path.isdir(self.current_link):
+            # Resolved once per reload so every file comes from the same generation
+            return os.path.realpath(self.current_link)
+        return self.data_dir
+    
+    def _signature(self, path: str) -> Optional[Tuple[str, int, int]]:
+        """Return path, modification time and size of a data file"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return path, stat.st_mtime_ns, stat.st_size
+    
+    def reload_if_changed(self) -> bool:
+        """Reload any data file that changed on disk, returning True if one did"""
+        changed = False
+        source_dir = self._source_dir()
+        
+        for name, filename in self.FILES.items():
+            path = os.path.join(source_dir, filename)
+            signature = self._signature(path)
+            if signature == self.signatures.get(name):
+                continue
+            
+            if signature is None:
+                self.documents[name] = {}
+            else:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        self.documents[name] = json.load(f)
+                except (OSError, ValueError) as exc:
+                    # Keep serving the previous copy until a complete file appears
+                    print(f"Warning: Could not reload {path}: {exc}")
+                    continue
+            
+            self.signatures[name] = signature
+            changed = True
+        
+        if changed:
+            manifest = read_current_generation(source_dir) if source_dir != self.data_dir else None
+            self.generation = manifest["generation"] if manifest else None
+            self.news_items = [
+                item
+                for items in self.documents.get("news", {}).get("news_by_region", {}).values()
+                for item in items
+            ]
+            self.news_items.sort(key=lambda item: item.get("date") or "", reverse=True)
+            self.version += 1
+            self.loaded_at = datetime.now().isoformat()
+            print(f"Snapshot loaded (version {self.version})")
+        
+        return changed
+
+
+def _paginate(items: List[Any], query: Dict[str, str]) -> Dict[str, Any]:
+    """Slice a result list according to limit/offset query parameters"""
+    try:
+        limit = int(query.get("limit", 50))
+        offset = int(query.get("offset", 0))
+    except ValueError:
+        raise ValueError("limit and offset must be integers")
+    if limit < 0 or offset < 0:
+        raise ValueError("limit and offset must be non-negative")
+    
+    return {
+        "total": len(items),
+        "offset": offset,
+        "limit": limit,
+        "items": items[offset:offset + limit]
+    }
+
+
+def _flag(value: Optional[str]) -> Optional[bool]:
+    """Parse a boolean query parameter"""
+    if value is None:
+        return None
+    return value.lower() in ("1", "true", "yes")
+
+
+class EVDataAPI:
+    """Routes API requests to queries over the snapshot cache"""
+    
+    def __init__(self, cache: SnapshotCache, max_cached_responses: int = 256):
+        """Initialize API with snapshot cache"""
+        self.cache = cache
+        self.max_cached_responses = max_cached_responses
+        self._responses: Dict[Tuple[int, str, str], Tuple[bytes, str]] = {}
+    
+    def handle(self, path: str, query: Dict[str, str]) -> Tuple[int, Any]:
+        """Return status and JSON payload for a request path"""
+        parts = [part for part in path.split("/") if part]
+        rankings = self.cache.documents.get("rankings", {})
+        delta = self.cache.documents.get("delta", {})
+        news = self.cache.documents.get("news", {})
+        
+        if parts == ["health"]:
+            return 200, {
+                "status": "ok",
+                "snapshot_version": self.cache.version,
+                "generation": self.cache.generation,
+                "loaded_at": self.cache.loaded_at,
+                "period": rankings.get("period")
+            }
+        
+        if parts == ["summary"]:
+            return 200, {
+                "period": rankings.get("period"),
+                "market_statistics": rankings.get("market_statistics", {}),
+                "regional_breakdown": rankings.get("regional_breakdown", {}),
+                "delta_summary": delta.get("summary", {}),
+                "regional_news_summaries": news.get("regional_summaries", {})
+            }
+        
+        if len(parts) == 2 and parts[0] == "rankings" and parts[1] in ("bev", "phev"):
+            rows = rankings.get(f"{parts[1]}_rankings", [])
+            region = query.get("region")
+            if region:
+                # Top models within one region, ordered by regional units
+                rows = [dict(row, region_units=row.get("regions", {}).get(region, 0)) for row in rows]
+                rows = [row for row in rows if row["region_units"] > 0]
+                rows.sort(key=lambda row: row["region_units"], reverse=True)
+            manufacturer = query.get("manufacturer")
+            if manufacturer:
+                rows = [row for row in rows if row["manufacturer"].lower() == manufacturer.lower()]
+            return 200, _paginate(rows, query)
+        
+        if parts == ["manufacturers"]:
+            totals = rankings.get("manufacturer_totals", {})
+            rows = [dict(totals[name], manufacturer=name) for name in totals]
+            rows.sort(key=lambda row: row.get("total", 0), reverse=True)
+            return 200, _paginate(rows, query)
+        
+        if parts == ["alerts"]:
+            alerts = delta.get("alerts", [])
+            severity = query.get("severity")
+            if severity:
+                alerts = [a for a in alerts if a.get("severity") == severity]
+            alert_type = query.get("type")
+            if alert_type:
+                alerts = [a for a in alerts if a.get("type") == alert_type]
+            return 200, _paginate(alerts, query)
+        
+        if len(parts) == 2 and parts[0] == "deltas" and parts[1] in ("bev", "phev", "manufacturers"):
+            key = "manufacturer_deltas" if parts[1] == "manufacturers" else f"{parts[1]}_model_deltas"
+            rows = delta.get(key, [])
+            significant = _flag(query.get("significant"))
+            if significant is not None:
+                rows = [row for row in rows if row.get("is_significant") == significant]
+            manufacturer = query.get("manufacturer")
+            if manufacturer:
+                rows = [row for row in rows if row["manufacturer"].lower() == manufacturer.lower()]
+            return 200, _paginate(rows, query)
+        
+        if parts == ["news"]:
+            items = self.cache.news_items
+            for field in ("manufacturer", "region", "category", "impact"):
+                value = query.get(field)
+                if value:
+                    items = [item for item in items if (item.get(field) or "").lower() == value.lower()]
+            return 200, _paginate(items, query)
+        
+        return 404, {"error": f"Unknown endpoint: {path}"}
+    
+    def render(self, path: str, query_string: str) -> Tuple[int, bytes, str]:
+        """Return status, JSON body and ETag, reusing rendered responses for the current snapshot"""
+        key = (self.cache.version, path, query_string)
+        cached = self._responses.get(key)
+        if cached is not None:
+            return 200, cached[0], cached[1]
+        
+        query = {name: values[-1] for name, values in parse_qs(query_string).items()}
+        try:
+            status, payload = self.handle(path, query)
+        except ValueError as exc:
+            status, payload = 400, {"error": str(exc)}
+        
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        
+        if status == 200:
+            if len(self._responses) >= self.max_cached_responses:
+                self._responses.clear()
+            self._responses[key] = (body, etag)
+        
+        return status, body, etag
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    """Read an HTTP request head, returning method, target and lower-cased headers"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        return None
+    
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    
+    return method, target, headers
+
+
+def build_response(status: int, body: bytes = b"", headers: Dict[str, str] = None) -> bytes:
+    """Serialize an HTTP/1.1 response"""
+    head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Unknown')}"]
+    all_headers = {"Content-Length": str(len(body)), "Connection": "close"}
+    all_headers.update(headers or {})
+    head.extend(f"{name}: {value}" for name, value in all_headers.items())
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def content_encoding(body: bytes, request_headers: Dict[str, str]) -> Optional[str]:
+    """Return the encoding a response body will be sent with, or None for identity"""
+    if "gzip" in request_headers.get("accept-encoding", "") and len(body) >= GZIP_MIN_BYTES:
+        return "gzip"
+    return None
+
+
+def encode_body(body: bytes, request_headers: Dict[str, str]) -> Tuple[bytes, Dict[str, str]]:
+    """Gzip a response body when the client accepts it"""
+    headers = {"Content-Type": "application/json; charset=utf-8", "Vary": "Accept-Encoding"}
+    if content_encoding(body, request_headers) == "gzip":
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """Strong ETag for one encoding of a body; each encoding is a different representation"""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag, using weak comparison"""
+    if not if_none_match:
+        return False
+    for candidate in ENTITY_TAG_PATTERN.findall(if_none_match):
+        if candidate == "*" or candidate.replace("W/", "", 1) == etag:
+            return True
+    return False
+
+
+class APIServer:
+    """Asyncio HTTP front end for the EV data API"""
+    
+    def __init__(self, data_dir: str = None, host: str = "127.0.0.1", port: int = 8765,
+                 reload_interval: float = 2.0):
+        """Initialize server with data directory, bind address and reload interval"""
+        self.cache = SnapshotCache(data_dir)
+        self.api = EVDataAPI(self.cache)
+        self.host = host
+        self.port = port
+        self.reload_interval = reload_interval
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer a single request on a connection"""
+        try:
+            request = await read_request(reader)
+            if request is None:
+                return
+            
+            method, target, headers = request
+            if method not in ("GET", "HEAD"):
+                writer.write(build_response(405, b"", {"Allow": "GET, HEAD"}))
+                return
+            
+            url = urlsplit(target)
+            status, body, etag = self.api.render(url.path, url.query)
+            etag = variant_etag(etag, content_encoding(body, headers))
+            
+            if status == 200 and etag_matches(headers.get("if-none-match"), etag):
+                writer.write(build_response(304, b"", {"ETag": etag, "Vary": "Accept-Encoding"}))
+                return
+            
+            body, response_headers = encode_body(body, headers)
+            if status == 200:
+                response_headers["ETag"] = etag
+                response_headers["Cache-Control"] = "no-cache"
+            
+            response = build_response(status, body, response_headers)
+            if method == "HEAD":
+                response = response[:len(response) - len(body)]
+            writer.write(response)
+        except Exception as exc:
+            print(f"Error handling request: {exc}")
+            writer.write(build_response(500, json.dumps({"error": "Internal server error"}).encode("utf-8")))
+        finally:
+            try:
+                await writer.drain()
+            finally:
+                writer.close()
+    
+    async def watch_snapshots(self) -> None:
+        """Poll the data files and hot-reload them when the pipeline publishes"""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            self.cache.reload_if_changed()
+    
+    async def serve(self) -> None:
+        """Load the snapshot and serve until cancelled"""
+        self.cache.reload_if_changed()
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        watcher = asyncio.ensure_future(self.watch_snapshots())
+        
+        print(f"EV Data API listening on http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve EV rankings, deltas and news over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=8765, help="Bind port")
+    parser.add_argument("--data-dir", default=None, help="Directory with published data files")
+    parser.add_argument("--reload-interval", type=float, default=2.0, help="Seconds between reload checks")
+    args = parser.parse_args()
+    
+    server = APIServer(args.data_dir, args.host, args.port, args.reload_interval)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
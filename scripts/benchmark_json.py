@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+EV JSON Benchmark - Compares JSON backends on generated large ranking snapshots
+Reports dump and load throughput and output size for every available backend
+in pretty and compact mode
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Any
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.json_backend import BACKENDS, COMPACT, PRETTY, dumps, loads
+
+
+REGIONS = ["China", "Asia_ex_China", "Europe", "USA"]
+
+
+def generate_snapshot(models: int, seed: int = 0) -> Dict[str, Any]:
+    """Generate a rankings snapshot with the given number of models per vehicle type"""
+    rng = random.Random(seed)
+    manufacturers = [f"Manufacturer {i}" for i in range(max(1, models // 20))]
+    
+    def rankings(vehicle_type: str) -> List[Dict[str, Any]]:
+        rows = []
+        for rank in range(1, models + 1):
+            regions = {region: rng.randint(0, 200000) for region in REGIONS}
+            rows.append({
+                "rank": rank,
+                "manufacturer": rng.choice(manufacturers),
+                "model": f"{vehicle_type} Model {rank}",
+                "sales_units": sum(regions.values()),
+                "market_share_percent": round(rng.uniform(0, 10), 1),
+                "revenue_usd_millions": rng.randint(100, 50000),
+                "yoy_growth_percent": round(rng.uniform(-50, 150), 1),
+                "regions": regions
+            })
+        return rows
+    
+    return {
+        "generated_at": "2025-11-12T10:34:57",
+        "period": "Q4 2025",
+        "bev_rankings": rankings("BEV"),
+        "phev_rankings": rankings("PHEV"),
+        "manufacturer_totals": {
+            name: {"bev": rng.randint(0, 10 ** 6), "phev": rng.randint(0, 10 ** 6), "total": 0}
+            for name in manufacturers
+        }
+    }
+
+
+def benchmark(data: Dict[str, Any], backend: str, mode: str, repeat: int) -> Dict[str, float]:
+    """Time dumps and loads of a snapshot, keeping the best of several runs"""
+    dump_times, load_times = [], []
+    raw = b""
+    
+    for _ in range(repeat):
+        started = time.perf_counter()
+        raw = dumps(data, mode, backend)
+        dump_times.append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        loads(raw, backend)
+        load_times.append(time.perf_counter() - started)
+    
+    megabytes = len(raw) / 1e6
+    return {
+        "size_mb": megabytes,
+        "dump_mb_per_s": megabytes / min(dump_times),
+        "load_mb_per_s": megabytes / min(load_times)
+    }
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark JSON backends on generated ranking snapshots")
+    parser.add_argument("--models", type=int, default=50000, help="Models per vehicle type")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args()
+    
+    data = generate_snapshot(args.models)
+    print(f"Snapshot: {args.models:,} models per vehicle type, backends: {', '.join(BACKENDS)}")
+    print(f"{'backend':<8} {'mode':<8} {'size MB':>9} {'dump MB/s':>10} {'load MB/s':>10}")
+    
+    for backend in BACKENDS:
+        for mode in (PRETTY, COMPACT):
+            result = benchmark(data, backend, mode, args.repeat)
+            print(f"{backend:<8} {mode:<8} {result['size_mb']:>9.2f} "
+                  f"{result['dump_mb_per_s']:>10.1f} {result['load_mb_per_s']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
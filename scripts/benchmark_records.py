@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+EV Records Benchmark - Measures memory of dict vs slotted record batches
+Parses generated news and ranking JSON the way the pipeline does and compares
+traced memory held by plain dicts against NewsItem/RankingRow records
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+from typing import Callable, Dict, List, Any
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.records import NewsItem, RankingRow
+
+
+REGIONS = ["USA", "Europe", "Asia_ex_Japan", "Japan", "Global"]
+RANKING_REGIONS = ["China", "Asia_ex_China", "Europe", "USA"]
+CATEGORIES = ["sales", "production", "recall", "financial", "policy", "launch", "market", "technology"]
+IMPACTS = ["high", "medium", "low"]
+MANUFACTURERS = ["Tesla", "BYD", "NIO", "Xpeng", "Li Auto", "BMW", "Volkswagen", "Toyota", "Hyundai", "Ford"]
+
+
+def generate_news(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Generate news articles in the collector's dict format"""
+    return [
+        {
+            "title": f"Article {i} about electric vehicle sales",
+            "url": f"https://example.com/news/{i}",
+            "source": rng.choice(["Reuters", "Bloomberg", "CnEVPost", "Electrek"]),
+            "date": f"2025-11-{rng.randint(1, 28):02d}T09:00:00",
+            "description": f"Description of article {i}.",
+            "region": rng.choice(REGIONS),
+            "manufacturer": rng.choice(MANUFACTURERS),
+            "category": rng.choice(CATEGORIES),
+            "impact": rng.choice(IMPACTS),
+            "original_language": rng.choice(["en", "en", "zh"]),
+            "original_title": None,
+            "original_url": None
+        }
+        for i in range(count)
+    ]
+
+
+def generate_rankings(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Generate ranking rows in the generator's dict format"""
+    return [
+        {
+            "rank": i + 1,
+            "manufacturer": rng.choice(MANUFACTURERS),
+            "model": f"Model {i}",
+            "sales_units": rng.randint(1000, 500000),
+            "revenue_usd_millions": rng.randint(10, 20000),
+            "yoy_growth_percent": round(rng.uniform(-50, 150), 1),
+            "market_share_percent": round(rng.uniform(0, 10), 1),
+            "regions": {region: rng.randint(0, 200000) for region in RANKING_REGIONS}
+        }
+        for i in range(count)
+    ]
+
+
+def traced_bytes(build: Callable[[], Any]) -> int:
+    """Return memory still held by the object a builder returns"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory of dict and slotted record batches")
+    parser.add_argument("--news", type=int, default=100000, help="Number of news articles")
+    parser.add_argument("--rankings", type=int, default=100000, help="Number of ranking rows")
+    args = parser.parse_args()
+    
+    rng = random.Random(0)
+    datasets = [
+        ("news", NewsItem, json.dumps(generate_news(args.news, rng))),
+        ("rankings", RankingRow, json.dumps(generate_rankings(args.rankings, rng)))
+    ]
+    
+    print(f"{'dataset':<10} {'items':>9} {'dicts MB':>9} {'records MB':>11} {'saved':>7}")
+    for name, record_type, raw in datasets:
+        as_dicts = traced_bytes(lambda: json.loads(raw))
+        as_records = traced_bytes(lambda: [record_type.from_dict(item) for item in json.loads(raw)])
+        count = args.news if name == "news" else args.rankings
+        print(f"{name:<10} {count:>9,} {as_dicts / 1e6:>9.1f} {as_records / 1e6:>11.1f} "
+              f"{(1 - as_records / as_dicts) * 100:>6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,6 @@
 EV Rankings Delta Calculator - Compares current rankings with previous period
 Identifies significant changes in sales volumes and rankings
 """
-import json
 import os
 import sys
 from datetime import datetime
@@ -13,6 +12,14 @@ import glob
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from scripts.anomaly_detection import AnomalyDetector
+from scripts.change_attribution import ChangeAttributor
+from scripts.json_backend import load_json, dump_json
+from scripts.manufacturer_hierarchy import ManufacturerHierarchy
+from scripts.news_correlation import NewsCorrelator
+from scripts.records import RankingRow
+from scripts.snapshot_validation import SnapshotValidationError, check_snapshot
+
 
 class RankingsDeltaCalculator:
     """Calculates changes between ranking periods"""
@@ -22,8 +29,8 @@ class RankingsDeltaCalculator:
     SIGNIFICANT_RANK_CHANGE = 2  # Positions
     SIGNIFICANT_GROWTH_PERCENT = 50.0  # Percent
     
-    def __init__(self, data_dir: str = None, history_dir: str = None):
-        """Initialize calculator with data directories"""
+    def __init__(self, data_dir: str = None, history_dir: str = None, archive_dir: str = None):
+        """Initialize calculator with data directories and the news archive"""
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         
         if data_dir is None:
@@ -33,6 +40,12 @@ class RankingsDeltaCalculator:
         
         self.data_dir = data_dir
         self.history_dir = history_dir
+        self.anomaly_detector = AnomalyDetector(history_dir=history_dir)
+        self.manufacturer_hierarchy = ManufacturerHierarchy(
+            os.path.join(data_dir, "reference", "manufacturer_hierarchy.json")
+        )
+        self.change_attributor = ChangeAttributor(history_dir=history_dir)
+        self.news_correlator = NewsCorrelator(data_dir=data_dir, archive_dir=archive_dir)
     
     def load_current_rankings(self) -> Optional[Dict[str, Any]]:
         """Load current rankings data"""
@@ -42,8 +55,7 @@ class RankingsDeltaCalculator:
             print(f"Warning: Current rankings not found at {current_path}")
             return None
         
-        with open(current_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return self._load_snapshot(current_path)
     
     def load_previous_rankings(self) -> Optional[Dict[str, Any]]:
         """Load most recent historical rankings (excluding current)"""
@@ -55,12 +67,26 @@ class RankingsDeltaCalculator:
             print("Info: Not enough historical data for comparison")
             return None
         
-        # Skip the most recent (which is current) and load the second most recent
-        previous_path = history_files[1]
-        print(f"Loading previous rankings from: {os.path.basename(previous_path)}")
+        # Skip the most recent (which is current) and load the latest valid one before it
+        for previous_path in history_files[1:]:
+            try:
+                snapshot = self._load_snapshot(previous_path)
+            except SnapshotValidationError as exc:
+                print(f"Warning: Skipping invalid historical snapshot: {exc}")
+                continue
+            print(f"Loading previous rankings from: {os.path.basename(previous_path)}")
+            return snapshot
         
-        with open(previous_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        print("Info: No valid historical data for comparison")
+        return None
+    
+    def _load_snapshot(self, path: str) -> Dict[str, Any]:
+        """Load a rankings snapshot with its ranking rows as records"""
+        snapshot = load_json(path)
+        check_snapshot(snapshot, source=path)
+        for key in ("bev_rankings", "phev_rankings"):
+            snapshot[key] = [RankingRow.from_dict(row) for row in snapshot.get(key, [])]
+        return snapshot
     
     def calculate_model_deltas(self, current: List[Dict], previous: List[Dict], vehicle_type: str) -> List[Dict[str, Any]]:
         """Calculate changes for individual models"""
@@ -81,9 +107,12 @@ class RankingsDeltaCalculator:
                 "current_sales": curr_item["sales_units"],
                 "previous_rank": prev_item["rank"] if prev_item else None,
                 "previous_sales": prev_item["sales_units"] if prev_item else None,
+                "current_market_share": curr_item.get("market_share_percent"),
+                "previous_market_share": prev_item.get("market_share_percent") if prev_item else None,
                 "rank_change": None,
                 "sales_change": None,
                 "sales_change_percent": None,
+                "market_share_change": None,
                 "is_new_entry": prev_item is None,
                 "is_significant": False
             }
@@ -93,6 +122,11 @@ class RankingsDeltaCalculator:
                 delta["rank_change"] = prev_item["rank"] - curr_item["rank"]  # Positive = improved
                 delta["sales_change"] = curr_item["sales_units"] - prev_item["sales_units"]
                 
+                if delta["current_market_share"] is not None and delta["previous_market_share"] is not None:
+                    delta["market_share_change"] = round(
+                        delta["current_market_share"] - delta["previous_market_share"], 1
+                    )
+                
                 if prev_item["sales_units"] > 0:
                     delta["sales_change_percent"] = round(
                         (delta["sales_change"] / prev_item["sales_units"]) * 100, 1
@@ -111,9 +145,12 @@ class RankingsDeltaCalculator:
         
         return deltas
     
-    def calculate_manufacturer_deltas(self, current_totals: Dict, previous_totals: Dict) -> List[Dict[str, Any]]:
+    def calculate_manufacturer_deltas(self, current_totals: Dict, previous_totals: Dict,
+                                      current_shares: Dict = None, previous_shares: Dict = None) -> List[Dict[str, Any]]:
         """Calculate changes for manufacturers"""
         deltas = []
+        current_shares = current_shares or {}
+        previous_shares = previous_shares or {}
         
         all_manufacturers = set(current_totals.keys()) | set(previous_totals.keys())
         
@@ -136,6 +173,16 @@ class RankingsDeltaCalculator:
                 "is_significant": False
             }
             
+            # Global EV market share, read from the precomputed share tables
+            delta["current_market_share"] = current_shares.get(mfr, {}).get("global")
+            delta["previous_market_share"] = previous_shares.get(mfr, {}).get("global")
+            if delta["current_market_share"] is not None and delta["previous_market_share"] is not None:
+                delta["market_share_change"] = round(
+                    delta["current_market_share"] - delta["previous_market_share"], 2
+                )
+            else:
+                delta["market_share_change"] = None
+            
             # Calculate percent change
             if prev["total"] > 0:
                 delta["total_change_percent"] = round(
@@ -197,10 +244,12 @@ class RankingsDeltaCalculator:
             elif delta["is_significant"]:
                 direction = "increased" if delta["total_change"] > 0 else "decreased"
                 percent_str = f" ({delta['total_change_percent']:+.1f}%)" if delta["total_change_percent"] else ""
+                leader = (delta.get("top_contributors") or [None])[0]
+                leader_str = f", led by {leader['model']} in {leader['region']} ({leader['change']:+,})" if leader else ""
                 alerts.append({
                     "type": "manufacturer_change",
                     "severity": "high",
-                    "message": f"{delta['manufacturer']} total sales {direction} by {abs(delta['total_change']):,} units{percent_str}"
+                    "message": f"{delta['manufacturer']} total sales {direction} by {abs(delta['total_change']):,} units{percent_str}{leader_str}"
                 })
         
         return alerts
@@ -231,6 +280,25 @@ class RankingsDeltaCalculator:
                 "alerts": []
             }
         
+        # Statistically unusual moves relative to each series' own history
+        delta_data = self.compare_rankings(current, previous, self.anomaly_detector.detect())
+        
+        # News that preceded each change
+        linked = self.news_correlator.correlate(delta_data)
+        
+        print(f"Comparison: {previous.get('period')} → {current.get('period')}")
+        print(f"  Significant changes: {delta_data['summary']['significant_changes']}")
+        print(f"  Anomalies: {delta_data['summary']['anomalies']}")
+        print(f"  Deltas with related news: {linked}")
+        print(f"  Total alerts: {delta_data['summary']['total_alerts']}")
+        
+        return delta_data
+    
+    def compare_rankings(self, current: Dict[str, Any], previous: Dict[str, Any],
+                         anomalies: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Compare two rankings snapshots using this calculator's thresholds"""
+        anomalies = anomalies or []
+        
         # Calculate deltas
         bev_deltas = self.calculate_model_deltas(
             current.get("bev_rankings", []),
@@ -246,44 +314,77 @@ class RankingsDeltaCalculator:
         
         manufacturer_deltas = self.calculate_manufacturer_deltas(
             current.get("manufacturer_totals", {}),
-            previous.get("manufacturer_totals", {})
+            previous.get("manufacturer_totals", {}),
+            ((current.get("market_share_tables") or {}).get("manufacturers") or {}).get("total"),
+            ((previous.get("market_share_tables") or {}).get("manufacturers") or {}).get("total")
+        )
+        
+        # Explain each manufacturer's change by model x region
+        attribution = self.change_attributor.attribute(current, previous)
+        for delta in manufacturer_deltas:
+            breakdown = attribution["manufacturers"].get(delta["manufacturer"], {})
+            delta["region_changes"] = breakdown.get("region_changes", {})
+            delta["top_contributors"] = breakdown.get("top_contributors", [])
+        
+        # Manufacturer and group rollups come precomputed with each snapshot
+        current_tree = self._manufacturer_tree(current)
+        previous_tree = self._manufacturer_tree(previous)
+        manufacturer_rollup_deltas = self.calculate_manufacturer_deltas(
+            current_tree["manufacturers"], previous_tree["manufacturers"]
         )
+        for delta in manufacturer_rollup_deltas:
+            node = current_tree["manufacturers"].get(delta["manufacturer"]) or \
+                previous_tree["manufacturers"][delta["manufacturer"]]
+            delta["brands"] = node["brands"]
+        group_deltas = [
+            {"group": delta.pop("manufacturer"), **delta}
+            for delta in self.calculate_manufacturer_deltas(current_tree["groups"], previous_tree["groups"])
+        ]
         
         # Generate alerts
         all_model_deltas = bev_deltas + phev_deltas
         alerts = self.generate_alerts(all_model_deltas, manufacturer_deltas)
+        alerts.extend(self.anomaly_detector.generate_alerts(anomalies))
         
         # Compile delta data
         delta_data = {
             "generated_at": datetime.now().isoformat(),
             "current_period": current.get("period"),
+            "current_generated_at": current.get("generated_at"),
             "previous_period": previous.get("period"),
             "has_comparison": True,
             "bev_model_deltas": bev_deltas,
             "phev_model_deltas": phev_deltas,
             "manufacturer_deltas": manufacturer_deltas,
+            "manufacturer_rollup_deltas": manufacturer_rollup_deltas,
+            "group_deltas": group_deltas,
+            "region_deltas": attribution["regions"],
+            "anomalies": anomalies,
             "alerts": alerts,
             "summary": {
                 "total_alerts": len(alerts),
                 "high_severity_alerts": len([a for a in alerts if a["severity"] == "high"]),
                 "significant_changes": len([d for d in all_model_deltas if d["is_significant"]]),
-                "new_entries": len([d for d in all_model_deltas if d["is_new_entry"]])
+                "new_entries": len([d for d in all_model_deltas if d["is_new_entry"]]),
+                "anomalies": len(anomalies)
             }
         }
         
-        print(f"Comparison: {previous.get('period')} → {current.get('period')}")
-        print(f"  Significant changes: {delta_data['summary']['significant_changes']}")
-        print(f"  Total alerts: {delta_data['summary']['total_alerts']}")
-        
         return delta_data
     
+    def _manufacturer_tree(self, snapshot: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Return a snapshot's rollup tree, aggregating snapshots saved before the tree existed"""
+        tree = snapshot.get("manufacturer_tree")
+        if tree is None:
+            tree = self.manufacturer_hierarchy.aggregate(
+                snapshot.get("bev_rankings", []), snapshot.get("phev_rankings", [])
+            )
+        return tree
+    
     def save_delta(self, delta_data: Dict[str, Any]) -> str:
         """Save delta data to file"""
-        os.makedirs(self.data_dir, exist_ok=True)
-        
         output_path = os.path.join(self.data_dir, "ev_rankings_delta.json")
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(delta_data, f, indent=2, ensure_ascii=False)
+        dump_json(delta_data, output_path)
         
         print(f"Delta saved to: {output_path}")
         return output_path
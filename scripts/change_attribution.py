@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+EV Change Attribution - Explains manufacturer and regional sales changes
+Aligns the model x region sales arrays of two snapshots and decomposes every
+manufacturer's and region's total change into model x region contributions
+"""
+import os
+import sys
+from typing import Dict, List, Any, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.history_store import get_history_store
+
+
+# Sales not assigned to any region (sales_units minus the regional sum)
+UNALLOCATED = "unallocated"
+
+
+class ChangeAttributor:
+    """Decomposes sales changes between two snapshots by model and region"""
+    
+    # Contributors kept per manufacturer and region
+    TOP_CONTRIBUTORS = 5
+    
+    VEHICLE_TYPES = {"BEV": "bev_rankings", "PHEV": "phev_rankings"}
+    
+    def __init__(self, history_dir: str = None, top_contributors: int = None):
+        """Initialize attributor with the history directory and number of contributors to keep"""
+        if history_dir is None:
+            history_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "history"
+            )
+        self.history_dir = history_dir
+        if top_contributors is not None:
+            self.TOP_CONTRIBUTORS = top_contributors
+    
+    def align(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Tuple[List[Tuple[str, str, str]], List[str], List[List[int]]]:
+        """
+        Align both snapshots on the same (vehicle_type, manufacturer, model) rows
+        and region columns; returns the row keys, column names and change matrix
+        """
+        keys: Dict[Tuple[str, str, str], int] = {}
+        columns: Dict[str, int] = {}
+        for snapshot in (current, previous):
+            for vehicle_type, section in self.VEHICLE_TYPES.items():
+                for row in snapshot.get(section, []):
+                    keys.setdefault((vehicle_type, row["manufacturer"], row["model"]), len(keys))
+                    for region in row.get("regions") or {}:
+                        columns.setdefault(region, len(columns))
+        columns.setdefault(UNALLOCATED, len(columns))
+        
+        width = len(columns)
+        changes = [[0] * width for _ in keys]
+        for snapshot, sign in ((current, 1), (previous, -1)):
+            for vehicle_type, section in self.VEHICLE_TYPES.items():
+                for row in snapshot.get(section, []):
+                    target = changes[keys[(vehicle_type, row["manufacturer"], row["model"])]]
+                    regions = row.get("regions") or {}
+                    for region, units in regions.items():
+                        target[columns[region]] += sign * units
+                    target[-1] += sign * (row["sales_units"] - sum(regions.values()))
+        
+        return list(keys), list(columns), changes
+    
+    def _top(self, contributions: List[Tuple[int, int, int]], total_change: int,
+             keys: List[Tuple[str, str, str]], columns: List[str], with_manufacturer: bool) -> List[Dict[str, Any]]:
+        """Turn the largest (change, row, column) contributions into report entries"""
+        contributions.sort(key=lambda item: (-abs(item[0]), item[1], item[2]))
+        top = []
+        for change, row, column in contributions[:self.TOP_CONTRIBUTORS]:
+            vehicle_type, manufacturer, model = keys[row]
+            entry = {"vehicle_type": vehicle_type, "model": model, "region": columns[column], "change": change}
+            if with_manufacturer:
+                entry = {"manufacturer": manufacturer, **entry}
+            entry["share_of_change_percent"] = round(change / total_change * 100, 1) if total_change else None
+            top.append(entry)
+        return top
+    
+    def attribute(self, current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Decompose the change of every manufacturer and region at once
+        Contributions of a manufacturer sum exactly to its total change
+        """
+        keys, columns, changes = self.align(current, previous)
+        
+        manufacturers: Dict[str, Dict[str, Any]] = {}
+        manufacturer_cells: Dict[str, List[Tuple[int, int, int]]] = {}
+        region_totals = [0] * len(columns)
+        region_cells: List[List[Tuple[int, int, int]]] = [[] for _ in columns]
+        
+        for row, ((_, manufacturer, _), values) in enumerate(zip(keys, changes)):
+            summary = manufacturers.get(manufacturer)
+            if summary is None:
+                summary = manufacturers[manufacturer] = {"total_change": 0, "region_changes": [0] * len(columns)}
+                manufacturer_cells[manufacturer] = []
+            cells = manufacturer_cells[manufacturer]
+            region_changes = summary["region_changes"]
+            for column, change in enumerate(values):
+                if not change:
+                    continue
+                summary["total_change"] += change
+                region_changes[column] += change
+                region_totals[column] += change
+                cells.append((change, row, column))
+                region_cells[column].append((change, row, column))
+        
+        for manufacturer, summary in manufacturers.items():
+            summary["region_changes"] = {
+                columns[column]: change for column, change in enumerate(summary["region_changes"]) if change
+            }
+            summary["top_contributors"] = self._top(
+                manufacturer_cells[manufacturer], summary["total_change"], keys, columns, False
+            )
+        
+        regions = {
+            region: {
+                "total_change": region_totals[column],
+                "top_contributors": self._top(region_cells[column], region_totals[column], keys, columns, True)
+            }
+            for column, region in enumerate(columns)
+            if region != UNALLOCATED
+        }
+        
+        return {"manufacturers": manufacturers, "regions": regions}
+    
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """Attribute the change between the two latest history snapshots"""
+        print("=" * 60)
+        print("EV Change Attribution - Starting")
+        print("=" * 60)
+        
+        snapshots = get_history_store(self.history_dir).load_all()
+        if len(snapshots) < 2:
+            print("Not enough history to attribute changes")
+            return {"manufacturers": {}, "regions": {}}
+        
+        (_, previous), (_, current) = snapshots[-2:]
+        attribution = self.attribute(current, previous)
+        print(f"Comparison: {previous.get('period')} → {current.get('period')}")
+        
+        ranked = sorted(attribution["manufacturers"].items(), key=lambda item: -abs(item[1]["total_change"]))
+        for manufacturer, summary in ranked:
+            if not summary["total_change"]:
+                continue
+            print(f"  {manufacturer}: {summary['total_change']:+,} units")
+            for entry in summary["top_contributors"][:3]:
+                print(f"    {entry['model']} ({entry['vehicle_type']}, {entry['region']}): {entry['change']:+,}")
+        
+        print("=" * 60)
+        print("EV Change Attribution - Complete")
+        print("=" * 60)
+        
+        return attribution
+
+
+if __name__ == "__main__":
+    ChangeAttributor().run()
@@ -3,31 +3,55 @@
 EV Rankings Generator - Creates BEV and PHEV rankings with sales data
 Maintains clear distinction between Battery Electric Vehicles (BEV) and Plug-in Hybrids (PHEV)
 """
-import json
 import os
 import sys
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from scripts.currency import CurrencyNormalizer, FXRateTable
+from scripts.json_backend import dump_json
+from scripts.manufacturer_hierarchy import ManufacturerHierarchy
+from scripts.market_share import MarketShareCalculator
+from scripts.records import RankingRow
+from scripts.registration_ingest import RegistrationBulkLoader, cache_path_beside
+from scripts.snapshot_validation import check_snapshot
+
 
 class EVRankingsGenerator:
     """Generates EV rankings with BEV/PHEV distinction"""
     
-    def __init__(self, output_dir: str = None):
-        """Initialize generator with output directory"""
+    def __init__(self, output_dir: str = None, ingest_dir: str = None, history_dir: str = None):
+        """Initialize generator with output, registration export and history directories"""
         if output_dir is None:
             output_dir = os.path.join(
                 os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
                 "data"
             )
         self.output_dir = output_dir
-        self.history_dir = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            "history"
-        )
+        if history_dir is None:
+            history_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "history"
+            )
+        self.history_dir = history_dir
+        if ingest_dir is None:
+            ingest_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "ingest"
+            )
+        self.ingest_dir = ingest_dir
+        # Reference files live beside the data they describe
+        reference_dir = os.path.join(output_dir, "reference")
+        self.currency_normalizer = CurrencyNormalizer(FXRateTable(os.path.join(reference_dir, "fx_rates.json")))
+        self.market_share_calculator = MarketShareCalculator(os.path.join(reference_dir, "market_totals.json"))
+        self.manufacturer_hierarchy = ManufacturerHierarchy(os.path.join(reference_dir, "manufacturer_hierarchy.json"))
+        # One loader for the generator's lifetime keeps its per-file aggregate cache warm;
+        # the cache lives in the state/ directory beside the output directory
+        self.registration_loader = RegistrationBulkLoader(cache_path=cache_path_beside(output_dir))
+        self._ingest_signature = None
     
     def generate_rankings(self) -> Dict[str, Any]:
         """
@@ -41,6 +65,111 @@ class EVRankingsGenerator:
         current_date = datetime.now()
         period = f"Q{(current_date.month - 1) // 3 + 1} {current_date.year}"
         
+        # Load rankings from registration exports when available, else mock data
+        bev_rankings, phev_rankings, data_source = self._load_rankings()
+        
+        # Reject malformed rows before any work is done or written
+        check_snapshot({"period": period, "bev_rankings": bev_rankings, "phev_rankings": phev_rankings},
+                       source=data_source)
+        
+        # Convert revenue reported in local currencies (CNY, EUR, JPY) to USD
+        self.currency_normalizer.normalize_rankings(
+            bev_rankings + phev_rankings,
+            as_of=current_date.strftime("%Y-%m-%d"),
+            snapshot_key=self._ingest_signature
+        )
+        
+        rankings_data = self.build_rankings(bev_rankings, phev_rankings, period, data_source)
+        
+        print(f"Generated rankings for {period}")
+        print(f"  BEV models: {len(bev_rankings)}")
+        print(f"  PHEV models: {len(phev_rankings)}")
+        print(f"  Total manufacturers: {len(rankings_data['manufacturer_totals'])}")
+        
+        return rankings_data
+    
+    def build_rankings(self, bev_rankings: List[Dict], phev_rankings: List[Dict], period: str,
+                       data_source: str) -> Dict[str, Any]:
+        """Derive shares, totals and statistics from BEV and PHEV ranking rows"""
+        # Market shares against total-market denominators, kept as lookup tables
+        market_share_tables = self.market_share_calculator.apply(bev_rankings, phev_rankings)
+        
+        # Brand, manufacturer and group totals in one bottom-up pass
+        manufacturer_tree = self.manufacturer_hierarchy.aggregate(bev_rankings, phev_rankings)
+        manufacturer_totals = self._calculate_manufacturer_totals(manufacturer_tree)
+        
+        # Regional breakdown
+        regional_breakdown = self._calculate_regional_breakdown(bev_rankings, phev_rankings)
+        
+        # Market statistics
+        market_stats = {
+            "total_bev_sales": sum(item["sales_units"] for item in bev_rankings),
+            "total_phev_sales": sum(item["sales_units"] for item in phev_rankings),
+            "total_ev_sales": sum(item["sales_units"] for item in bev_rankings) + sum(item["sales_units"] for item in phev_rankings),
+            "bev_market_share": 0.0,  # Will be calculated
+            "phev_market_share": 0.0,  # Will be calculated
+            "average_bev_price_usd": 0,
+            "average_phev_price_usd": 0
+        }
+        
+        # Calculate market shares and averages
+        total_sales = market_stats["total_ev_sales"]
+        if total_sales > 0:
+            market_stats["bev_market_share"] = round((market_stats["total_bev_sales"] / total_sales) * 100, 1)
+            market_stats["phev_market_share"] = round((market_stats["total_phev_sales"] / total_sales) * 100, 1)
+        
+        if market_stats["total_bev_sales"] > 0:
+            total_bev_revenue = sum(item["revenue_usd_millions"] for item in bev_rankings)
+            market_stats["average_bev_price_usd"] = int((total_bev_revenue * 1000000) / market_stats["total_bev_sales"])
+        
+        if market_stats["total_phev_sales"] > 0:
+            total_phev_revenue = sum(item["revenue_usd_millions"] for item in phev_rankings)
+            market_stats["average_phev_price_usd"] = int((total_phev_revenue * 1000000) / market_stats["total_phev_sales"])
+        
+        # Compile complete data
+        rankings_data = {
+            "generated_at": datetime.now().isoformat(),
+            "period": period,
+            "bev_rankings": bev_rankings,
+            "phev_rankings": phev_rankings,
+            "manufacturer_totals": manufacturer_totals,
+            "regional_breakdown": regional_breakdown,
+            "market_statistics": market_stats,
+            "market_share_tables": market_share_tables,
+            "manufacturer_tree": manufacturer_tree,
+            "metadata": {
+                "total_manufacturers": len(manufacturer_totals),
+                "total_models_tracked": len(bev_rankings) + len(phev_rankings),
+                "data_source": data_source,
+                "last_updated": datetime.now().isoformat()
+            }
+        }
+        
+        return rankings_data
+    
+    def _load_rankings(self) -> Tuple[List[RankingRow], List[RankingRow], str]:
+        """Load BEV and PHEV rankings from registration exports, falling back to mock data"""
+        loader = self.registration_loader
+        files = loader.find_files(self.ingest_dir)
+        
+        if files:
+            print(f"Ingesting {len(files)} registration export files from {self.ingest_dir}")
+            self._ingest_signature = tuple(
+                (path, os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in files
+            )
+            bev_rankings, phev_rankings = loader.load_rankings(files)
+            return bev_rankings, phev_rankings, "Registration Data Ingest"
+        
+        self._ingest_signature = None
+        bev_rankings, phev_rankings = self._get_mock_rankings()
+        return (
+            [RankingRow.from_dict(row) for row in bev_rankings],
+            [RankingRow.from_dict(row) for row in phev_rankings],
+            "Market Intelligence Aggregation"
+        )
+    
+    def _get_mock_rankings(self) -> Tuple[List[Dict], List[Dict]]:
+        """Get mock rankings based on actual market trends"""
         # BEV Rankings (Battery Electric Vehicles only)
         bev_rankings = [
             {
@@ -349,84 +478,14 @@ class EVRankingsGenerator:
             }
         ]
         
-        # Calculate manufacturer totals
-        manufacturer_totals = self._calculate_manufacturer_totals(bev_rankings, phev_rankings)
-        
-        # Regional breakdown
-        regional_breakdown = self._calculate_regional_breakdown(bev_rankings, phev_rankings)
-        
-        # Market statistics
-        market_stats = {
-            "total_bev_sales": sum(item["sales_units"] for item in bev_rankings),
-            "total_phev_sales": sum(item["sales_units"] for item in phev_rankings),
-            "total_ev_sales": sum(item["sales_units"] for item in bev_rankings) + sum(item["sales_units"] for item in phev_rankings),
-            "bev_market_share": 0.0,  # Will be calculated
-            "phev_market_share": 0.0,  # Will be calculated
-            "average_bev_price_usd": 0,
-            "average_phev_price_usd": 0
-        }
-        
-        # Calculate market shares and averages
-        total_sales = market_stats["total_ev_sales"]
-        if total_sales > 0:
-            market_stats["bev_market_share"] = round((market_stats["total_bev_sales"] / total_sales) * 100, 1)
-            market_stats["phev_market_share"] = round((market_stats["total_phev_sales"] / total_sales) * 100, 1)
-        
-        if market_stats["total_bev_sales"] > 0:
-            total_bev_revenue = sum(item["revenue_usd_millions"] for item in bev_rankings)
-            market_stats["average_bev_price_usd"] = int((total_bev_revenue * 1000000) / market_stats["total_bev_sales"])
-        
-        if market_stats["total_phev_sales"] > 0:
-            total_phev_revenue = sum(item["revenue_usd_millions"] for item in phev_rankings)
-            market_stats["average_phev_price_usd"] = int((total_phev_revenue * 1000000) / market_stats["total_phev_sales"])
-        
-        # Compile complete data
-        rankings_data = {
-            "generated_at": datetime.now().isoformat(),
-            "period": period,
-            "bev_rankings": bev_rankings,
-            "phev_rankings": phev_rankings,
-            "manufacturer_totals": manufacturer_totals,
-            "regional_breakdown": regional_breakdown,
-            "market_statistics": market_stats,
-            "metadata": {
-                "total_manufacturers": len(manufacturer_totals),
-                "total_models_tracked": len(bev_rankings) + len(phev_rankings),
-                "data_source": "Market Intelligence Aggregation",
-                "last_updated": datetime.now().isoformat()
-            }
-        }
-        
-        print(f"Generated rankings for {period}")
-        print(f"  BEV models: {len(bev_rankings)}")
-        print(f"  PHEV models: {len(phev_rankings)}")
-        print(f"  Total manufacturers: {len(manufacturer_totals)}")
-        
-        return rankings_data
+        return bev_rankings, phev_rankings
     
-    def _calculate_manufacturer_totals(self, bev_rankings: List[Dict], phev_rankings: List[Dict]) -> Dict[str, Dict[str, int]]:
-        """Calculate total sales by manufacturer"""
-        totals = {}
-        
-        # BEV sales
-        for item in bev_rankings:
-            mfr = item["manufacturer"]
-            if mfr not in totals:
-                totals[mfr] = {"bev": 0, "phev": 0, "total": 0}
-            totals[mfr]["bev"] += item["sales_units"]
-        
-        # PHEV sales
-        for item in phev_rankings:
-            mfr = item["manufacturer"]
-            if mfr not in totals:
-                totals[mfr] = {"bev": 0, "phev": 0, "total": 0}
-            totals[mfr]["phev"] += item["sales_units"]
-        
-        # Calculate totals
-        for mfr in totals:
-            totals[mfr]["total"] = totals[mfr]["bev"] + totals[mfr]["phev"]
-        
-        return totals
+    def _calculate_manufacturer_totals(self, manufacturer_tree: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+        """Calculate total sales by manufacturer (brand level of the tree)"""
+        return {
+            mfr: {"bev": node["bev"], "phev": node["phev"], "total": node["total"]}
+            for mfr, node in manufacturer_tree["brands"].items()
+        }
     
     def _calculate_regional_breakdown(self, bev_rankings: List[Dict], phev_rankings: List[Dict]) -> Dict[str, Dict[str, int]]:
         """Calculate sales by region"""
@@ -448,22 +507,23 @@ class EVRankingsGenerator:
     
     def save_rankings(self, rankings_data: Dict[str, Any]) -> tuple:
         """Save rankings to current and historical files"""
+        # A snapshot that fails validation must not reach history, where later runs read it
+        check_snapshot(rankings_data, source="generated rankings")
+        
         # Ensure directories exist
         os.makedirs(self.output_dir, exist_ok=True)
         os.makedirs(self.history_dir, exist_ok=True)
         
         # Save current rankings
         current_path = os.path.join(self.output_dir, "ev_rankings_latest.json")
-        with open(current_path, "w", encoding="utf-8") as f:
-            json.dump(rankings_data, f, indent=2, ensure_ascii=False)
+        dump_json(rankings_data, current_path)
         
         print(f"Current rankings saved to: {current_path}")
         
         # Save historical snapshot
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         history_path = os.path.join(self.history_dir, f"ev_rankings_{timestamp}.json")
-        with open(history_path, "w", encoding="utf-8") as f:
-            json.dump(rankings_data, f, indent=2, ensure_ascii=False)
+        dump_json(rankings_data, history_path)
         
         print(f"Historical snapshot saved to: {history_path}")
         
@@ -0,0 +1,164 @@
+"""
+EV Currency Normalization - Converts regional revenue to USD with cached FX tables
+Rates come from a local, versioned reference file and are cached in memory by
+date; whole revenue columns are converted at once and memoized per snapshot
+"""
+import bisect
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FXRateTable:
+    """Versioned FX rate table with per-date lookup cache"""
+    
+    # Rates older than this on the requested date are reported as stale
+    # unless the table declares its own valid_until
+    MAX_RATE_AGE_DAYS = 92
+    
+    # Bound on the per-date lookup cache; it is cleared when full
+    MAX_CACHED_DATES = 64
+    
+    # Loaded tables shared across instances: path -> (modification time, table)
+    _loaded: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+    
+    def __init__(self, path: str = None):
+        """Initialize table from the FX reference file"""
+        if path is None:
+            path = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "data", "reference", "fx_rates.json"
+            )
+        self.path = path
+        self.version = None
+        self.base = "USD"
+        self.effective_dates: List[str] = []
+        self.rates: Dict[str, Dict[str, float]] = {}
+        self.valid_until: Optional[str] = None
+        # Modification time of the loaded reference file, None while missing
+        self.loaded_mtime: Optional[int] = None
+        self._by_date: Dict[str, Dict[str, float]] = {}
+        self._stale_warned: set = set()
+        self.refresh()
+    
+    def refresh(self) -> bool:
+        """Reload the reference file if it changed, returning False when it is missing"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            print(f"Warning: FX rates not found at {self.path}")
+            self.loaded_mtime = None
+            self.effective_dates, self.rates = [], {}
+            return False
+        if mtime == self.loaded_mtime:
+            return True
+        
+        cached = self._loaded.get(self.path)
+        if cached is None or cached[0] != mtime:
+            with open(self.path, "r", encoding="utf-8") as f:
+                cached = self._loaded[self.path] = (mtime, json.load(f))
+        table = cached[1]
+        
+        self.version = table.get("version")
+        self.base = table.get("base", "USD")
+        self.effective_dates = sorted(table["rates"])
+        self.rates = table["rates"]
+        self.valid_until = table.get("valid_until") or (
+            datetime.strptime(self.effective_dates[-1], "%Y-%m-%d") + timedelta(days=self.MAX_RATE_AGE_DAYS)
+        ).strftime("%Y-%m-%d")
+        self.loaded_mtime = mtime
+        self._by_date.clear()
+        return True
+    
+    def rates_for(self, as_of: str) -> Dict[str, float]:
+        """Return the rates in effect on a date (YYYY-MM-DD)"""
+        cached = self._by_date.get(as_of)
+        if cached is not None:
+            return cached
+        
+        if not self.effective_dates:
+            raise ValueError(f"No FX rates loaded from {self.path}")
+        position = bisect.bisect_right(self.effective_dates, as_of)
+        if position == 0:
+            raise ValueError(f"No FX rates in effect on {as_of} (table starts {self.effective_dates[0]})")
+        if as_of > self.valid_until and as_of not in self._stale_warned:
+            self._stale_warned.add(as_of)
+            print(f"Warning: FX rates for {as_of} are past the table's coverage ({self.valid_until}); "
+                  f"using the {self.effective_dates[-1]} rates")
+        
+        rates = self.rates[self.effective_dates[position - 1]]
+        if len(self._by_date) >= self.MAX_CACHED_DATES:
+            self._by_date.clear()
+        self._by_date[as_of] = rates
+        return rates
+    
+    def convert_column(self, amounts: List[float], currencies: List[str], as_of: str) -> List[float]:
+        """Convert a column of amounts in mixed currencies to the base currency"""
+        rates = self.rates_for(as_of)
+        
+        # Resolve each distinct currency once, then convert the column in one pass
+        factors = {}
+        for currency in set(currencies):
+            if currency not in rates:
+                raise ValueError(f"No {currency} rate in effect on {as_of}")
+            factors[currency] = 1.0 / rates[currency]
+        
+        return [amount * factors[currency] for amount, currency in zip(amounts, currencies)]
+
+
+class CurrencyNormalizer:
+    """Fills revenue_usd_millions for ranking rows reported in local currencies"""
+    
+    # Bound on memoized snapshot conversions; the memo is cleared when full
+    MAX_MEMO_ENTRIES = 16
+    
+    def __init__(self, table: FXRateTable = None):
+        """Initialize normalizer with an FX rate table"""
+        self.table = table or FXRateTable()
+        self._memo: Dict[Tuple[Any, ...], List[float]] = {}
+    
+    def normalize_rankings(self, rows: List[Dict], as_of: str, snapshot_key: Any = None) -> List[Dict]:
+        """
+        Convert every row's revenue_by_currency_millions to USD in place
+        Rows without local-currency revenue keep their revenue_usd_millions
+        """
+        local_rows = [row for row in rows if row.get("revenue_by_currency_millions")]
+        if not local_rows:
+            return rows
+        if not self.table.refresh():
+            # Same as missing market totals: warn and leave the rows as reported
+            print("Warning: Revenue in local currencies left unconverted")
+            return rows
+        
+        memo_key = (snapshot_key, self.table.version, self.table.loaded_mtime, as_of) if snapshot_key is not None else None
+        revenue_usd = self._memo.get(memo_key) if memo_key is not None else None
+        
+        if revenue_usd is None:
+            # Flatten all (row, currency) amounts into one column for conversion
+            owners, amounts, currencies = [], [], []
+            for index, row in enumerate(local_rows):
+                for currency, amount in row["revenue_by_currency_millions"].items():
+                    owners.append(index)
+                    amounts.append(amount)
+                    currencies.append(currency)
+            
+            converted = self.table.convert_column(amounts, currencies, as_of)
+            
+            revenue_usd = [0.0] * len(local_rows)
+            for index, value in zip(owners, converted):
+                revenue_usd[index] += value
+            
+            if memo_key is not None:
+                if len(self._memo) >= self.MAX_MEMO_ENTRIES:
+                    self._memo.clear()
+                self._memo[memo_key] = revenue_usd
+        
+        for row, value in zip(local_rows, revenue_usd):
+            row["revenue_usd_millions"] = int(round(value))
+        
+        return rows
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+EV Digest Report - Renders a weekly Markdown and HTML digest of the pipeline outputs
+Covers overview, movers, alerts, regional summaries and top news; each section
+is cached by a hash of its inputs so reruns only re-render what changed
+"""
+import hashlib
+import html
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.json_backend import load_json, dump_json, write_atomic
+
+
+def _md_table(headers: List[str], rows: List[List[Any]]) -> str:
+    """Render a Markdown table"""
+    lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
+    for row in rows:
+        lines.append("| " + " | ".join(str(cell).replace("|", "\\|") for cell in row) + " |")
+    return "\n".join(lines)
+
+
+def _html_table(headers: List[str], rows: List[List[Any]]) -> str:
+    """Render an HTML table"""
+    head = "".join(f"<th>{html.escape(str(h))}</th>" for h in headers)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(str(cell))}</td>" for cell in row) + "</tr>"
+        for row in rows
+    )
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def _signed(value: Optional[float], suffix: str = "") -> str:
+    """Format a change with its sign, or a dash when unknown"""
+    if value is None:
+        return "-"
+    return f"{value:+,}{suffix}" if isinstance(value, int) else f"{value:+,.1f}{suffix}"
+
+
+class DigestReportGenerator:
+    """Builds the digest from news, rankings and delta files with per-section caching"""
+    
+    TOP_MOVERS = 5
+    TOP_NEWS = 10
+    
+    SEVERITY_ORDER = {"high": 0, "medium": 1, "info": 2, "low": 3}
+    IMPACT_ORDER = {"high": 0, "medium": 1, "low": 2}
+    
+    def __init__(self, data_dir: str = None, output_dir: str = None):
+        """Initialize generator with data and report directories"""
+        if data_dir is None:
+            data_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "data"
+            )
+        if output_dir is None:
+            output_dir = os.path.join(data_dir, "reports")
+        
+        self.data_dir = data_dir
+        self.output_dir = output_dir
+        self.cache_path = os.path.join(output_dir, "digest_sections.json")
+        self.markdown_path = os.path.join(output_dir, "ev_digest_latest.md")
+        self.html_path = os.path.join(output_dir, "ev_digest_latest.html")
+        
+        # Section name, input extractor and renderer, in report order; extractors
+        # keep only what a section shows so unrelated changes leave it cached
+        self.sections: List[Tuple[str, Callable[[Dict], Any], Callable[[Any], Tuple[str, str]]]] = [
+            ("overview", self._overview_inputs, self._render_overview),
+            ("movers", self._movers_inputs, self._render_movers),
+            ("alerts", self._alerts_inputs, self._render_alerts),
+            ("regions", self._regions_inputs, self._render_regions),
+            ("news", self._news_inputs, self._render_news)
+        ]
+    
+    def _load(self, filename: str) -> Dict[str, Any]:
+        """Load a data file, or an empty document if it is missing"""
+        path = os.path.join(self.data_dir, filename)
+        if not os.path.exists(path):
+            print(f"Warning: {filename} not found, its sections will be empty")
+            return {}
+        return load_json(path)
+    
+    def load_sources(self) -> Dict[str, Dict[str, Any]]:
+        """Load the pipeline outputs the digest reads"""
+        return {
+            "news": self._load("ev_news_latest.json"),
+            "rankings": self._load("ev_rankings_latest.json"),
+            "delta": self._load("ev_rankings_delta.json")
+        }
+    
+    def _overview_inputs(self, sources: Dict) -> Dict[str, Any]:
+        """Periods and headline counts"""
+        delta = sources["delta"]
+        return {
+            "current_period": delta.get("current_period") or sources["rankings"].get("period"),
+            "previous_period": delta.get("previous_period"),
+            "summary": delta.get("summary", {}),
+            "market_statistics": sources["rankings"].get("market_statistics", {}),
+            "total_articles": sources["news"].get("total_articles", 0)
+        }
+    
+    def _movers_inputs(self, sources: Dict) -> Dict[str, Any]:
+        """Largest model and manufacturer sales changes"""
+        delta = sources["delta"]
+        models = [
+            d for d in delta.get("bev_model_deltas", []) + delta.get("phev_model_deltas", [])
+            if d.get("sales_change") is not None
+        ]
+        columns = ("manufacturer", "model", "vehicle_type", "current_rank", "rank_change",
+                   "current_sales", "sales_change", "sales_change_percent")
+        pick = lambda d: [d.get(c) for c in columns]
+        
+        models.sort(key=lambda d: d["sales_change"], reverse=True)
+        gainers = [pick(d) for d in models[:self.TOP_MOVERS] if d["sales_change"] > 0]
+        losers = [pick(d) for d in reversed(models[-self.TOP_MOVERS:]) if d["sales_change"] < 0]
+        manufacturers = sorted(delta.get("manufacturer_deltas", []), key=lambda d: abs(d.get("total_change", 0)), reverse=True)
+        return {
+            "gainers": gainers,
+            "losers": losers,
+            "manufacturers": [
+                [d["manufacturer"], d["current_total"], d["total_change"], d.get("total_change_percent")]
+                for d in manufacturers[:self.TOP_MOVERS] if d.get("total_change")
+            ]
+        }
+    
+    def _alerts_inputs(self, sources: Dict) -> List[Dict[str, str]]:
+        """Alerts ordered by severity"""
+        alerts = sources["delta"].get("alerts", [])
+        return sorted(alerts, key=lambda a: self.SEVERITY_ORDER.get(a.get("severity"), len(self.SEVERITY_ORDER)))
+    
+    def _regions_inputs(self, sources: Dict) -> Dict[str, Any]:
+        """Regional news summaries and sales breakdown"""
+        return {
+            "summaries": sources["news"].get("regional_summaries", {}),
+            "sales": sources["rankings"].get("regional_breakdown", {})
+        }
+    
+    def _news_inputs(self, sources: Dict) -> List[Dict[str, Any]]:
+        """Highest-impact, most recent articles"""
+        articles = [
+            item for items in sources["news"].get("news_by_region", {}).values() for item in items
+        ]
+        articles.sort(key=lambda a: a.get("date") or "", reverse=True)
+        articles.sort(key=lambda a: self.IMPACT_ORDER.get(a.get("impact"), len(self.IMPACT_ORDER)))
+        fields = ("title", "url", "source", "date", "region", "manufacturer", "category", "impact")
+        return [{f: article.get(f) for f in fields} for article in articles[:self.TOP_NEWS]]
+    
+    def _render_overview(self, data: Dict[str, Any]) -> Tuple[str, str]:
+        """Render the overview as (markdown, html)"""
+        summary = data["summary"]
+        stats = data["market_statistics"]
+        comparison = (f"{data['previous_period']} → {data['current_period']}"
+                      if data["previous_period"] else f"{data['current_period']} (no previous period)")
+        rows = [
+            ["Comparison", comparison],
+            ["EV sales tracked", f"{stats.get('total_ev_sales', 0):,}"],
+            ["BEV / PHEV split", f"{stats.get('bev_market_share', 0)}% / {stats.get('phev_market_share', 0)}%"],
+            ["Alerts", f"{summary.get('total_alerts', 0)} ({summary.get('high_severity_alerts', 0)} high)"],
+            ["Significant changes", summary.get("significant_changes", 0)],
+            ["Anomalies", summary.get("anomalies", 0)],
+            ["News articles", data["total_articles"]]
+        ]
+        return (
+            "## Overview\n\n" + _md_table(["Metric", "Value"], rows),
+            "<h2>Overview</h2>" + _html_table(["Metric", "Value"], rows)
+        )
+    
+    def _render_movers(self, data: Dict[str, Any]) -> Tuple[str, str]:
+        """Render gainers, decliners and manufacturer changes"""
+        headers = ["Model", "Type", "Rank", "Rank change", "Sales", "Change", "Change %"]
+        to_rows = lambda entries: [
+            [f"{mfr} {model}", vtype, f"#{rank}", _signed(rank_change), f"{sales:,}",
+             _signed(change), _signed(percent, "%")]
+            for mfr, model, vtype, rank, rank_change, sales, change, percent in entries
+        ]
+        mfr_headers = ["Manufacturer", "Total sales", "Change", "Change %"]
+        mfr_rows = [[name, f"{total:,}", _signed(change), _signed(percent, "%")]
+                    for name, total, change, percent in data["manufacturers"]]
+        
+        markdown, markup = ["## Movers"], ["<h2>Movers</h2>"]
+        for title, headers_, rows in (("Top gainers", headers, to_rows(data["gainers"])),
+                                      ("Top decliners", headers, to_rows(data["losers"])),
+                                      ("Manufacturers", mfr_headers, mfr_rows)):
+            markdown.append(f"### {title}\n\n" + (_md_table(headers_, rows) if rows else "No changes."))
+            markup.append(f"<h3>{title}</h3>" + (_html_table(headers_, rows) if rows else "<p>No changes.</p>"))
+        return "\n\n".join(markdown), "".join(markup)
+    
+    def _render_alerts(self, alerts: List[Dict[str, str]]) -> Tuple[str, str]:
+        """Render the alert list"""
+        if not alerts:
+            return "## Alerts\n\nNo alerts this period.", "<h2>Alerts</h2><p>No alerts this period.</p>"
+        markdown = "## Alerts\n\n" + "\n".join(
+            f"- **{a['severity'].upper()}** {a['message']}" for a in alerts
+        )
+        markup = "<h2>Alerts</h2><ul>" + "".join(
+            f"<li><strong>{html.escape(a['severity'].upper())}</strong> {html.escape(a['message'])}</li>"
+            for a in alerts
+        ) + "</ul>"
+        return markdown, markup
+    
+    def _render_regions(self, data: Dict[str, Any]) -> Tuple[str, str]:
+        """Render regional sales and news summaries"""
+        sales_rows = [
+            [region, f"{totals.get('bev', 0):,}", f"{totals.get('phev', 0):,}", f"{totals.get('total', 0):,}"]
+            for region, totals in data["sales"].items()
+        ]
+        headers = ["Region", "BEV", "PHEV", "Total"]
+        markdown = ["## Regions"]
+        markup = ["<h2>Regions</h2>"]
+        if sales_rows:
+            markdown.append(_md_table(headers, sales_rows))
+            markup.append(_html_table(headers, sales_rows))
+        for region, summary in data["summaries"].items():
+            markdown.append(f"**{region}**: {summary}")
+            markup.append(f"<p><strong>{html.escape(region)}</strong>: {html.escape(summary)}</p>")
+        return "\n\n".join(markdown), "".join(markup)
+    
+    def _render_news(self, articles: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """Render the top news list"""
+        if not articles:
+            return "## Top News\n\nNo news this period.", "<h2>Top News</h2><p>No news this period.</p>"
+        markdown = "## Top News\n\n" + "\n".join(
+            f"- [{a['title']}]({a['url']}) — {a['source']}, {(a['date'] or '')[:10]} "
+            f"({a['region']}, {a['category']}, {a['impact']} impact)"
+            for a in articles
+        )
+        markup = "<h2>Top News</h2><ul>" + "".join(
+            f"<li><a href=\"{html.escape(a['url'] or '')}\">{html.escape(a['title'])}</a> — "
+            f"{html.escape(a['source'] or '')}, {html.escape((a['date'] or '')[:10])} "
+            f"({html.escape(a['region'] or '')}, {html.escape(a['category'] or '')}, "
+            f"{html.escape(a['impact'] or '')} impact)</li>"
+            for a in articles
+        ) + "</ul>"
+        return markdown, markup
+    
+    def _load_cache(self) -> Dict[str, Dict[str, str]]:
+        """Load rendered sections from the previous run"""
+        if not os.path.exists(self.cache_path):
+            return {}
+        return load_json(self.cache_path)
+    
+    def render(self) -> Dict[str, Any]:
+        """Render every section, reusing cached output when its inputs are unchanged"""
+        sources = self.load_sources()
+        cache = self._load_cache()
+        sections = {}
+        rendered = []
+        
+        for name, inputs, renderer in self.sections:
+            data = inputs(sources)
+            digest = hashlib.sha1(
+                json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+            ).hexdigest()
+            
+            cached = cache.get(name)
+            if cached and cached.get("hash") == digest:
+                sections[name] = cached
+                continue
+            
+            markdown, markup = renderer(data)
+            sections[name] = {"hash": digest, "markdown": markdown, "html": markup}
+            rendered.append(name)
+        
+        return {"sections": sections, "rendered": rendered, "period": self._overview_inputs(sources)["current_period"]}
+    
+    def write(self, report: Dict[str, Any]) -> Tuple[str, str]:
+        """Assemble the sections into Markdown and HTML files"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        title = f"EV Market Intelligence Digest — {report['period'] or 'latest'}"
+        generated = f"Generated {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        sections = [report["sections"][name] for name, _, _ in self.sections]
+        
+        markdown = f"# {title}\n\n_{generated}_\n\n" + "\n\n".join(s["markdown"] for s in sections) + "\n"
+        markup = (
+            "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+            f"<title>{html.escape(title)}</title></head><body>"
+            f"<h1>{html.escape(title)}</h1><p><em>{generated}</em></p>"
+            + "".join(s["html"] for s in sections) + "</body></html>\n"
+        )
+        
+        write_atomic(markdown.encode("utf-8"), self.markdown_path)
+        write_atomic(markup.encode("utf-8"), self.html_path)
+        
+        # Written last, so a failed write leaves sections to be re-rendered rather than marked done
+        dump_json(report["sections"], self.cache_path)
+        return self.markdown_path, self.html_path
+    
+    def run(self) -> Tuple[str, str]:
+        """Main execution method"""
+        print("=" * 60)
+        print("EV Digest Report - Starting")
+        print("=" * 60)
+        
+        report = self.render()
+        markdown_path, html_path = self.write(report)
+        
+        reused = len(self.sections) - len(report["rendered"])
+        print(f"Rendered {len(report['rendered'])} sections ({', '.join(report['rendered']) or 'none'}), reused {reused}")
+        
+        print("=" * 60)
+        print("EV Digest Report - Complete")
+        print(f"Markdown: {markdown_path}")
+        print(f"HTML: {html_path}")
+        print("=" * 60)
+        
+        return markdown_path, html_path
+
+
+if __name__ == "__main__":
+    generator = DigestReportGenerator()
+    generator.run()
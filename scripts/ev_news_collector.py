@@ -4,7 +4,6 @@ EV News Collector - Collects electric vehicle news from multiple sources
 Covers: USA, Europe, Asia (ex-Japan), Japan
 Manufacturers: Tesla, BYD, NIO, Xpeng, Li Auto, Geely, BMW, VW, etc.
 """
-import json
 import os
 import sys
 from datetime import datetime, timedelta
@@ -13,6 +12,10 @@ from typing import List, Dict, Any
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from scripts.json_backend import dump_json
+from scripts.news_classifier import NewsBatchClassifier
+from scripts.records import NewsItem
+
 
 class EVNewsCollector:
     """Collects and categorizes EV market news from global sources"""
@@ -90,9 +93,10 @@ class EVNewsCollector:
                 "data"
             )
         self.output_dir = output_dir
-        self.news_items: List[Dict[str, Any]] = []
+        self.news_items: List[NewsItem] = []
+        self.classifier = NewsBatchClassifier()
     
-    def collect_news(self) -> List[Dict[str, Any]]:
+    def collect_news(self) -> List[NewsItem]:
         """
         Collect news from various sources
         In production, this would use search APIs or web scraping
@@ -111,22 +115,25 @@ class EVNewsCollector:
         
         for region, templates in news_templates.items():
             for i, template in enumerate(templates):
-                news_item = {
-                    "title": template["title"],
-                    "url": template.get("url", f"https://example.com/{region.lower()}-{i}"),
-                    "source": template.get("source", "Industry Source"),
-                    "date": date_range[i % len(date_range)].isoformat(),
-                    "description": template["description"],
-                    "region": region,
-                    "manufacturer": template.get("manufacturer", "Multiple"),
-                    "category": template.get("category", "general"),
-                    "impact": template.get("impact", "medium"),
-                    "original_language": template.get("original_language", "en"),
-                    "original_title": template.get("original_title"),
-                    "original_url": template.get("original_url")
-                }
+                news_item = NewsItem(
+                    title=template["title"],
+                    url=template.get("url", f"https://example.com/{region.lower()}-{i}"),
+                    source=template.get("source", "Industry Source"),
+                    date=date_range[i % len(date_range)].isoformat(),
+                    description=template["description"],
+                    region=region,
+                    manufacturer=template.get("manufacturer", "Multiple"),
+                    category=None,  # Labeled by batch classification below
+                    impact=None,
+                    original_language=template.get("original_language", "en"),
+                    original_title=template.get("original_title"),
+                    original_url=template.get("original_url")
+                )
                 news_items.append(news_item)
         
+        # Feeds do not carry category/impact, so label the whole batch at once
+        self.classifier.label(news_items)
+        
         self.news_items = news_items
         print(f"Collected {len(news_items)} news articles")
         return news_items
@@ -318,7 +325,7 @@ class EVNewsCollector:
             ]
         }
     
-    def categorize_news(self) -> Dict[str, List[Dict[str, Any]]]:
+    def categorize_news(self) -> Dict[str, List[NewsItem]]:
         """Categorize news by region"""
         categorized = {region: [] for region in self.REGIONS}
         
@@ -329,7 +336,7 @@ class EVNewsCollector:
         
         return categorized
     
-    def generate_summaries(self, categorized_news: Dict[str, List[Dict[str, Any]]]) -> Dict[str, str]:
+    def generate_summaries(self, categorized_news: Dict[str, List[NewsItem]]) -> Dict[str, str]:
         """Generate regional summaries"""
         summaries = {}
         
@@ -367,7 +374,7 @@ class EVNewsCollector:
         
         return summaries
     
-    def save_results(self, categorized_news: Dict[str, List[Dict[str, Any]]], 
+    def save_results(self, categorized_news: Dict[str, List[NewsItem]], 
                     summaries: Dict[str, str]) -> str:
         """Save results to JSON file"""
         output = {
@@ -385,13 +392,9 @@ class EVNewsCollector:
             }
         }
         
-        # Ensure output directory exists
-        os.makedirs(self.output_dir, exist_ok=True)
-        
         # Save to file
         output_path = os.path.join(self.output_dir, "ev_news_latest.json")
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        dump_json(output, output_path)
         
         print(f"Results saved to: {output_path}")
         return output_path
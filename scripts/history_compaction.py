@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+EV History Compaction - Tiered retention and downsampling for ranking snapshots
+Keeps every snapshot in the recent window, then one per week, one per month,
+and one per quarter beyond that
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.history_store import list_snapshots, load_index, parse_snapshot_timestamp, write_index
+
+
+class HistoryCompactor:
+    """Downsamples old ranking snapshots and rewrites the history index"""
+    
+    # Retention tiers by snapshot age
+    RECENT_DAYS = 28  # Keep every snapshot
+    WEEKLY_DAYS = 182  # Keep the latest snapshot per ISO week
+    MONTHLY_DAYS = 730  # Keep the latest snapshot per month, per quarter beyond
+    
+    # The delta stage compares the two newest snapshots, so they always survive
+    MIN_KEEP_LATEST = 2
+    
+    def __init__(self, history_dir: str = None):
+        """Initialize compactor with history directory"""
+        if history_dir is None:
+            history_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "history"
+            )
+        self.history_dir = history_dir
+    
+    def _bucket(self, timestamp: datetime, now: datetime) -> Tuple[str, Optional[Tuple[int, ...]]]:
+        """Return the retention tier and downsampling bucket for a snapshot"""
+        age = now - timestamp
+        
+        if age <= timedelta(days=self.RECENT_DAYS):
+            return "recent", None
+        if age <= timedelta(days=self.WEEKLY_DAYS):
+            year, week, _ = timestamp.isocalendar()
+            return "weekly", (year, week)
+        if age <= timedelta(days=self.MONTHLY_DAYS):
+            return "monthly", (timestamp.year, timestamp.month)
+        return "quarterly", (timestamp.year, (timestamp.month - 1) // 3 + 1)
+    
+    def plan(self, now: datetime = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Decide which snapshots to keep and which to drop"""
+        if now is None:
+            now = datetime.now()
+        
+        snapshots = [(path, parse_snapshot_timestamp(path)) for path in list_snapshots(self.history_dir)]
+        protected = {path for path, _ in snapshots[-self.MIN_KEEP_LATEST:]}
+        
+        keep = []
+        drop = []
+        newest_in_bucket = {}
+        
+        # Newest first, so the first snapshot seen in a bucket is the one kept
+        for path, timestamp in reversed(snapshots):
+            tier, bucket = self._bucket(timestamp, now)
+            
+            if path in protected or bucket is None:
+                keep.append({"path": path, "timestamp": timestamp, "tier": tier})
+            elif (tier, bucket) not in newest_in_bucket:
+                newest_in_bucket[(tier, bucket)] = path
+                keep.append({"path": path, "timestamp": timestamp, "tier": tier})
+            else:
+                drop.append({"path": path, "timestamp": timestamp, "tier": tier})
+        
+        keep.reverse()
+        drop.reverse()
+        return {"keep": keep, "drop": drop}
+    
+    def _index_entry(self, item: Dict[str, Any], previous: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Build an index entry, reusing the previous entry to avoid reopening the snapshot"""
+        filename = os.path.basename(item["path"])
+        entry = previous.get(filename)
+        
+        if entry is None:
+            with open(item["path"], "r", encoding="utf-8") as f:
+                period = json.load(f).get("period")
+            entry = {
+                "filename": filename,
+                "timestamp": item["timestamp"].isoformat(),
+                "period": period
+            }
+        
+        # Size and mtime let the history store skip stat'ing indexed snapshots
+        stat = os.stat(item["path"])
+        return dict(entry, tier=item["tier"], size_bytes=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    
+    def compact(self, now: datetime = None, dry_run: bool = False) -> Dict[str, Any]:
+        """Drop downsampled snapshots and rewrite the index"""
+        plan = self.plan(now)
+        previous = {entry["filename"]: entry for entry in load_index(self.history_dir).get("snapshots", [])}
+        
+        result = {
+            "kept": len(plan["keep"]),
+            "dropped": [os.path.basename(item["path"]) for item in plan["drop"]],
+            "dry_run": dry_run
+        }
+        
+        if dry_run:
+            return result
+        
+        # Publish the new index before deleting, so it never lists a missing file
+        entries = [self._index_entry(item, previous) for item in plan["keep"]]
+        write_index(self.history_dir, entries)
+        
+        for item in plan["drop"]:
+            os.remove(item["path"])
+        
+        return result
+    
+    def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Main execution method"""
+        print("=" * 60)
+        print("EV History Compaction - Starting")
+        print("=" * 60)
+        
+        result = self.compact(dry_run=dry_run)
+        
+        action = "Would drop" if dry_run else "Dropped"
+        print(f"Kept {result['kept']} snapshots")
+        print(f"{action} {len(result['dropped'])} snapshots")
+        for filename in result["dropped"]:
+            print(f"  - {filename}")
+        
+        print("=" * 60)
+        print("EV History Compaction - Complete")
+        print("=" * 60)
+        
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact ranking history with tiered retention")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be dropped")
+    args = parser.parse_args()
+    
+    compactor = HistoryCompactor()
+    compactor.run(dry_run=args.dry_run)
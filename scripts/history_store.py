@@ -0,0 +1,151 @@
+"""
+EV History Store - Shared access to historical ranking snapshots
+Lists snapshot files in time order, maintains the history index and keeps
+parsed snapshots in memory so repeated loads only read new or changed files.
+Files the index describes are not stat'ed again while the directory listing is
+no newer than the index; once it is (a snapshot added, replaced by a git
+checkout or pull, or removed), every file is stat'ed and compared
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.json_backend import dump_json
+
+
+SNAPSHOT_PATTERN = re.compile(r"^ev_rankings_(\d{8}_\d{6})\.json$")
+INDEX_FILENAME = "index.json"
+
+
+def parse_snapshot_timestamp(path: str) -> Optional[datetime]:
+    """Parse the timestamp encoded in a snapshot filename"""
+    match = SNAPSHOT_PATTERN.match(os.path.basename(path))
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S")
+
+
+def list_snapshots(history_dir: str) -> List[str]:
+    """List snapshot paths, oldest first"""
+    if not os.path.isdir(history_dir):
+        return []
+    names = [name for name in os.listdir(history_dir) if SNAPSHOT_PATTERN.match(name)]
+    return [os.path.join(history_dir, name) for name in sorted(names)]
+
+
+def load_index(history_dir: str) -> Dict[str, Any]:
+    """Load the history index, or an empty index if none has been written"""
+    index_path = os.path.join(history_dir, INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        return {"updated_at": None, "snapshots": []}
+    
+    with open(index_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_index(history_dir: str, snapshots: List[Dict[str, Any]]) -> str:
+    """Write the history index atomically so readers never see a partial file"""
+    path = dump_json({
+        "updated_at": datetime.now().isoformat(),
+        "snapshots": snapshots
+    }, os.path.join(history_dir, INDEX_FILENAME))
+    # The rename updates the directory's mtime; touch the index so it is not older than the listing it describes
+    os.utime(path)
+    return path
+
+
+class HistoryStore:
+    """In-memory cache of parsed history snapshots, reloading only new or changed files"""
+    
+    def __init__(self, history_dir: str):
+        """Initialize store for a history directory"""
+        self.history_dir = history_dir
+        self._cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        # Index signature and the snapshot signatures it records, by filename
+        self._index: Tuple[Optional[Tuple[int, int]], Dict[str, Tuple[int, int]]] = (None, {})
+        # Stages on scheduler threads share one store
+        self._lock = threading.Lock()
+    
+    def _signature(self, path: str) -> Tuple[int, int]:
+        """Return modification time and size of a snapshot file"""
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _indexed_signatures(self) -> Dict[str, Tuple[int, int]]:
+        """Snapshot signatures recorded in the history index, reread only when the index changes"""
+        try:
+            signature = self._signature(os.path.join(self.history_dir, INDEX_FILENAME))
+        except FileNotFoundError:
+            return {}
+        if self._index[0] != signature:
+            entries = load_index(self.history_dir).get("snapshots", [])
+            self._index = (signature, {
+                entry["filename"]: (entry["mtime_ns"], entry["size_bytes"])
+                for entry in entries if "mtime_ns" in entry and "size_bytes" in entry
+            })
+        return self._index[1]
+    
+    def _signatures(self, paths: List[str]) -> Dict[str, Tuple[int, int]]:
+        """
+        Signatures of snapshot files; only those missing from the index are stat'ed
+        When the directory changed after the index was written, indexed entries
+        may have been rewritten in place, so every file is stat'ed instead
+        """
+        indexed = self._indexed_signatures()
+        if indexed and self._index[0][0] < os.stat(self.history_dir).st_mtime_ns:
+            indexed = {}
+        return {path: indexed.get(os.path.basename(path)) or self._signature(path) for path in paths}
+    
+    def version(self) -> str:
+        """Return a hash identifying the current set of snapshot files"""
+        with self._lock:
+            paths = list_snapshots(self.history_dir)
+            signatures = self._signatures(paths)
+        
+        digest = hashlib.sha1()
+        for path in paths:
+            mtime, size = signatures[path]
+            digest.update(f"{os.path.basename(path)}:{mtime}:{size};".encode("utf-8"))
+        return digest.hexdigest()
+    
+    def load_all(self) -> List[Tuple[datetime, Dict[str, Any]]]:
+        """Return (timestamp, snapshot) pairs, oldest first"""
+        with self._lock:
+            paths = list_snapshots(self.history_dir)
+            signatures = self._signatures(paths)
+            snapshots = []
+            
+            for path in paths:
+                cached = self._cache.get(path)
+                if cached is None or cached[0] != signatures[path]:
+                    with open(path, "r", encoding="utf-8") as f:
+                        cached = (signatures[path], json.load(f))
+                    self._cache[path] = cached
+                snapshots.append((parse_snapshot_timestamp(path), cached[1]))
+            
+            # Forget snapshots removed by compaction
+            for path in set(self._cache) - set(paths):
+                self._cache.pop(path, None)
+        
+        return snapshots
+
+
+_stores: Dict[str, HistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_history_store(history_dir: str) -> HistoryStore:
+    """Return the shared store for a history directory"""
+    key = os.path.abspath(history_dir)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = HistoryStore(key)
+        return _stores[key]
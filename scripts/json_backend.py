@@ -0,0 +1,98 @@
+"""
+EV JSON Backend - Shared JSON reading and writing for the pipeline stages
+Uses orjson when it is installed and the standard library otherwise; writes
+are atomic and can be pretty (indented) or compact. Both backends write the
+same bytes, except for floats in exponent notation (1e16 vs 1e+16), which
+parse back to the same value
+"""
+import json
+import os
+import sys
+import tempfile
+from typing import Any
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+BACKENDS = ["orjson", "json"] if orjson is not None else ["json"]
+DEFAULT_BACKEND = BACKENDS[0]
+
+PRETTY = "pretty"
+COMPACT = "compact"
+
+
+def _default(value: Any) -> Any:
+    """Serialize objects that provide a dict form, such as records"""
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return to_dict()
+
+
+def dumps(data: Any, mode: str = PRETTY, backend: str = None) -> bytes:
+    """Serialize data to UTF-8 JSON bytes"""
+    if mode not in (PRETTY, COMPACT):
+        raise ValueError(f"Unknown JSON output mode: {mode}")
+    backend = backend or DEFAULT_BACKEND
+    
+    if backend == "orjson":
+        try:
+            return orjson.dumps(data, default=_default, option=orjson.OPT_INDENT_2 if mode == PRETTY else 0)
+        except orjson.JSONEncodeError:
+            # orjson rejects non-string keys and integers wider than 64 bits; the standard library does not
+            backend = "json"
+    if backend == "json":
+        if mode == PRETTY:
+            return json.dumps(data, indent=2, ensure_ascii=False, default=_default).encode("utf-8")
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+    raise ValueError(f"Unknown JSON backend: {backend}")
+
+
+def loads(raw: bytes, backend: str = None) -> Any:
+    """Parse UTF-8 JSON bytes"""
+    backend = backend or DEFAULT_BACKEND
+    
+    if backend == "orjson":
+        return orjson.loads(raw)
+    if backend == "json":
+        return json.loads(raw.decode("utf-8"))
+    raise ValueError(f"Unknown JSON backend: {backend}")
+
+
+def load_json(path: str, backend: str = None) -> Any:
+    """Load a JSON file"""
+    with open(path, "rb") as f:
+        return loads(f.read(), backend)
+
+
+def write_atomic(raw: bytes, path: str) -> str:
+    """Write bytes to a temp file and rename it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=os.path.splitext(path)[1], dir=directory)
+    try:
+        # mkstemp creates owner-only files; published data stays world-readable
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+            # Flushed to disk before the rename so a crash never leaves an empty file in place
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    
+    return path
+
+
+def dump_json(data: Any, path: str, mode: str = PRETTY, backend: str = None) -> str:
+    """Write data to a temp file and rename it into place"""
+    return write_atomic(dumps(data, mode, backend), path)
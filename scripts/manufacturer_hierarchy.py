@@ -0,0 +1,105 @@
+"""
+EV Manufacturer Hierarchy - Rolls brand sales up to manufacturers and groups
+Loads the brand -> manufacturer -> group ownership tree from a reference file
+and computes BEV/PHEV/regional totals for every level in one bottom-up pass
+"""
+import json
+import os
+import sys
+from typing import Dict, List, Any, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _empty_node() -> Dict[str, Any]:
+    """A tree node with zero totals"""
+    return {"bev": 0, "phev": 0, "total": 0, "regions": {}}
+
+
+def _add_into(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    """Add a child node's totals into its parent"""
+    target["bev"] += source["bev"]
+    target["phev"] += source["phev"]
+    target["total"] += source["total"]
+    regions = target["regions"]
+    for region, units in source["regions"].items():
+        regions[region] = regions.get(region, 0) + units
+
+
+class ManufacturerHierarchy:
+    """Brand ownership tree with precomputed rollups"""
+    
+    def __init__(self, reference_path: str = None):
+        """Initialize hierarchy from the ownership reference file"""
+        if reference_path is None:
+            reference_path = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "data", "reference", "manufacturer_hierarchy.json"
+            )
+        self.reference_path = reference_path
+        self.brand_parent: Dict[str, str] = {}
+        self.manufacturer_parent: Dict[str, str] = {}
+        # Lowercased brand and manufacturer names to their manufacturer
+        self._canonical: Dict[str, str] = {}
+        
+        if os.path.exists(reference_path):
+            with open(reference_path, "r", encoding="utf-8") as f:
+                groups = json.load(f).get("groups", {})
+            for group, manufacturers in groups.items():
+                for manufacturer, brands in manufacturers.items():
+                    self.manufacturer_parent[manufacturer] = group
+                    self._canonical[manufacturer.lower()] = manufacturer
+                    for brand in brands:
+                        self.brand_parent[brand] = manufacturer
+                        self._canonical.setdefault(brand.lower(), manufacturer)
+        else:
+            print(f"Warning: Manufacturer hierarchy not found at {reference_path}, using flat rollups")
+    
+    def resolve(self, brand: str) -> Tuple[str, str]:
+        """Return the (manufacturer, group) a brand belongs to; unknown brands are their own parents"""
+        manufacturer = self.brand_parent.get(brand, brand)
+        return manufacturer, self.manufacturer_parent.get(manufacturer, manufacturer)
+    
+    def canonical(self, name: str) -> str:
+        """Manufacturer a brand or manufacturer name refers to, ignoring case; unknown names are returned as-is"""
+        return self._canonical.get(name.lower(), name)
+    
+    def aggregate(self, bev_rankings: List[Dict], phev_rankings: List[Dict]) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute totals for every brand, manufacturer and group
+        Rows are summed into brands once; each level is then folded into its parent
+        """
+        brands: Dict[str, Dict[str, Any]] = {}
+        for key, rows in (("bev", bev_rankings), ("phev", phev_rankings)):
+            for row in rows:
+                node = brands.get(row["manufacturer"])
+                if node is None:
+                    node = brands[row["manufacturer"]] = _empty_node()
+                node[key] += row["sales_units"]
+                node["total"] += row["sales_units"]
+                regions = node["regions"]
+                for region, units in row.get("regions", {}).items():
+                    regions[region] = regions.get(region, 0) + units
+        
+        manufacturers: Dict[str, Dict[str, Any]] = {}
+        for brand, node in brands.items():
+            manufacturer, _ = self.resolve(brand)
+            node["manufacturer"] = manufacturer
+            parent = manufacturers.get(manufacturer)
+            if parent is None:
+                parent = manufacturers[manufacturer] = dict(_empty_node(), brands=[])
+            _add_into(parent, node)
+            parent["brands"].append(brand)
+        
+        groups: Dict[str, Dict[str, Any]] = {}
+        for manufacturer, node in manufacturers.items():
+            group = self.manufacturer_parent.get(manufacturer, manufacturer)
+            node["group"] = group
+            parent = groups.get(group)
+            if parent is None:
+                parent = groups[group] = dict(_empty_node(), manufacturers=[])
+            _add_into(parent, node)
+            parent["manufacturers"].append(manufacturer)
+        
+        return {"brands": brands, "manufacturers": manufacturers, "groups": groups}
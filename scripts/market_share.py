@@ -0,0 +1,146 @@
+"""
+EV Market Share Calculator - Computes model and manufacturer market shares
+Divides sales by total-market denominators (global and per region) loaded from
+a reference file, producing share tables the dashboard and delta stage read as-is
+"""
+import json
+import os
+import sys
+from typing import Dict, List, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def group_regions(values: Dict[str, Any], region_groups: Optional[Dict[str, List[str]]]) -> Dict[str, Any]:
+    """
+    Sum per-region values into region groups
+    Regions outside every group keep their own name; values are numbers or
+    dicts of numbers (e.g. per vehicle type)
+    """
+    if not region_groups:
+        return values
+    
+    grouped: Dict[str, Any] = {}
+    members = {region: group for group, regions in region_groups.items() for region in regions}
+    for region, value in values.items():
+        group = members.get(region, region)
+        if isinstance(value, dict):
+            target = grouped.setdefault(group, {})
+            for key, amount in value.items():
+                target[key] = target.get(key, 0) + amount
+        else:
+            grouped[group] = grouped.get(group, 0) + value
+    return grouped
+
+
+def share_matrix(units: List[List[float]], denominators: List[float]) -> List[List[float]]:
+    """Divide every column of a units matrix by its denominator, as percentages"""
+    scales = [100.0 / d if d else 0.0 for d in denominators]
+    return [[round(u * s, 2) for u, s in zip(row, scales)] for row in units]
+
+
+class MarketShareCalculator:
+    """Builds global and per-region share tables for models and manufacturers"""
+    
+    VEHICLE_TYPES = ["BEV", "PHEV"]
+    
+    def __init__(self, reference_path: str = None, region_groups: Dict[str, List[str]] = None):
+        """Initialize calculator with the market totals reference file and optional region groups"""
+        if reference_path is None:
+            reference_path = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "data", "reference", "market_totals.json"
+            )
+        self.reference_path = reference_path
+        self.region_groups = region_groups
+    
+    def load_denominators(self) -> Optional[Dict[str, Any]]:
+        """Load total-market denominators"""
+        if not os.path.exists(self.reference_path):
+            print(f"Warning: Market totals not found at {self.reference_path}")
+            return None
+        
+        with open(self.reference_path, "r", encoding="utf-8") as f:
+            reference = json.load(f)
+        
+        reference["regions"] = group_regions(reference.get("regions", {}), self.region_groups)
+        return reference
+    
+    def compute(self, bev_rankings: List[Dict], phev_rankings: List[Dict]) -> Optional[Dict[str, Any]]:
+        """Compute share tables for every model and manufacturer"""
+        reference = self.load_denominators()
+        if reference is None:
+            return None
+        
+        regions = list(reference.get("regions", {}))
+        columns = ["global"] + regions
+        
+        tables = {
+            "reference_period": reference.get("period"),
+            "columns": columns,
+            "models": {},
+            "manufacturers": {}
+        }
+        combined_units: Dict[str, List[float]] = {}
+        
+        for vehicle_type, rows in zip(self.VEHICLE_TYPES, (bev_rankings, phev_rankings)):
+            denominators = [reference["global"].get(vehicle_type, 0)] + [
+                reference["regions"][region].get(vehicle_type, 0) for region in regions
+            ]
+            
+            # One row per model: global units followed by units per region
+            model_units = [
+                [row["sales_units"]] + [row.get("regions", {}).get(region, 0) for region in regions]
+                for row in rows
+            ]
+            
+            manufacturer_units: Dict[str, List[float]] = {}
+            for row, units in zip(rows, model_units):
+                totals = manufacturer_units.setdefault(row["manufacturer"], [0] * len(columns))
+                combined = combined_units.setdefault(row["manufacturer"], [0] * len(columns))
+                for j, u in enumerate(units):
+                    totals[j] += u
+                    combined[j] += u
+            
+            model_shares = share_matrix(model_units, denominators)
+            tables["models"][vehicle_type] = [
+                {
+                    "manufacturer": row["manufacturer"],
+                    "model": row["model"],
+                    "shares": dict(zip(columns, shares))
+                }
+                for row, shares in zip(rows, model_shares)
+            ]
+            
+            names = list(manufacturer_units)
+            tables["manufacturers"][vehicle_type] = {
+                name: dict(zip(columns, shares))
+                for name, shares in zip(names, share_matrix([manufacturer_units[n] for n in names], denominators))
+            }
+        
+        # Combined EV share uses the BEV + PHEV market as denominator
+        total_denominators = [
+            sum(reference["global"].get(t, 0) for t in self.VEHICLE_TYPES)
+        ] + [
+            sum(reference["regions"][region].get(t, 0) for t in self.VEHICLE_TYPES) for region in regions
+        ]
+        names = list(combined_units)
+        tables["manufacturers"]["total"] = {
+            name: dict(zip(columns, shares))
+            for name, shares in zip(names, share_matrix([combined_units[n] for n in names], total_denominators))
+        }
+        
+        return tables
+    
+    def apply(self, bev_rankings: List[Dict], phev_rankings: List[Dict]) -> Optional[Dict[str, Any]]:
+        """Compute share tables and set each ranking row's global market share from them"""
+        tables = self.compute(bev_rankings, phev_rankings)
+        if tables is None:
+            return None
+        
+        for vehicle_type, rows in zip(self.VEHICLE_TYPES, (bev_rankings, phev_rankings)):
+            for row, entry in zip(rows, tables["models"][vehicle_type]):
+                row["market_share_percent"] = round(entry["shares"]["global"], 1)
+        
+        return tables
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+EV News Archive - Keeps every collected article in compressed segments
+Each run writes its articles to a new, never rewritten segment per month, as
+zlib-compressed blocks (one per region), and records every block's offset,
+region and date range in the segment's index, so a query only seeks to and
+decompresses matching blocks. The archive is committed with each update, and
+immutable per-run files are stored once by git and cannot conflict in a rebase
+"""
+import argparse
+import hashlib
+import itertools
+import os
+import re
+import sys
+import zlib
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.json_backend import COMPACT, dump_json, dumps, load_json, loads
+
+
+MONTH_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+INDEX_SUFFIX = ".idx.json"
+
+
+def article_key(article: Dict[str, Any]) -> str:
+    """Short stable key identifying an article across runs"""
+    identity = article.get("url") or f"{article.get('title')}|{article.get('date')}"
+    return hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+
+
+class NewsArchive:
+    """Appends news to and reads news from monthly compressed segments"""
+    
+    COMPRESSION_LEVEL = 9
+    
+    def __init__(self, data_dir: str = None, archive_dir: str = None):
+        """Initialize archive with the news data directory and archive location"""
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        
+        if data_dir is None:
+            data_dir = os.path.join(base_dir, "data")
+        if archive_dir is None:
+            archive_dir = os.path.join(base_dir, "archive", "news")
+        
+        self.data_dir = data_dir
+        self.archive_dir = archive_dir
+        # Blocks decompressed by the last query
+        self.blocks_read = 0
+    
+    def _segments(self, month: str) -> List[Tuple[str, str]]:
+        """
+        (index path, segment path) of a month's segments, oldest first
+        Archives written before per-run segments have one appended <month>.seg
+        """
+        segments = []
+        legacy_index = os.path.join(self.archive_dir, f"{month}{INDEX_SUFFIX}")
+        if os.path.exists(legacy_index):
+            segments.append((legacy_index, os.path.join(self.archive_dir, f"{month}.seg")))
+        
+        month_dir = os.path.join(self.archive_dir, month)
+        if os.path.isdir(month_dir):
+            for name in sorted(os.listdir(month_dir)):
+                if name.endswith(INDEX_SUFFIX):
+                    run = name[:-len(INDEX_SUFFIX)]
+                    segments.append((os.path.join(month_dir, name), os.path.join(month_dir, f"{run}.seg")))
+        return segments
+    
+    def load_index(self, month: str) -> Dict[str, Any]:
+        """Merge the indexes of a month's segments; each block records its segment file"""
+        blocks, keys = [], []
+        for index_path, segment_path in self._segments(month):
+            index = load_json(index_path)
+            keys.extend(index["keys"])
+            blocks.extend(dict(block, segment=segment_path) for block in index["blocks"])
+        return {"month": month, "blocks": blocks, "keys": keys}
+    
+    def months(self) -> List[str]:
+        """Months with an archive segment, oldest first"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        months = set()
+        for name in os.listdir(self.archive_dir):
+            if name.endswith(INDEX_SUFFIX):
+                months.add(name[:-len(INDEX_SUFFIX)])
+            elif MONTH_PATTERN.match(name) and os.path.isdir(os.path.join(self.archive_dir, name)):
+                months.add(name)
+        return sorted(months)
+    
+    def append(self, articles: List[Dict[str, Any]], fallback_date: str = None) -> Dict[str, int]:
+        """
+        Archive articles not yet archived in a new segment per month, one block per region
+        A segment's index is written only after its blocks are on disk, so an
+        interrupted append leaves at most an unreferenced segment behind
+        """
+        fallback_date = fallback_date or datetime.now().isoformat()
+        run = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        groups: Dict[str, Dict[str, List[Tuple[str, Dict[str, Any]]]]] = {}
+        for article in articles:
+            key = article_key(article)
+            if not article.get("date"):
+                # Stored with the date it was filed under, so date range queries find it
+                article = dict(article, date=fallback_date, date_estimated=True)
+            groups.setdefault(article["date"][:7], {}).setdefault(
+                article.get("region") or "Global", []
+            ).append((key, article))
+        
+        stats = {"archived": 0, "duplicates": 0, "blocks": 0}
+        
+        for month, regions in sorted(groups.items()):
+            # The lookup set is built once per month and run from every segment's keys
+            known = set(self.load_index(month)["keys"])
+            new_keys: List[str] = []
+            new_blocks: List[Tuple[Dict[str, Any], bytes]] = []
+            
+            for region, items in sorted(regions.items()):
+                fresh = []
+                for key, article in items:
+                    if key in known:
+                        stats["duplicates"] += 1
+                        continue
+                    known.add(key)
+                    new_keys.append(key)
+                    fresh.append(article)
+                if not fresh:
+                    continue
+                
+                fresh.sort(key=lambda item: item["date"])
+                payload = b"\n".join(dumps(article, COMPACT) for article in fresh)
+                block = zlib.compress(payload, self.COMPRESSION_LEVEL)
+                new_blocks.append(({
+                    "region": region,
+                    "first_date": fresh[0]["date"],
+                    "last_date": fresh[-1]["date"],
+                    "articles": len(fresh),
+                    "length": len(block),
+                    "raw_length": len(payload),
+                    "appended_at": datetime.now().isoformat()
+                }, block))
+            
+            if not new_blocks:
+                continue
+            
+            month_dir = os.path.join(self.archive_dir, month)
+            os.makedirs(month_dir, exist_ok=True)
+            offset = 0
+            with open(os.path.join(month_dir, f"{run}.seg"), "xb") as f:
+                for entry, block in new_blocks:
+                    f.write(block)
+                    entry["offset"] = offset
+                    offset += len(block)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            dump_json({"month": month, "run": run, "blocks": [entry for entry, _ in new_blocks], "keys": new_keys},
+                      os.path.join(month_dir, f"{run}{INDEX_SUFFIX}"), mode=COMPACT)
+            stats["archived"] += sum(entry["articles"] for entry, _ in new_blocks)
+            stats["blocks"] += len(new_blocks)
+        
+        return stats
+    
+    def query(self, region: str = None, start: str = None, end: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield archived articles for a region and inclusive date range
+        Dates are ISO strings compared by prefix, so '2026-03' covers all of March
+        """
+        self.blocks_read = 0
+        for month in self.months():
+            if start and month < start[:7]:
+                continue
+            if end and month > end[:7]:
+                continue
+            
+            blocks = [
+                block for block in self.load_index(month)["blocks"]
+                if (region is None or block["region"] == region)
+                and (not start or block["last_date"][:len(start)] >= start)
+                and (not end or block["first_date"][:len(end)] <= end)
+            ]
+            if not blocks:
+                continue
+            
+            # Blocks are listed segment by segment, so each segment is opened once
+            for segment_path, segment_blocks in itertools.groupby(blocks, key=lambda block: block["segment"]):
+                with open(segment_path, "rb") as f:
+                    for block in segment_blocks:
+                        f.seek(block["offset"])
+                        raw = zlib.decompress(f.read(block["length"]))
+                        self.blocks_read += 1
+                        for line in raw.split(b"\n"):
+                            article = loads(line)
+                            # Articles archived without a date were filed under the block's dates
+                            date = article.get("date") or block["first_date"]
+                            if start and date[:len(start)] < start:
+                                continue
+                            if end and date[:len(end)] > end:
+                                continue
+                            yield article
+    
+    def run(self) -> Dict[str, int]:
+        """Archive the latest collected news"""
+        print("=" * 60)
+        print("EV News Archive - Starting")
+        print("=" * 60)
+        
+        news_path = os.path.join(self.data_dir, "ev_news_latest.json")
+        news = load_json(news_path)
+        articles = [item for items in news.get("news_by_region", {}).values() for item in items]
+        stats = self.append(articles, fallback_date=news.get("generated_at"))
+        
+        print(f"Archived {stats['archived']} articles in {stats['blocks']} blocks "
+              f"({stats['duplicates']} already archived)")
+        print("=" * 60)
+        print("EV News Archive - Complete")
+        print(f"Output: {self.archive_dir}")
+        print("=" * 60)
+        
+        return stats
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Archive collected news or query the archive")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("append", help="Archive data/ev_news_latest.json (default)")
+    query_parser = subparsers.add_parser("query", help="Read archived articles")
+    query_parser.add_argument("--region", default=None, help="Region, e.g. Japan")
+    query_parser.add_argument("--from", dest="start", default=None, help="First date, e.g. 2026-03 or 2026-03-15")
+    query_parser.add_argument("--to", dest="end", default=None, help="Last date (inclusive)")
+    args = parser.parse_args()
+    
+    archive = NewsArchive()
+    if args.command != "query":
+        archive.run()
+        return
+    
+    count = 0
+    for article in archive.query(args.region, args.start, args.end):
+        print(f"{article.get('date', '')[:10]}  [{article.get('region')}] {article.get('title')}")
+        count += 1
+    print(f"{count} articles from {archive.blocks_read} blocks")
+
+
+if __name__ == "__main__":
+    main()
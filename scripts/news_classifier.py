@@ -0,0 +1,253 @@
+"""
+EV News Classifier - Labels news articles with category and impact in batches
+Uses a compiled keyword rule set: every keyword is a feature with weights per
+category. A batch is tokenized into one sparse term matrix (feature columns of
+per-article counts), and the matrix is scored column by column, so each matched
+feature's weights are applied to all of its articles at once
+"""
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Any, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Keyword phrases per category with their weight
+CATEGORY_KEYWORDS = {
+    "sales": {
+        "sales": 1.0, "sale": 1.0, "sold": 1.0, "deliveries": 1.5, "delivery": 1.5, "delivers": 1.5,
+        "delivered": 1.5, "registrations": 1.5, "best-selling": 2.0, "units": 0.5, "tops": 0.5,
+        "charts": 1.0, "monthly": 0.5,
+        "销量": 1.5, "交付": 1.5, "销售": 1.0
+    },
+    "production": {
+        "production": 1.5, "produce": 1.0, "produces": 1.0, "produced": 1.0, "capacity": 1.0,
+        "ramps up": 1.5, "ramp up": 1.5, "gigafactory": 1.0, "factory": 1.0, "assembly": 1.0,
+        "output": 0.5,
+        "产能": 1.5, "生产": 1.0
+    },
+    "recall": {
+        "recall": 3.0, "recalls": 3.0, "recalled": 3.0, "defect": 1.5, "defects": 1.5,
+        "safety issue": 1.5, "fire risk": 1.5, "software issue": 1.0,
+        "召回": 3.0
+    },
+    "financial": {
+        "profit": 2.0, "profits": 2.0, "profitable": 2.0, "profitability": 2.0, "net profit": 1.0,
+        "net loss": 2.0, "revenue": 1.5, "earnings": 2.0, "margin": 1.0, "margins": 1.0,
+        "losses": 1.0, "quarterly results": 1.5,
+        "净利润": 2.0, "盈利": 2.0, "营收": 1.5
+    },
+    "investment": {
+        "invest": 2.0, "invests": 2.0, "invested": 2.0, "investment": 2.0, "investments": 2.0,
+        "funding": 1.5, "secures": 1.0, "raises": 0.5, "stake": 1.0, "acquisition": 1.5,
+        "battery plant": 1.0,
+        "投资": 2.0, "融资": 1.5
+    },
+    "policy": {
+        "tariff": 2.0, "tariffs": 2.0, "subsidy": 2.0, "subsidies": 2.0, "regulation": 1.5,
+        "regulations": 1.5, "policy": 1.5, "tax credit": 2.0, "tax credits": 2.0, "incentive": 1.5,
+        "incentives": 1.5, "mandate": 1.5, "emission rules": 1.5, "emissions targets": 1.5,
+        "government": 1.0, "ban": 1.0,
+        "政策": 2.0, "补贴": 2.0, "关税": 2.0
+    },
+    "launch": {
+        "launch": 2.0, "launches": 2.0, "launched": 2.0, "unveils": 2.0, "unveiled": 2.0,
+        "debut": 1.5, "debuts": 1.5, "introduces": 1.0, "new model": 1.0, "expands": 0.5,
+        "enters": 0.5,
+        "发布": 2.0, "上市": 2.0
+    },
+    "infrastructure": {
+        "charging": 2.0, "charger": 2.0, "chargers": 2.0, "swap station": 2.5, "swap stations": 2.5,
+        "battery swap": 2.0, "station": 1.0, "stations": 1.0, "supercharger": 2.0,
+        "换电站": 2.5, "充电": 2.0
+    },
+    "awards": {
+        "award": 2.5, "awards": 2.5, "wins": 1.0, "prize": 2.0, "named best": 2.0,
+        "of the year": 1.5,
+        "大奖": 2.5, "荣获": 2.0
+    },
+    "market": {
+        "market share": 2.5, "global": 1.0, "globally": 1.0, "worldwide": 1.5, "industry": 0.5,
+        "car sales": 1.0, "global car": 1.0, "global ev": 1.5,
+        "市场份额": 2.5
+    },
+    "technology": {
+        "autonomous": 2.0, "self-driving": 2.0, "solid-state": 2.0, "battery technology": 1.5,
+        "chemistry": 1.0, "software update": 1.0, "ai": 1.0,
+        "自动驾驶": 2.0, "智能": 1.0
+    }
+}
+
+# Keyword phrases that raise or lower an article's impact score
+IMPACT_KEYWORDS = {
+    "record": 1.5, "milestone": 1.5, "surpasses": 1.5, "surpassed": 1.5, "billion": 1.5,
+    "doubles": 0.5, "first": 1.0, "best-selling": 1.0, "profitable": 1.0, "profitability": 1.0,
+    "exceeds": 0.5, "exceed": 0.5, "global": 0.5, "globally": 0.5, "million": 0.5,
+    "minor": -1.0, "small": -0.5, "rumor": -1.0, "rumors": -1.0, "considering": -0.5,
+    "突破": 1.5, "亿": 1.5, "首次": 1.0, "领跑": 1.0
+}
+
+# Percentages and currency amounts are impact evidence too
+NUMERIC_IMPACT_PATTERN = re.compile(r"\d+(?:\.\d+)?%|[$€£¥]\s?\d")
+NUMERIC_IMPACT_WEIGHT = 0.5
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+CJK_PATTERN = re.compile(r"[\u4e00-\u9fff]")
+
+# Term matrix column holding the count of numeric impact matches
+NUMERIC_FEATURE = -1
+
+# Longest keyword phrase, in tokens
+MAX_PHRASE_TOKENS = 3
+
+# Baseline impact per category before keyword evidence
+CATEGORY_IMPACT_PRIOR = {
+    "recall": 1.0,
+    "financial": 1.0,
+    "investment": 1.0,
+    "policy": 1.0,
+    "market": 1.0,
+    "sales": 0.5,
+    "infrastructure": 0.5
+}
+
+HIGH_IMPACT_SCORE = 2.0
+LOW_IMPACT_SCORE = 0.0
+
+# Title matches count more than description matches
+TITLE_WEIGHT = 2.0
+
+
+class NewsBatchClassifier:
+    """Assigns category and impact labels to batches of articles"""
+    
+    def __init__(self):
+        """Compile the keyword rule set into a feature vocabulary and weight table"""
+        self.categories = list(CATEGORY_KEYWORDS)
+        
+        # Vocabulary maps each phrase to a feature index; the weight table holds
+        # each feature's per-category weights and its impact weight
+        self.vocabulary: Dict[str, int] = {}
+        self.cjk_vocabulary: Dict[str, int] = {}
+        self.feature_weights: List[List[Tuple[int, float]]] = []
+        self.feature_impact: List[float] = []
+        
+        def feature_index(phrase: str) -> int:
+            target = self.cjk_vocabulary if CJK_PATTERN.search(phrase) else self.vocabulary
+            if phrase not in target:
+                target[phrase] = len(self.feature_weights)
+                self.feature_weights.append([])
+                self.feature_impact.append(0.0)
+            return target[phrase]
+        
+        for category_index, keywords in enumerate(CATEGORY_KEYWORDS.values()):
+            for phrase, weight in keywords.items():
+                self.feature_weights[feature_index(phrase)].append((category_index, weight))
+        for phrase, weight in IMPACT_KEYWORDS.items():
+            self.feature_impact[feature_index(phrase)] = weight
+    
+    def _features(self, text: str, weight: float, row: int, matrix: Dict[int, Dict[int, float]]) -> None:
+        """Add a text's weighted feature counts to its row of the term matrix"""
+        lowered = text.lower()
+        tokens = TOKEN_PATTERN.findall(lowered)
+        vocabulary = self.vocabulary
+        
+        # Look up every 1..3 token phrase in the vocabulary
+        for size in range(1, MAX_PHRASE_TOKENS + 1):
+            for i in range(len(tokens) - size + 1):
+                phrase = tokens[i] if size == 1 else " ".join(tokens[i:i + size])
+                feature = vocabulary.get(phrase)
+                if feature is not None:
+                    column = matrix.setdefault(feature, {})
+                    column[row] = column.get(row, 0.0) + weight
+        
+        # CJK text has no word boundaries, so its keywords are substring matches
+        if CJK_PATTERN.search(text):
+            for phrase, feature in self.cjk_vocabulary.items():
+                occurrences = text.count(phrase)
+                if occurrences:
+                    column = matrix.setdefault(feature, {})
+                    column[row] = column.get(row, 0.0) + weight * occurrences
+        
+        numeric = len(NUMERIC_IMPACT_PATTERN.findall(text))
+        if numeric:
+            column = matrix.setdefault(NUMERIC_FEATURE, {})
+            column[row] = column.get(row, 0.0) + weight * numeric
+    
+    def term_matrix(self, items: List[Dict[str, Any]]) -> Dict[int, Dict[int, float]]:
+        """
+        Build the sparse term matrix of a batch
+        Maps each matched feature to its weighted count in every article (row)
+        that contains it; features no article matched have no column
+        """
+        matrix: Dict[int, Dict[int, float]] = {}
+        
+        for row, item in enumerate(items):
+            title = " ".join(filter(None, [item.get("title"), item.get("original_title")]))
+            self._features(title, TITLE_WEIGHT, row, matrix)
+            self._features(item.get("description") or "", 1.0, row, matrix)
+        
+        return matrix
+    
+    def score_batch(self, items: List[Dict[str, Any]]) -> List[List[float]]:
+        """
+        Return the score vector of every article
+        Each row holds one score per category followed by the impact evidence.
+        The batch's term matrix is scored in one pass over its columns
+        """
+        n_categories = len(self.categories)
+        scores = [[0.0] * (n_categories + 1) for _ in items]
+        
+        for feature, column in self.term_matrix(items).items():
+            if feature == NUMERIC_FEATURE:
+                for row, count in column.items():
+                    scores[row][n_categories] += NUMERIC_IMPACT_WEIGHT * min(count, TITLE_WEIGHT)
+                continue
+            
+            weights = self.feature_weights[feature]
+            impact = self.feature_impact[feature]
+            for row, count in column.items():
+                vector = scores[row]
+                for category_index, weight in weights:
+                    vector[category_index] += weight * count
+                # Repeating an impact keyword adds no further evidence
+                if impact:
+                    vector[n_categories] += impact * min(count, TITLE_WEIGHT)
+        
+        return scores
+    
+    def classify_batch(self, items: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        """Return (category, impact) labels for a batch of articles"""
+        labels = []
+        
+        for row in self.score_batch(items):
+            impact_evidence = row.pop()
+            best = max(range(len(row)), key=row.__getitem__)
+            category = self.categories[best] if row[best] > 0 else "general"
+            
+            impact_score = CATEGORY_IMPACT_PRIOR.get(category, 0.0) + impact_evidence
+            if impact_score >= HIGH_IMPACT_SCORE:
+                impact = "high"
+            elif impact_score < LOW_IMPACT_SCORE:
+                impact = "low"
+            else:
+                impact = "medium"
+            
+            labels.append((category, impact))
+        
+        return labels
+    
+    def label(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Set category and impact on every article in place"""
+        started = time.monotonic()
+        
+        for item, (category, impact) in zip(items, self.classify_batch(items)):
+            item["category"] = category
+            item["impact"] = impact
+        
+        elapsed = time.monotonic() - started
+        print(f"Classified {len(items)} articles in {elapsed * 1000:.1f} ms")
+        return items
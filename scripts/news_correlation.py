@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+EV News Correlation - Links ranking deltas to the news that preceded them
+Indexes archived and latest articles by manufacturer with dates kept sorted,
+so each delta finds its related articles with a binary-searched time range
+instead of scanning every article
+"""
+import os
+import sys
+import zlib
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.json_backend import dump_json, load_json
+from scripts.manufacturer_hierarchy import ManufacturerHierarchy
+from scripts.news_archive import NewsArchive, article_key
+from scripts.sales_forecast import following_quarter, parse_period
+
+
+IMPACT_WEIGHTS = {"high": 3, "medium": 2, "low": 1}
+
+# Extra weight for an article naming the delta's model
+MODEL_MENTION_WEIGHT = 3
+
+# Delta sections whose entries get related articles
+DELTA_SECTIONS = ["bev_model_deltas", "phev_model_deltas", "manufacturer_deltas"]
+
+
+class NewsIndex:
+    """Articles grouped by manufacturer, each group sorted by day"""
+    
+    def __init__(self, articles: List[Dict[str, Any]], canonical: Callable[[str], str] = None):
+        """
+        Build the per-manufacturer date index
+        canonical maps a manufacturer or brand name to the key it is grouped under
+        """
+        self._canonical = canonical or (lambda name: name)
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for article in articles:
+            if article.get("manufacturer") and article.get("date"):
+                grouped.setdefault(self._key(article["manufacturer"]), []).append(article)
+        
+        # Dates are compared as days, since articles may carry a date or a full timestamp
+        self._dates: Dict[str, List[str]] = {}
+        self._articles: Dict[str, List[Dict[str, Any]]] = {}
+        for manufacturer, items in grouped.items():
+            items.sort(key=lambda item: item["date"][:10])
+            self._dates[manufacturer] = [item["date"][:10] for item in items]
+            self._articles[manufacturer] = items
+    
+    def _key(self, manufacturer: str) -> str:
+        """Index key of a manufacturer name"""
+        return self._canonical(manufacturer).lower()
+    
+    def between(self, manufacturer: str, start: str, end: str) -> List[Dict[str, Any]]:
+        """Articles about a manufacturer dated on or between the days of start and end"""
+        key = self._key(manufacturer)
+        dates = self._dates.get(key)
+        if not dates:
+            return []
+        return self._articles[key][bisect_left(dates, start[:10]):bisect_right(dates, end[:10])]
+
+
+class NewsCorrelator:
+    """Attaches preceding news to rankings delta entries"""
+    
+    # How far back before the delta an article counts as related
+    LOOKBACK_DAYS = 90
+    RELATED_ARTICLES = 3
+    
+    def __init__(self, data_dir: str = None, archive_dir: str = None):
+        """Initialize correlator with the data directory and news archive"""
+        if data_dir is None:
+            data_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "data"
+            )
+        self.data_dir = data_dir
+        self.archive = NewsArchive(data_dir=data_dir, archive_dir=archive_dir)
+        # Articles and deltas may name a brand or its manufacturer (BYD, BYD Auto)
+        self.manufacturer_hierarchy = ManufacturerHierarchy(
+            os.path.join(data_dir, "reference", "manufacturer_hierarchy.json")
+        )
+    
+    def load_articles(self, start: str) -> List[Dict[str, Any]]:
+        """
+        Articles from the archive since start plus the latest collection, deduplicated
+        Correlation is best-effort, so missing or unreadable news files are skipped
+        """
+        articles = {}
+        try:
+            for article in self.archive.query(start=start[:10]):
+                articles[article_key(article)] = article
+        except (OSError, ValueError, zlib.error) as exc:
+            print(f"Warning: Reading the news archive failed: {exc}")
+        
+        news_path = os.path.join(self.data_dir, "ev_news_latest.json")
+        try:
+            news = load_json(news_path) if os.path.exists(news_path) else {}
+        except (OSError, ValueError) as exc:
+            print(f"Warning: Ignoring unreadable {news_path}: {exc}")
+            news = {}
+        for items in news.get("news_by_region", {}).values():
+            for article in items:
+                articles.setdefault(article_key(article), article)
+        
+        return list(articles.values())
+    
+    def window_end(self, delta_data: Dict[str, Any]) -> str:
+        """
+        When the delta's current snapshot was taken
+        Deltas saved before current_generated_at existed use the end of their
+        current period, and the run time only when neither is known
+        """
+        if delta_data.get("current_generated_at"):
+            return delta_data["current_generated_at"]
+        period = parse_period(delta_data.get("current_period"))
+        if period:
+            year, quarter = following_quarter(period)
+            return (datetime(year, 3 * quarter - 2, 1) - timedelta(days=1)).isoformat()
+        return delta_data.get("generated_at") or datetime.now().isoformat()
+    
+    def _related(self, index: NewsIndex, manufacturer: str, model: Optional[str],
+                 start: str, end: str) -> List[Dict[str, Any]]:
+        """Rank a delta's candidate articles by impact and model mention"""
+        model_name = model.lower() if model else None
+        scored = []
+        for article in index.between(manufacturer, start, end):
+            score = IMPACT_WEIGHTS.get(article.get("impact"), 0)
+            text = f"{article.get('title', '')} {article.get('description', '')}".lower()
+            if model_name and model_name in text:
+                score += MODEL_MENTION_WEIGHT
+            scored.append((score, article["date"][:10], article))
+        
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [
+            {
+                "title": article.get("title"),
+                "url": article.get("url"),
+                "source": article.get("source"),
+                "date": article.get("date"),
+                "category": article.get("category"),
+                "impact": article.get("impact"),
+                "relevance": score
+            }
+            for score, _, article in scored[:self.RELATED_ARTICLES]
+        ]
+    
+    def correlate(self, delta_data: Dict[str, Any]) -> int:
+        """Attach related_news to every delta entry, returning how many got at least one article"""
+        end = self.window_end(delta_data)
+        start = (datetime.fromisoformat(end) - timedelta(days=self.LOOKBACK_DAYS)).isoformat()
+        index = NewsIndex(self.load_articles(start), self.manufacturer_hierarchy.canonical)
+        
+        linked = 0
+        for section in DELTA_SECTIONS:
+            for delta in delta_data.get(section, []):
+                delta["related_news"] = self._related(index, delta["manufacturer"], delta.get("model"), start, end)
+                linked += bool(delta["related_news"])
+        
+        return linked
+    
+    def run(self) -> str:
+        """Re-link the saved delta file to the current news"""
+        print("=" * 60)
+        print("EV News Correlation - Starting")
+        print("=" * 60)
+        
+        delta_path = os.path.join(self.data_dir, "ev_rankings_delta.json")
+        delta_data = load_json(delta_path)
+        linked = self.correlate(delta_data)
+        dump_json(delta_data, delta_path)
+        
+        print(f"Linked related news to {linked} deltas")
+        print("=" * 60)
+        print("EV News Correlation - Complete")
+        print(f"Output: {delta_path}")
+        print("=" * 60)
+        
+        return delta_path
+
+
+if __name__ == "__main__":
+    NewsCorrelator().run()
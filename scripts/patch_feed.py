@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+EV Patch Feed Publisher - Publishes JSON Patch (RFC 6902) updates for data files
+Clients on version N catch up to N+k by applying the patches in order and
+fall back to a full download only when the feed no longer covers their version
+"""
+import copy
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.json_backend import COMPACT, dump_json
+from scripts.publisher import PUBLISHED_DOCUMENTS
+
+
+def _escape(token: str) -> str:
+    """Escape a JSON Pointer reference token"""
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    """Unescape a JSON Pointer reference token"""
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Compute RFC 6902 operations that turn old into new"""
+    if type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+    
+    if isinstance(old, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(make_patch(old[key], value, child))
+        return ops
+    
+    if isinstance(old, list):
+        ops = []
+        common = min(len(old), len(new))
+        for i in range(common):
+            ops.extend(make_patch(old[i], new[i], f"{path}/{i}"))
+        # Remove from the end so earlier indices stay valid
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+        for i in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/-", "value": new[i]})
+        return ops
+    
+    if old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def apply_patch(document: Any, patch: List[Dict[str, Any]]) -> Any:
+    """Apply RFC 6902 add/remove/replace operations, returning a new document"""
+    document = copy.deepcopy(document)
+    
+    for op in patch:
+        if op["path"] == "":
+            if op["op"] in ("add", "replace"):
+                document = copy.deepcopy(op["value"])
+                continue
+            raise ValueError(f"Cannot {op['op']} the document root")
+        
+        tokens = [_unescape(token) for token in op["path"].split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if op["op"] == "add":
+                parent.insert(index, copy.deepcopy(op["value"]))
+            elif op["op"] == "remove":
+                del parent[index]
+            elif op["op"] == "replace":
+                parent[index] = copy.deepcopy(op["value"])
+            else:
+                raise ValueError(f"Unsupported operation: {op['op']}")
+        else:
+            if op["op"] in ("add", "replace"):
+                if op["op"] == "replace" and last not in parent:
+                    raise KeyError(op["path"])
+                parent[last] = copy.deepcopy(op["value"])
+            elif op["op"] == "remove":
+                del parent[last]
+            else:
+                raise ValueError(f"Unsupported operation: {op['op']}")
+    
+    return document
+
+
+class PatchFeedPublisher:
+    """Maintains a versioned feed of JSON patches for the published data files"""
+    
+    DOCUMENTS = PUBLISHED_DOCUMENTS
+    
+    # Number of patch versions kept; older clients do a full download
+    MAX_VERSIONS = 50
+    
+    def __init__(self, data_dir: str = None, feed_dir: str = None):
+        """Initialize publisher with data and feed directories"""
+        if data_dir is None:
+            data_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "data"
+            )
+        if feed_dir is None:
+            feed_dir = os.path.join(data_dir, "feed")
+        self.data_dir = data_dir
+        self.feed_dir = feed_dir
+        self.manifest_path = os.path.join(feed_dir, "manifest.json")
+    
+    def load_manifest(self) -> Dict[str, Any]:
+        """Load the feed manifest, or an empty one for a new feed"""
+        if not os.path.exists(self.manifest_path):
+            return {"version": 0, "oldest_version": 0, "documents": self.DOCUMENTS, "patches": []}
+        
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    
+    def _load(self, path: str) -> Optional[Any]:
+        """Load a JSON file if it exists"""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    
+    def _snapshot_path(self, manifest: Dict[str, Any], name: str) -> str:
+        """Path of the last published copy of a document"""
+        relative = manifest.get("snapshots", {}).get(name)
+        if relative is None:
+            # Feeds from before versioned snapshots kept one flat copy per document
+            relative = os.path.join("snapshots", self.DOCUMENTS[name])
+        return os.path.join(self.feed_dir, relative)
+    
+    def _remove_unreferenced_snapshots(self, manifest: Dict[str, Any]) -> None:
+        """Delete snapshot copies the manifest no longer points to"""
+        snapshot_dir = os.path.join(self.feed_dir, "snapshots")
+        referenced = {os.path.normpath(path).split(os.sep)[1] for path in manifest["snapshots"].values()}
+        for entry in os.listdir(snapshot_dir):
+            if entry not in referenced:
+                path = os.path.join(snapshot_dir, entry)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+    
+    def publish(self) -> Dict[str, Any]:
+        """
+        Diff the current data files against the last published copies and append a version
+        The patch and new document copies are written under the new version first;
+        the manifest write commits them, and a failure before it removes them again
+        """
+        manifest = self.load_manifest()
+        
+        patches = {}
+        current = {}
+        for name, filename in self.DOCUMENTS.items():
+            document = self._load(os.path.join(self.data_dir, filename))
+            if document is None:
+                continue
+            current[name] = document
+            
+            previous = self._load(self._snapshot_path(manifest, name))
+            if previous is None:
+                patch = [{"op": "add", "path": "", "value": document}]
+            else:
+                patch = make_patch(previous, document)
+                # Fall back to a whole-document replace when the diff is not smaller
+                if len(json.dumps(patch, ensure_ascii=False)) >= len(json.dumps(document, ensure_ascii=False)):
+                    patch = [{"op": "replace", "path": "", "value": document}]
+            if patch:
+                patches[name] = patch
+        
+        if not patches:
+            print(f"No changes since feed version {manifest['version']}")
+            return manifest
+        
+        version = manifest["version"] + 1
+        patch_file = f"patches/{version:06d}.json"
+        version_snapshot_dir = os.path.join("snapshots", f"{version:06d}")
+        snapshots = {
+            name: self._snapshot_path(manifest, name)
+            for name in self.DOCUMENTS if name not in patches
+        }
+        
+        try:
+            dump_json({
+                "from_version": version - 1,
+                "version": version,
+                "generated_at": datetime.now().isoformat(),
+                "patches": patches
+            }, os.path.join(self.feed_dir, patch_file), mode=COMPACT)
+            
+            for name in patches:
+                snapshots[name] = os.path.join(self.feed_dir, version_snapshot_dir, self.DOCUMENTS[name])
+                dump_json(current[name], snapshots[name], mode=COMPACT)
+            
+            manifest["patches"].append({
+                "version": version,
+                "file": patch_file,
+                "operations": sum(len(ops) for ops in patches.values())
+            })
+            
+            # Drop patches beyond the retention window
+            expired = manifest["patches"][:-self.MAX_VERSIONS]
+            manifest["patches"] = manifest["patches"][-self.MAX_VERSIONS:]
+            manifest["version"] = version
+            manifest["oldest_version"] = manifest["patches"][0]["version"] - 1
+            manifest["documents"] = self.DOCUMENTS
+            manifest["snapshots"] = {
+                name: os.path.relpath(path, self.feed_dir)
+                for name, path in snapshots.items() if os.path.exists(path)
+            }
+            manifest["updated_at"] = datetime.now().isoformat()
+            
+            # The manifest is written last so clients never see a version without its patch
+            dump_json(manifest, self.manifest_path)
+        except BaseException:
+            # Nothing refers to the new version yet; remove it so the next run starts clean
+            shutil.rmtree(os.path.join(self.feed_dir, version_snapshot_dir), ignore_errors=True)
+            if os.path.exists(os.path.join(self.feed_dir, patch_file)):
+                os.remove(os.path.join(self.feed_dir, patch_file))
+            raise
+        
+        for entry in expired:
+            expired_path = os.path.join(self.feed_dir, entry["file"])
+            if os.path.exists(expired_path):
+                os.remove(expired_path)
+        self._remove_unreferenced_snapshots(manifest)
+        
+        print(f"Published feed version {version} ({manifest['patches'][-1]['operations']} operations)")
+        return manifest
+    
+    def patches_since(self, client_version: int) -> Optional[List[str]]:
+        """Return patch files a client must apply in order, or None if it needs a full download"""
+        manifest = self.load_manifest()
+        if client_version < manifest["oldest_version"] or client_version > manifest["version"]:
+            return None
+        return [entry["file"] for entry in manifest["patches"] if entry["version"] > client_version]
+    
+    def catch_up(self, documents: Dict[str, Any], client_version: int) -> Optional[Dict[str, Any]]:
+        """Bring a client's documents up to the latest feed version, or None after a gap"""
+        patch_files = self.patches_since(client_version)
+        if patch_files is None:
+            return None
+        
+        documents = dict(documents)
+        for patch_file in patch_files:
+            entry = self._load(os.path.join(self.feed_dir, patch_file))
+            for name, patch in entry["patches"].items():
+                documents[name] = apply_patch(documents.get(name), patch)
+        return documents
+    
+    def run(self) -> Dict[str, Any]:
+        """Main execution method"""
+        print("=" * 60)
+        print("EV Patch Feed Publisher - Starting")
+        print("=" * 60)
+        
+        manifest = self.publish()
+        
+        print("=" * 60)
+        print("EV Patch Feed Publisher - Complete")
+        print(f"Feed version: {manifest['version']} (patches from {manifest['oldest_version']})")
+        print("=" * 60)
+        
+        return manifest
+
+
+if __name__ == "__main__":
+    publisher = PatchFeedPublisher()
+    publisher.run()
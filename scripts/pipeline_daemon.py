@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+EV Pipeline Daemon - Runs the update pipeline from a long-lived process
+Triggers the pipeline on a weekly schedule, a fixed interval or when new
+registration exports arrive, keeps stage caches resident between runs and
+serves health and last-run status over HTTP
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.api_server import build_response, encode_body, read_request
+from scripts.pipeline_scheduler import build_pipeline
+
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+# Default cadence: Tuesday and Friday at 9:00
+DEFAULT_SCHEDULE = "tue,fri@09:00"
+
+
+def parse_schedule(spec: str) -> Tuple[List[int], int, int]:
+    """Parse a 'tue,fri@09:00' schedule into weekday numbers, hour and minute"""
+    try:
+        days, clock = spec.split("@")
+        hour, minute = (int(part) for part in clock.split(":"))
+        weekdays = sorted({WEEKDAYS.index(day.strip().lower()[:3]) for day in days.split(",")})
+    except ValueError:
+        raise ValueError(f"Invalid schedule '{spec}' (expected e.g. {DEFAULT_SCHEDULE})")
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid time in schedule '{spec}'")
+    return weekdays, hour, minute
+
+
+def next_scheduled_run(now: datetime, weekdays: List[int], hour: int, minute: int) -> datetime:
+    """Return the first scheduled time strictly after now"""
+    for offset in range(8):
+        candidate = (now + timedelta(days=offset)).replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if candidate.weekday() in weekdays and candidate > now:
+            return candidate
+    raise ValueError("Schedule has no weekdays")
+
+
+def directory_signature(paths: List[str]) -> Tuple[Tuple[str, int, int], ...]:
+    """Return (path, mtime, size) for every file below the given directories"""
+    entries = []
+    for root_path in paths:
+        for root, _, files in os.walk(root_path):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(entries))
+
+
+class PipelineDaemon:
+    """Keeps one pipeline resident and runs it on schedule or on new input files"""
+    
+    def __init__(self, base_dir: str = None, dashboard_dir: str = None, schedule: str = DEFAULT_SCHEDULE,
+                 interval: float = None, watch_paths: List[str] = None, poll_interval: float = 30.0,
+                 host: str = "127.0.0.1", port: int = 8766, max_workers: int = 4):
+        """Initialize daemon with the pipeline location, triggers and status endpoint"""
+        if base_dir is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        if watch_paths is None:
+            watch_paths = [os.path.join(base_dir, "ingest")]
+        
+        self.base_dir = base_dir
+        self.schedule = parse_schedule(schedule) if interval is None else None
+        self.interval = interval
+        self.watch_paths = watch_paths
+        self.poll_interval = poll_interval
+        self.host = host
+        self.port = port
+        
+        # Built once: stage components and their caches live as long as the daemon
+        self.pipeline = build_pipeline(base_dir=base_dir, dashboard_dir=dashboard_dir, max_workers=max_workers)
+        
+        self.started_at = datetime.now()
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.run_count = 0
+        self._lock = asyncio.Lock()
+    
+    def _schedule_next(self) -> None:
+        """Compute the next scheduled trigger time"""
+        now = datetime.now()
+        if self.interval is not None:
+            self.next_run = now + timedelta(seconds=self.interval)
+        else:
+            self.next_run = next_scheduled_run(now, *self.schedule)
+    
+    async def run_pipeline(self, trigger: str) -> Dict[str, Any]:
+        """Run the pipeline once, never overlapping with another run"""
+        async with self._lock:
+            started = time.monotonic()
+            started_at = datetime.now()
+            print(f"[daemon] Pipeline run triggered by {trigger}")
+            
+            try:
+                results = await asyncio.to_thread(self.pipeline.run)
+                status = "completed" if all(r["status"] == "completed" for r in results.values()) else "failed"
+                error = None
+            except Exception as exc:
+                results, status, error = {}, "failed", str(exc)
+            
+            self.run_count += 1
+            self.last_run = {
+                "trigger": trigger,
+                "status": status,
+                "started_at": started_at.isoformat(),
+                "finished_at": datetime.now().isoformat(),
+                "duration_seconds": round(time.monotonic() - started, 3),
+                "stages": {name: result["status"] for name, result in results.items()},
+                "errors": {name: result["error"] for name, result in results.items() if result.get("error")}
+            }
+            if error:
+                self.last_run["errors"]["pipeline"] = error
+            
+            print(f"[daemon] Pipeline run {status} in {self.last_run['duration_seconds']}s")
+            return self.last_run
+    
+    async def run_schedule(self) -> None:
+        """Trigger the pipeline at every scheduled time or interval"""
+        while True:
+            self._schedule_next()
+            await asyncio.sleep(max(0.0, (self.next_run - datetime.now()).total_seconds()))
+            await self.run_pipeline("schedule" if self.interval is None else "interval")
+    
+    async def watch_inputs(self) -> None:
+        """Trigger the pipeline when files under the watched directories change"""
+        signature = directory_signature(self.watch_paths)
+        pending = None
+        
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = directory_signature(self.watch_paths)
+            
+            # Wait for one quiet poll so half-copied exports are not ingested
+            if current != signature and current == pending:
+                signature = current
+                pending = None
+                await self.run_pipeline("file_change")
+            elif current != signature:
+                pending = current
+    
+    def status(self) -> Dict[str, Any]:
+        """Return daemon and last-run status"""
+        return {
+            "started_at": self.started_at.isoformat(),
+            "uptime_seconds": round((datetime.now() - self.started_at).total_seconds()),
+            "running": self._lock.locked(),
+            "run_count": self.run_count,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "watch_paths": self.watch_paths,
+            "last_run": self.last_run
+        }
+    
+    def handle(self, path: str) -> Tuple[int, Any]:
+        """Route a status request"""
+        if path == "/health":
+            healthy = self.last_run is None or self.last_run["status"] == "completed"
+            return 200, {"status": "ok" if healthy else "degraded", "running": self._lock.locked()}
+        if path == "/status":
+            return 200, self.status()
+        return 404, {"error": f"Unknown endpoint: {path}"}
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer a single status request on a connection"""
+        try:
+            request = await read_request(reader)
+            if request is None:
+                return
+            
+            method, target, headers = request
+            if method != "GET":
+                writer.write(build_response(405, b"", {"Allow": "GET"}))
+                return
+            
+            status, payload = self.handle(urlsplit(target).path)
+            body, response_headers = encode_body(json.dumps(payload, ensure_ascii=False).encode("utf-8"), headers)
+            response_headers["Cache-Control"] = "no-store"
+            writer.write(build_response(status, body, response_headers))
+        except Exception as exc:
+            print(f"[daemon] Error handling request: {exc}")
+            writer.write(build_response(500, json.dumps({"error": "Internal server error"}).encode("utf-8")))
+        finally:
+            try:
+                await writer.drain()
+            finally:
+                writer.close()
+    
+    async def serve(self, run_now: bool = False) -> None:
+        """Serve status and run triggers until cancelled"""
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        tasks = [asyncio.ensure_future(self.run_schedule())]
+        if self.watch_paths:
+            tasks.append(asyncio.ensure_future(self.watch_inputs()))
+        if run_now:
+            tasks.append(asyncio.ensure_future(self.run_pipeline("startup")))
+        
+        print(f"EV Pipeline Daemon status on http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the EV intelligence pipeline as a long-lived daemon")
+    parser.add_argument("--schedule", default=DEFAULT_SCHEDULE, help="Weekly schedule, e.g. tue,fri@09:00")
+    parser.add_argument("--interval", type=float, default=None, help="Run every N seconds instead of the schedule")
+    parser.add_argument("--watch", action="append", default=None,
+                        help="Directory whose changes trigger a run (repeatable, default: ingest/)")
+    parser.add_argument("--no-watch", action="store_true", help="Disable file-change triggers")
+    parser.add_argument("--poll-interval", type=float, default=30.0, help="Seconds between file-change checks")
+    parser.add_argument("--dashboard-dir", default=None, help="Dashboard repository directory")
+    parser.add_argument("--workers", type=int, default=4, help="Worker pool size")
+    parser.add_argument("--host", default="127.0.0.1", help="Status endpoint bind address")
+    parser.add_argument("--port", type=int, default=8766, help="Status endpoint port")
+    parser.add_argument("--run-now", action="store_true", help="Run the pipeline once at startup")
+    args = parser.parse_args()
+    
+    daemon = PipelineDaemon(
+        dashboard_dir=args.dashboard_dir,
+        schedule=args.schedule,
+        interval=args.interval,
+        watch_paths=[] if args.no_watch else args.watch,
+        poll_interval=args.poll_interval,
+        host=args.host,
+        port=args.port,
+        max_workers=args.workers
+    )
+    try:
+        asyncio.run(daemon.serve(run_now=args.run_now))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
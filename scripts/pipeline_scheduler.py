@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+EV Pipeline Scheduler - Runs the update pipeline as a dependency graph of stages
+Each stage declares the files it reads and writes; stages without a data
+dependency between them run in parallel on a worker pool. Completed stages are
+checkpointed so a rerun resumes where a failed run stopped
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Any, Optional, Set
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.ev_news_collector import EVNewsCollector
+from scripts.create_corrected_rankings import EVRankingsGenerator
+from scripts.digest_report import DigestReportGenerator
+from scripts.calculate_rankings_delta import RankingsDeltaCalculator
+from scripts.history_compaction import HistoryCompactor
+from scripts.history_store import INDEX_FILENAME
+from scripts.news_archive import NewsArchive
+from scripts.patch_feed import PatchFeedPublisher
+from scripts.publisher import GenerationPublisher, MANIFEST_FILENAME
+from scripts.run_checkpoint import RunCheckpoint
+from scripts.sales_forecast import SalesForecaster
+from scripts.snapshot_validation import SnapshotValidator
+
+
+class PipelineStage:
+    """A unit of pipeline work with declared input and output paths"""
+    
+    def __init__(self, name: str, action: Callable[[], Any],
+                 inputs: List[str] = None, outputs: List[str] = None, external: bool = False):
+        """
+        Initialize stage with its action and the paths it reads and writes
+        external marks stages that also read data outside their declared inputs
+        """
+        self.name = name
+        self.action = action
+        self.inputs = list(inputs or [])
+        self.outputs = list(outputs or [])
+        self.external = external
+
+
+class PipelineScheduler:
+    """Schedules pipeline stages by their data dependencies"""
+    
+    def __init__(self, max_workers: int = 4, checkpoint: Optional[RunCheckpoint] = None):
+        """Initialize scheduler with worker pool size and optional run checkpoint"""
+        self.max_workers = max_workers
+        self.checkpoint = checkpoint
+        self.stages: Dict[str, PipelineStage] = {}
+    
+    def add_stage(self, stage: PipelineStage) -> None:
+        """Register a stage"""
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        self.stages[stage.name] = stage
+    
+    def resolve_dependencies(self) -> Dict[str, Set[str]]:
+        """Map each stage to the stages producing its inputs"""
+        producers = {}
+        for stage in self.stages.values():
+            for path in stage.outputs:
+                if path in producers:
+                    raise ValueError(
+                        f"Output {path} is produced by both {producers[path]} and {stage.name}"
+                    )
+                producers[path] = stage.name
+        
+        # Inputs without a producer are external files and add no edge
+        dependencies = {}
+        for stage in self.stages.values():
+            dependencies[stage.name] = {
+                producers[path] for path in stage.inputs
+                if path in producers and producers[path] != stage.name
+            }
+        
+        self._check_acyclic(dependencies)
+        return dependencies
+    
+    def _check_acyclic(self, dependencies: Dict[str, Set[str]]) -> None:
+        """Raise if the dependency graph contains a cycle"""
+        remaining = {name: set(deps) for name, deps in dependencies.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependency cycle between stages: {', '.join(sorted(remaining))}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+    
+    def _dependents(self, dependencies: Dict[str, Set[str]], name: str) -> Set[str]:
+        """Return all stages that transitively depend on a stage"""
+        found = set()
+        frontier = [name]
+        while frontier:
+            current = frontier.pop()
+            for stage_name, deps in dependencies.items():
+                if current in deps and stage_name not in found:
+                    found.add(stage_name)
+                    frontier.append(stage_name)
+        return found
+    
+    def _run_stage(self, stage: PipelineStage) -> Dict[str, Any]:
+        """Run a single stage, capturing failures instead of raising"""
+        started = time.monotonic()
+        try:
+            stage.action()
+            return {
+                "status": "completed",
+                "duration_seconds": round(time.monotonic() - started, 3)
+            }
+        except Exception as exc:
+            traceback.print_exc()
+            return {
+                "status": "failed",
+                "duration_seconds": round(time.monotonic() - started, 3),
+                "error": f"{type(exc).__name__}: {exc}"
+            }
+    
+    def run(self, resume: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Run all stages, returning status per stage; resume=False ignores the checkpoint"""
+        dependencies = self.resolve_dependencies()
+        results: Dict[str, Dict[str, Any]] = {}
+        running = {}
+        input_hashes: Dict[str, str] = {}
+        checkpoint = self.checkpoint
+        if checkpoint:
+            checkpoint.begin(resume=resume)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while len(results) < len(self.stages):
+                # Submit every stage whose dependencies have completed
+                reused = False
+                for name, deps in dependencies.items():
+                    if name in results or name in running.values():
+                        continue
+                    if all(results.get(dep, {}).get("status") == "completed" for dep in deps):
+                        stage = self.stages[name]
+                        if checkpoint:
+                            # Upstream stages are done, so the inputs are final here
+                            input_hashes[name] = checkpoint.input_hash(stage.inputs)
+                            if checkpoint.reusable(name, stage.inputs, stage.outputs, input_hashes[name],
+                                                   stage.external):
+                                checkpoint.reuse(name)
+                                results[name] = {"status": "completed", "duration_seconds": 0.0, "reused": True}
+                                print(f"[scheduler] Stage {name} reused from checkpoint (inputs unchanged)")
+                                reused = True
+                                continue
+                        print(f"[scheduler] Starting stage: {name}")
+                        running[executor.submit(self._run_stage, stage)] = name
+                
+                if not running:
+                    if reused:
+                        continue
+                    break
+                
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    print(f"[scheduler] Stage {name} {results[name]['status']} "
+                          f"in {results[name]['duration_seconds']}s")
+                    if checkpoint:
+                        checkpoint.record(name, input_hashes[name], results[name])
+                    
+                    # A failed stage only takes down the stages that need its outputs
+                    if results[name]["status"] == "failed":
+                        for dependent in self._dependents(dependencies, name):
+                            if dependent not in results:
+                                results[dependent] = {
+                                    "status": "skipped",
+                                    "error": f"Upstream stage failed: {name}"
+                                }
+                                print(f"[scheduler] Stage {dependent} skipped (upstream {name} failed)")
+        
+        if checkpoint:
+            checkpoint.finish(all(result["status"] == "completed" for result in results.values()))
+        
+        return results
+
+
+def _copy_atomic(source: str, target: str) -> None:
+    """Copy a file next to its target and rename it into place"""
+    tmp_path = f"{target}.tmp-{os.getpid()}"
+    shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+def publish_dashboard(data_dir: str, dashboard_dir: Optional[str]) -> None:
+    """Copy published data files into the dashboard public directory"""
+    if not dashboard_dir or not os.path.isdir(dashboard_dir):
+        print(f"Dashboard directory not found, skipping dashboard update: {dashboard_dir}")
+        return
+    
+    public_dir = os.path.join(dashboard_dir, "client", "public")
+    os.makedirs(public_dir, exist_ok=True)
+    
+    # News, rankings and delta only ever come from the current generation below
+    publisher = GenerationPublisher(data_dir=data_dir)
+    for path in glob.glob(os.path.join(data_dir, "*.json")):
+        if os.path.basename(path) not in publisher.FILES:
+            _copy_atomic(path, os.path.join(public_dir, os.path.basename(path)))
+    
+    # The generation goes in as a directory plus one pointer swap, like data/current
+    manifest = publisher.mirror(public_dir)
+    if manifest is None:
+        print(f"Warning: No published generation in {data_dir}, dashboard news, rankings and delta unchanged")
+    
+    # Patch feed for incremental client updates
+    feed_dir = os.path.join(data_dir, "feed")
+    if os.path.isdir(feed_dir):
+        shutil.copytree(feed_dir, os.path.join(public_dir, "feed"), dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns("snapshots"))
+    
+    print(f"Dashboard data updated: {public_dir}")
+
+
+def print_summary(delta_path: str) -> None:
+    """Print alert counts from the delta output"""
+    with open(delta_path, "r", encoding="utf-8") as f:
+        summary = json.load(f).get("summary", {})
+    
+    print(f"Summary: {summary.get('total_alerts', 0)} total alerts, "
+          f"{summary.get('high_severity_alerts', 0)} high severity")
+
+
+def build_pipeline(base_dir: str = None, dashboard_dir: str = None,
+                   max_workers: int = 4, checkpoint_path: str = None) -> PipelineScheduler:
+    """Build the standard update pipeline"""
+    if base_dir is None:
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    
+    data_dir = os.path.join(base_dir, "data")
+    history_dir = os.path.join(base_dir, "history")
+    archive_dir = os.path.join(base_dir, "archive", "news")
+    ingest_dir = os.path.join(base_dir, "ingest")
+    
+    news_path = os.path.join(data_dir, "ev_news_latest.json")
+    rankings_path = os.path.join(data_dir, "ev_rankings_latest.json")
+    delta_path = os.path.join(data_dir, "ev_rankings_delta.json")
+    forecast_path = os.path.join(data_dir, "ev_rankings_forecast.json")
+    feed_manifest_path = os.path.join(data_dir, "feed", "manifest.json")
+    digest_path = os.path.join(data_dir, "reports", "ev_digest_latest.md")
+    generation_manifest_path = os.path.join(data_dir, "current", MANIFEST_FILENAME)
+    validation_report_path = os.path.join(data_dir, "reports", "snapshot_validation.json")
+    fx_rates_path = os.path.join(data_dir, "reference", "fx_rates.json")
+    market_totals_path = os.path.join(data_dir, "reference", "market_totals.json")
+    hierarchy_path = os.path.join(data_dir, "reference", "manufacturer_hierarchy.json")
+    if checkpoint_path is None:
+        checkpoint_path = os.path.join(base_dir, "state", "pipeline_checkpoint.json")
+    
+    # Stage components are created once so a reused pipeline keeps their caches warm
+    collector = EVNewsCollector(output_dir=data_dir)
+    generator = EVRankingsGenerator(output_dir=data_dir, ingest_dir=ingest_dir, history_dir=history_dir)
+    calculator = RankingsDeltaCalculator(data_dir=data_dir, history_dir=history_dir, archive_dir=archive_dir)
+    forecaster = SalesForecaster(data_dir=data_dir, history_dir=history_dir)
+    compactor = HistoryCompactor(history_dir=history_dir)
+    feed_publisher = PatchFeedPublisher(data_dir=data_dir)
+    digest = DigestReportGenerator(data_dir=data_dir)
+    generation_publisher = GenerationPublisher(data_dir=data_dir)
+    news_archive = NewsArchive(data_dir=data_dir, archive_dir=archive_dir)
+    validator = SnapshotValidator(data_dir=data_dir, history_dir=history_dir)
+    
+    scheduler = PipelineScheduler(max_workers=max_workers, checkpoint=RunCheckpoint(checkpoint_path))
+    
+    scheduler.add_stage(PipelineStage(
+        "news",
+        collector.run,
+        outputs=[news_path],
+        external=True
+    ))
+    scheduler.add_stage(PipelineStage(
+        "archive_news",
+        news_archive.run,
+        inputs=[news_path],
+        outputs=[archive_dir]
+    ))
+    scheduler.add_stage(PipelineStage(
+        "rankings",
+        generator.run,
+        inputs=[fx_rates_path, market_totals_path, hierarchy_path],
+        outputs=[rankings_path, history_dir],
+        external=True
+    ))
+    scheduler.add_stage(PipelineStage(
+        "validate",
+        validator.run,
+        inputs=[rankings_path, history_dir],
+        outputs=[validation_report_path]
+    ))
+    scheduler.add_stage(PipelineStage(
+        "delta",
+        calculator.run,
+        # News correlation is best-effort: it reads whatever news and archive exist,
+        # so a failed news collection does not hold back the delta
+        inputs=[rankings_path, history_dir, validation_report_path, hierarchy_path],
+        outputs=[delta_path]
+    ))
+    scheduler.add_stage(PipelineStage(
+        "forecast",
+        forecaster.run,
+        inputs=[rankings_path, history_dir, validation_report_path],
+        outputs=[forecast_path]
+    ))
+    scheduler.add_stage(PipelineStage(
+        "compact_history",
+        compactor.run,
+        inputs=[delta_path, forecast_path],
+        outputs=[os.path.join(history_dir, INDEX_FILENAME)]
+    ))
+    scheduler.add_stage(PipelineStage(
+        "patch_feed",
+        feed_publisher.run,
+        inputs=[news_path, rankings_path, delta_path],
+        outputs=[feed_manifest_path]
+    ))
+    scheduler.add_stage(PipelineStage(
+        "digest",
+        digest.run,
+        inputs=[news_path, rankings_path, delta_path],
+        outputs=[digest_path]
+    ))
+    scheduler.add_stage(PipelineStage(
+        "publish_generation",
+        generation_publisher.run,
+        inputs=[news_path, rankings_path, delta_path],
+        outputs=[generation_manifest_path]
+    ))
+    scheduler.add_stage(PipelineStage(
+        "publish",
+        lambda: publish_dashboard(data_dir, dashboard_dir),
+        inputs=[news_path, rankings_path, delta_path, feed_manifest_path, generation_manifest_path],
+        outputs=[dashboard_dir or "dashboard"]
+    ))
+    scheduler.add_stage(PipelineStage(
+        "summary",
+        lambda: print_summary(delta_path),
+        inputs=[delta_path]
+    ))
+    
+    return scheduler
+
+
+def main() -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run the EV intelligence pipeline stages")
+    parser.add_argument("--dashboard-dir", default=None, help="Dashboard repository directory")
+    parser.add_argument("--workers", type=int, default=4, help="Worker pool size")
+    parser.add_argument("--fresh", action="store_true", help="Ignore the run checkpoint and run every stage")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("EV Pipeline Scheduler - Starting")
+    print("=" * 60)
+    
+    scheduler = build_pipeline(dashboard_dir=args.dashboard_dir, max_workers=args.workers)
+    results = scheduler.run(resume=not args.fresh)
+    
+    print("=" * 60)
+    print("EV Pipeline Scheduler - Complete")
+    for name, result in results.items():
+        line = f"  {name}: {result['status']}"
+        if result.get("reused"):
+            line += " (reused)"
+        if result.get("error"):
+            line += f" ({result['error']})"
+        print(line)
+    print("=" * 60)
+    
+    return 0 if all(r["status"] == "completed" for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
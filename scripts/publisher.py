@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+EV Generation Publisher - Publishes news, rankings and delta as one generation
+Copies the output files into a staging directory, renames it to a numbered
+generation and switches the data/current symlink to it in one atomic swap, so
+readers always see a complete, mutually consistent set of files. The dashboard
+receives each generation the same way
+"""
+import hashlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.json_backend import dump_json, load_json
+
+
+GENERATION_PATTERN = re.compile(r"^(\d{6})$")
+MANIFEST_FILENAME = "manifest.json"
+
+# Data files that make up one consistent generation, by document name
+PUBLISHED_DOCUMENTS = {
+    "news": "ev_news_latest.json",
+    "rankings": "ev_rankings_latest.json",
+    "delta": "ev_rankings_delta.json"
+}
+
+
+def read_current_generation(current_link: str) -> Optional[Dict[str, Any]]:
+    """Return the manifest of the generation a current link points to"""
+    try:
+        return load_json(os.path.join(current_link, MANIFEST_FILENAME))
+    except (OSError, ValueError):
+        return None
+
+
+def list_generations(generations_dir: str) -> List[int]:
+    """Generation numbers present in a directory, oldest first"""
+    if not os.path.isdir(generations_dir):
+        return []
+    return sorted(
+        int(match.group(1))
+        for match in map(GENERATION_PATTERN.match, os.listdir(generations_dir))
+        if match
+    )
+
+
+def swap_link(link: str, target: str) -> None:
+    """Point a symlink at target (stored relative to the link) with one atomic rename"""
+    relative = os.path.relpath(target, os.path.dirname(link))
+    tmp_link = f"{link}.tmp-{os.getpid()}"
+    if os.path.lexists(tmp_link):
+        os.unlink(tmp_link)
+    os.symlink(relative, tmp_link)
+    os.replace(tmp_link, link)
+
+
+def _copy_synced(source: str, target: str) -> bytes:
+    """Copy a file and flush the copy to disk, returning its content"""
+    shutil.copyfile(source, target)
+    with open(target, "rb") as f:
+        raw = f.read()
+        os.fsync(f.fileno())
+    return raw
+
+
+class GenerationPublisher:
+    """Stages output files and swaps them in as numbered generations"""
+    
+    FILES = list(PUBLISHED_DOCUMENTS.values())
+    
+    # Older generations are kept briefly for readers still holding their paths
+    KEEP_GENERATIONS = 3
+    
+    def __init__(self, data_dir: str = None):
+        """Initialize publisher with the data directory"""
+        if data_dir is None:
+            data_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "data"
+            )
+        self.data_dir = data_dir
+        self.generations_dir = os.path.join(data_dir, "published")
+        self.current_link = os.path.join(data_dir, "current")
+    
+    def list_generations(self) -> List[int]:
+        """Generation numbers present on disk, oldest first"""
+        return list_generations(self.generations_dir)
+    
+    def current_generation(self) -> int:
+        """Number of the generation readers currently see, 0 before the first publish"""
+        manifest = read_current_generation(self.current_link)
+        return manifest["generation"] if manifest else 0
+    
+    def _stage(self, staging_dir: str, generation: int) -> Dict[str, Any]:
+        """Copy the output files into a staging directory and write its manifest"""
+        files = {}
+        for filename in self.FILES:
+            source = os.path.join(self.data_dir, filename)
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"Cannot publish generation without {source}")
+            
+            raw = _copy_synced(source, os.path.join(staging_dir, filename))
+            files[filename] = {"sha1": hashlib.sha1(raw).hexdigest(), "size": len(raw)}
+        
+        manifest = {
+            "generation": generation,
+            "published_at": datetime.now().isoformat(),
+            "files": files
+        }
+        dump_json(manifest, os.path.join(staging_dir, MANIFEST_FILENAME))
+        return manifest
+    
+    def _prune(self, generation: int, generations_dir: str = None) -> List[int]:
+        """Remove generations older than the retention window"""
+        generations_dir = generations_dir or self.generations_dir
+        removed = []
+        for old in list_generations(generations_dir):
+            if old <= generation - self.KEEP_GENERATIONS:
+                shutil.rmtree(os.path.join(generations_dir, f"{old:06d}"), ignore_errors=True)
+                removed.append(old)
+        return removed
+    
+    def publish(self) -> Dict[str, Any]:
+        """Publish the current output files as the next generation"""
+        os.makedirs(self.generations_dir, exist_ok=True)
+        generation = max([self.current_generation()] + self.list_generations()) + 1
+        
+        staging_dir = tempfile.mkdtemp(prefix=".staging-", dir=self.generations_dir)
+        try:
+            os.chmod(staging_dir, 0o755)
+            manifest = self._stage(staging_dir, generation)
+            generation_dir = os.path.join(self.generations_dir, f"{generation:06d}")
+            os.rename(staging_dir, generation_dir)
+        except BaseException:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        
+        swap_link(self.current_link, generation_dir)
+        manifest["removed_generations"] = self._prune(generation)
+        return manifest
+    
+    def mirror(self, target_dir: str) -> Optional[Dict[str, Any]]:
+        """
+        Publish the current generation into another directory (the dashboard) the same way
+        The files are staged into target_dir/published/<generation>/ and target_dir/current
+        is swapped to it; the flat file names used by existing clients link through current
+        """
+        manifest = read_current_generation(self.current_link)
+        if manifest is None:
+            return None
+        
+        generations_dir = os.path.join(target_dir, "published")
+        generation_dir = os.path.join(generations_dir, f"{manifest['generation']:06d}")
+        os.makedirs(generations_dir, exist_ok=True)
+        if not os.path.isdir(generation_dir):
+            staging_dir = tempfile.mkdtemp(prefix=".staging-", dir=generations_dir)
+            try:
+                os.chmod(staging_dir, 0o755)
+                for filename in self.FILES + [MANIFEST_FILENAME]:
+                    _copy_synced(os.path.join(self.current_link, filename), os.path.join(staging_dir, filename))
+                os.rename(staging_dir, generation_dir)
+            except BaseException:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+        
+        current_link = os.path.join(target_dir, "current")
+        swap_link(current_link, generation_dir)
+        
+        # Links resolve through current, so the swap above moves every flat name at once
+        links = {filename: filename for filename in self.FILES}
+        links["generation.json"] = MANIFEST_FILENAME
+        for link_name, filename in links.items():
+            link = os.path.join(target_dir, link_name)
+            if not (os.path.islink(link) and os.readlink(link) == os.path.join("current", filename)):
+                swap_link(link, os.path.join(current_link, filename))
+        
+        self._prune(manifest["generation"], generations_dir)
+        return manifest
+    
+    def run(self) -> str:
+        """Main execution method"""
+        print("=" * 60)
+        print("EV Generation Publisher - Starting")
+        print("=" * 60)
+        
+        manifest = self.publish()
+        print(f"Published generation {manifest['generation']} ({len(manifest['files'])} files)")
+        if manifest["removed_generations"]:
+            print(f"Removed generations: {', '.join(map(str, manifest['removed_generations']))}")
+        
+        print("=" * 60)
+        print("EV Generation Publisher - Complete")
+        print(f"Output: {self.current_link}")
+        print("=" * 60)
+        
+        return self.current_link
+
+
+if __name__ == "__main__":
+    GenerationPublisher().run()
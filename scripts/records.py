@@ -0,0 +1,134 @@
+"""
+EV Records - Compact record types for news articles and ranking rows
+Records use __slots__ instead of a per-object dict and intern their enum-like
+string values, so large batches share one copy of each region or category.
+They support item access like the dicts they replace: fields that were never
+set stay empty slots and are absent, just like missing keys. Records are
+converted back to dicts only when serialized (json_backend calls to_dict)
+"""
+import os
+import sys
+from typing import Dict, Any, Iterator, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+_UNSET = object()
+
+
+def intern_value(value: Any) -> Any:
+    """Intern strings so equal values share one object"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Record:
+    """Base for slotted records with dict-style item access"""
+    
+    # Keys from the dict form that are not fields, kept so they survive a round trip
+    __slots__ = ("_extra",)
+    
+    # Fields whose values come from a small fixed set and are interned
+    INTERNED: frozenset = frozenset()
+    # Fields also left out of the serialized dict while set to None
+    OPTIONAL: frozenset = frozenset()
+    
+    def __init__(self, **values: Any):
+        """Create a record; fields not given stay unset and are absent from the dict form"""
+        unknown = set(values) - set(self.__slots__)
+        if unknown:
+            raise TypeError(f"{type(self).__name__} has no fields {', '.join(sorted(unknown))}")
+        for name, value in values.items():
+            setattr(self, name, value)
+        self._extra = None
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.INTERNED:
+            value = intern_value(value)
+        object.__setattr__(self, name, value)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        """Create a record from its dict form; keys that are not fields are kept alongside"""
+        fields = set(cls.__slots__)
+        record = cls(**{key: value for key, value in data.items() if key in fields})
+        extra = {key: value for key, value in data.items() if key not in fields}
+        if extra:
+            record._extra = extra
+        return record
+    
+    def _present(self, name: str) -> bool:
+        """Whether a field was set, and is not an OPTIONAL field set to None"""
+        value = getattr(self, name, _UNSET)
+        return value is not _UNSET and (value is not None or name not in self.OPTIONAL)
+    
+    def keys(self) -> Tuple[str, ...]:
+        """Field names present in the dict form"""
+        names = tuple(name for name in self.__slots__ if self._present(name))
+        return names + tuple(self._extra) if self._extra else names
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dict for serialization"""
+        return {name: self[name] for name in self.keys()}
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__:
+            value = getattr(self, key, _UNSET)
+            if value is not _UNSET:
+                return value
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self.__slots__:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys()
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field value, or default when the field is absent"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class NewsItem(Record):
+    """A collected news article"""
+    
+    __slots__ = (
+        "title", "url", "source", "date", "description", "region", "manufacturer",
+        "category", "impact", "original_language", "original_title", "original_url"
+    )
+    
+    INTERNED = frozenset({"source", "region", "manufacturer", "category", "impact", "original_language"})
+
+
+class RankingRow(Record):
+    """A model's entry in the BEV or PHEV rankings"""
+    
+    __slots__ = (
+        "rank", "manufacturer", "model", "sales_units", "revenue_usd_millions",
+        "yoy_growth_percent", "market_share_percent", "regions", "revenue_by_currency_millions"
+    )
+    
+    INTERNED = frozenset({"manufacturer"})
+    OPTIONAL = frozenset({"revenue_by_currency_millions"})
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Region names repeat across every row
+        if name == "regions" and value is not None:
+            value = {intern_value(region): units for region, units in value.items()}
+        Record.__setattr__(self, name, value)
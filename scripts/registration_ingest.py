@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+EV Registration Bulk Loader - Streams registration and sales exports into rankings
+Reads per-country / per-month / per-VIN-prefix CSV files in bounded-memory chunks,
+classifies each row as BEV or PHEV and aggregates by manufacturer, model and region.
+Each file's aggregates are cached by size and mtime, so reruns only read new or
+changed exports
+"""
+import csv
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, List, Any, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.json_backend import COMPACT, dump_json, load_json
+from scripts.records import RankingRow
+
+
+# Accepted header names for each logical column (compared lower-case)
+COLUMN_ALIASES = {
+    "manufacturer": ["manufacturer", "make", "brand", "oem"],
+    "model": ["model", "model_name"],
+    "powertrain": ["powertrain", "fuel_type", "fuel", "propulsion", "vehicle_type"],
+    "region": ["region", "market"],
+    "country": ["country", "country_code"],
+    "units": ["units", "registrations", "sales_units", "quantity", "count"],
+    "price": ["price", "price_usd", "msrp", "msrp_usd"],
+    "currency": ["currency", "currency_code"]
+}
+
+# Powertrain labels found in exports, normalized to the rankings vehicle types
+POWERTRAIN_CLASSES = {
+    "bev": "BEV",
+    "ev": "BEV",
+    "electric": "BEV",
+    "battery electric": "BEV",
+    "battery_electric": "BEV",
+    "phev": "PHEV",
+    "plug-in hybrid": "PHEV",
+    "plugin hybrid": "PHEV",
+    "plug_in_hybrid": "PHEV",
+    "phv": "PHEV",
+    "erev": "PHEV"
+}
+
+# Countries mapped onto the rankings regions; other countries only count globally
+COUNTRY_REGIONS = {
+    "china": "China", "cn": "China",
+    "usa": "USA", "us": "USA", "united states": "USA",
+    "japan": "Asia_ex_China", "jp": "Asia_ex_China",
+    "south korea": "Asia_ex_China", "korea": "Asia_ex_China", "kr": "Asia_ex_China",
+    "india": "Asia_ex_China", "in": "Asia_ex_China",
+    "thailand": "Asia_ex_China", "th": "Asia_ex_China",
+    "indonesia": "Asia_ex_China", "id": "Asia_ex_China",
+    "taiwan": "Asia_ex_China", "tw": "Asia_ex_China",
+    "germany": "Europe", "de": "Europe",
+    "france": "Europe", "fr": "Europe",
+    "united kingdom": "Europe", "uk": "Europe", "gb": "Europe",
+    "italy": "Europe", "it": "Europe",
+    "spain": "Europe", "es": "Europe",
+    "netherlands": "Europe", "nl": "Europe",
+    "norway": "Europe", "no": "Europe",
+    "sweden": "Europe", "se": "Europe",
+    "belgium": "Europe", "be": "Europe"
+}
+
+RANKING_REGIONS = ["China", "Asia_ex_China", "Europe", "USA"]
+
+CACHE_FILENAME = "registration_cache.json"
+
+
+def cache_path_beside(directory: str) -> str:
+    """Aggregate cache file in the state/ directory next to a data or ingest directory"""
+    return os.path.join(os.path.dirname(os.path.abspath(directory)), "state", CACHE_FILENAME)
+
+
+def _resolve_columns(header: List[str]) -> Dict[str, Optional[int]]:
+    """Map logical column names to positions in a CSV header"""
+    lowered = [name.strip().lower() for name in header]
+    positions = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        positions[column] = next((lowered.index(a) for a in aliases if a in lowered), None)
+    return positions
+
+
+def _to_number(value: str) -> float:
+    """Parse a numeric cell, treating blanks and junk as zero"""
+    try:
+        return float(value.replace(",", "")) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def ingest_file(path: str, chunk_size: int = 100000) -> Dict[str, Any]:
+    """
+    Aggregate one export file chunk by chunk
+    Only the running aggregates are kept in memory, never the whole file
+    """
+    started = time.monotonic()
+    aggregates: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    rows_read = 0
+    rows_skipped = 0
+    
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return {"path": path, "aggregates": {}, "rows_read": 0, "rows_skipped": 0, "seconds": 0.0}
+        
+        cols = _resolve_columns(header)
+        if cols["manufacturer"] is None or cols["model"] is None or cols["powertrain"] is None:
+            raise ValueError(f"{path}: missing manufacturer, model or powertrain column")
+        
+        mfr_col, model_col, pt_col = cols["manufacturer"], cols["model"], cols["powertrain"]
+        region_col, country_col = cols["region"], cols["country"]
+        units_col, price_col, currency_col = cols["units"], cols["price"], cols["currency"]
+        
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                break
+            rows_read += len(chunk)
+            
+            for row in chunk:
+                try:
+                    vehicle_type = POWERTRAIN_CLASSES.get(row[pt_col].strip().lower())
+                    manufacturer = row[mfr_col].strip()
+                    model = row[model_col].strip()
+                except IndexError:
+                    rows_skipped += 1
+                    continue
+                
+                if vehicle_type is None or not manufacturer or not model:
+                    rows_skipped += 1
+                    continue
+                
+                units = _to_number(row[units_col]) if units_col is not None and units_col < len(row) else 1.0
+                price = _to_number(row[price_col]) if price_col is not None and price_col < len(row) else 0.0
+                currency = row[currency_col].strip().upper() if currency_col is not None and currency_col < len(row) else ""
+                
+                region = None
+                if region_col is not None and region_col < len(row) and row[region_col].strip() in RANKING_REGIONS:
+                    region = row[region_col].strip()
+                elif country_col is not None and country_col < len(row):
+                    region = COUNTRY_REGIONS.get(row[country_col].strip().lower())
+                
+                key = (vehicle_type, manufacturer, model)
+                entry = aggregates.get(key)
+                if entry is None:
+                    entry = aggregates[key] = {
+                        "units": 0.0,
+                        "revenue": {},
+                        "regions": {r: 0.0 for r in RANKING_REGIONS}
+                    }
+                entry["units"] += units
+                if price:
+                    # Revenue stays in the reporting currency until normalization
+                    currency = currency or "USD"
+                    entry["revenue"][currency] = entry["revenue"].get(currency, 0.0) + units * price
+                if region is not None:
+                    entry["regions"][region] += units
+    
+    return {
+        "path": path,
+        "aggregates": aggregates,
+        "rows_read": rows_read,
+        "rows_skipped": rows_skipped,
+        "seconds": time.monotonic() - started
+    }
+
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    """Return (size, mtime_ns) identifying a file's current content"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _encode_result(result: Dict[str, Any], signature: Tuple[int, int]) -> Dict[str, Any]:
+    """Convert an ingest_file result into its JSON cache entry"""
+    return {
+        "size": signature[0],
+        "mtime_ns": signature[1],
+        "rows_read": result["rows_read"],
+        "rows_skipped": result["rows_skipped"],
+        "aggregates": [list(key) + [entry] for key, entry in result["aggregates"].items()]
+    }
+
+
+def _decode_result(path: str, cached: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a JSON cache entry back into an ingest_file result"""
+    return {
+        "path": path,
+        "aggregates": {(vehicle_type, manufacturer, model): entry
+                       for vehicle_type, manufacturer, model, entry in cached["aggregates"]},
+        "rows_read": cached["rows_read"],
+        "rows_skipped": cached["rows_skipped"],
+        "seconds": 0.0
+    }
+
+
+class RegistrationBulkLoader:
+    """Loads registration/sales exports into BEV and PHEV rankings"""
+    
+    def __init__(self, chunk_size: int = 100000, max_workers: int = None, top_n: int = 10,
+                 cache_path: str = None):
+        """Initialize loader with chunk size, worker count, ranking depth and optional aggregate cache file"""
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.top_n = top_n
+        self.cache_path = cache_path
+        self.stats: Dict[str, Any] = {}
+        # path -> cache entry; kept in memory between runs of a long-lived loader
+        self._cache: Optional[Dict[str, Dict[str, Any]]] = None
+    
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load the per-file aggregate cache, or start an empty one"""
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_path and os.path.exists(self.cache_path):
+                try:
+                    self._cache = load_json(self.cache_path).get("files", {})
+                except (OSError, ValueError) as exc:
+                    print(f"Warning: Ignoring unreadable ingest cache {self.cache_path}: {exc}")
+        return self._cache
+    
+    def _save_cache(self) -> None:
+        """Write the per-file aggregate cache atomically"""
+        if self.cache_path:
+            dump_json({"files": self._cache}, self.cache_path, mode=COMPACT)
+    
+    def find_files(self, ingest_dir: str) -> List[str]:
+        """Find all CSV exports under the ingest directory"""
+        if not ingest_dir or not os.path.isdir(ingest_dir):
+            return []
+        return sorted(glob.glob(os.path.join(ingest_dir, "**", "*.csv"), recursive=True))
+    
+    def _read_files(self, files: List[str]) -> List[Dict[str, Any]]:
+        """
+        Return ingest_file results for all files
+        Unchanged files come from the cache; new or changed ones are read in
+        parallel, one file per worker process
+        """
+        cache = self._load_cache()
+        signatures = {path: _file_signature(path) for path in files}
+        stale = [
+            path for path in files
+            if (cache.get(path, {}).get("size"), cache.get(path, {}).get("mtime_ns")) != signatures[path]
+        ]
+        
+        fresh = {}
+        if stale:
+            workers = min(self.max_workers, len(stale))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for result in executor.map(ingest_file, stale, [self.chunk_size] * len(stale)):
+                    fresh[result["path"]] = result
+                    cache[result["path"]] = _encode_result(result, signatures[result["path"]])
+        
+        # Forget exports that were removed from the ingest directory
+        removed = set(cache) - set(files)
+        for path in removed:
+            del cache[path]
+        if stale or removed:
+            self._save_cache()
+        
+        return [fresh[path] if path in fresh else _decode_result(path, cache[path]) for path in files]
+    
+    def ingest(self, files: List[str]) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+        """Aggregate all files, reading only those not already cached"""
+        started = time.monotonic()
+        merged: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        rows_read = 0
+        rows_skipped = 0
+        files_cached = 0
+        
+        for result in self._read_files(files):
+            rows_read += result["rows_read"]
+            rows_skipped += result["rows_skipped"]
+            if result["seconds"] > 0:
+                rate = result["rows_read"] / result["seconds"]
+                print(f"  {os.path.basename(result['path'])}: {result['rows_read']:,} rows ({rate:,.0f} rows/sec)")
+            else:
+                files_cached += 1
+            
+            for key, entry in result["aggregates"].items():
+                target = merged.get(key)
+                if target is None:
+                    # Copied so merging never changes the cached per-file aggregates
+                    target = merged[key] = {
+                        "units": 0.0,
+                        "revenue": {},
+                        "regions": {r: 0.0 for r in RANKING_REGIONS}
+                    }
+                target["units"] += entry["units"]
+                for currency, amount in entry["revenue"].items():
+                    target["revenue"][currency] = target["revenue"].get(currency, 0.0) + amount
+                for region, units in entry["regions"].items():
+                    target["regions"][region] += units
+        
+        elapsed = time.monotonic() - started
+        self.stats = {
+            "files": len(files),
+            "files_cached": files_cached,
+            "rows_read": rows_read,
+            "rows_skipped": rows_skipped,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows_read / elapsed) if elapsed > 0 else 0
+        }
+        print(f"Ingested {rows_read:,} rows from {len(files)} files, {files_cached} unchanged and cached "
+              f"({self.stats['rows_per_second']:,} rows/sec, {rows_skipped:,} skipped)")
+        
+        return merged
+    
+    def build_rankings(self, aggregates: Dict[Tuple[str, str, str], Dict[str, Any]]) -> Tuple[List[RankingRow], List[RankingRow]]:
+        """Turn aggregates into ranking rows in the generator's format"""
+        rankings = {"BEV": [], "PHEV": []}
+        
+        for vehicle_type in rankings:
+            entries = [(key, entry) for key, entry in aggregates.items() if key[0] == vehicle_type]
+            total_units = sum(entry["units"] for _, entry in entries)
+            entries.sort(key=lambda item: item[1]["units"], reverse=True)
+            
+            for rank, ((_, manufacturer, model), entry) in enumerate(entries[:self.top_n], start=1):
+                row = RankingRow(
+                    rank=rank,
+                    manufacturer=manufacturer,
+                    model=model,
+                    sales_units=int(entry["units"]),
+                    revenue_usd_millions=int(round(entry["revenue"].get("USD", 0.0) / 1000000)),
+                    yoy_growth_percent=None,
+                    market_share_percent=round(entry["units"] / total_units * 100, 1) if total_units else 0.0,
+                    regions={region: int(units) for region, units in entry["regions"].items()}
+                )
+                # Mixed-currency revenue is converted to USD by CurrencyNormalizer
+                if any(currency != "USD" for currency in entry["revenue"]):
+                    row["revenue_by_currency_millions"] = {
+                        currency: round(amount / 1000000, 3) for currency, amount in entry["revenue"].items()
+                    }
+                rankings[vehicle_type].append(row)
+        
+        return rankings["BEV"], rankings["PHEV"]
+    
+    def load_rankings(self, files: List[str]) -> Tuple[List[RankingRow], List[RankingRow]]:
+        """Ingest files and return BEV and PHEV rankings"""
+        return self.build_rankings(self.ingest(files))
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ingest_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(base_dir, "ingest")
+    
+    loader = RegistrationBulkLoader(cache_path=cache_path_beside(ingest_dir))
+    files = loader.find_files(ingest_dir)
+    if not files:
+        print(f"No CSV exports found in {ingest_dir}")
+        sys.exit(1)
+    
+    bev, phev = loader.load_rankings(files)
+    for label, rows in (("BEV", bev), ("PHEV", phev)):
+        print(f"\n{label} top {len(rows)}:")
+        for row in rows:
+            print(f"  #{row['rank']} {row['manufacturer']} {row['model']}: {row['sales_units']:,} units")
@@ -0,0 +1,137 @@
+"""
+EV Run Checkpoint - Records pipeline stage completion for resumable runs
+Each completed stage is stored with a hash of its inputs, so a rerun can skip
+stages whose inputs have not changed and resume an interrupted run from the
+first stage that did not complete
+"""
+import hashlib
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.json_backend import dump_json, load_json
+
+
+def path_hash(path: str) -> str:
+    """
+    Hash a file's content, or the name, size and mtime of every file below a directory
+    Directories such as history/ are too large to re-read on every run; files
+    in them are written atomically, so a changed file gets a new mtime
+    """
+    digest = hashlib.sha1()
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                digest.update(f"{os.path.relpath(file_path, path)}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    elif os.path.isfile(path):
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    else:
+        digest.update(b"missing")
+    return digest.hexdigest()
+
+
+class RunCheckpoint:
+    """Per-stage completion records for the current and previous pipeline run"""
+    
+    # An unfinished run older than this starts over instead of resuming
+    RESUME_WINDOW_HOURS = 24
+    
+    def __init__(self, path: str):
+        """Initialize checkpoint stored at path"""
+        self.path = path
+        self.state: Dict[str, Any] = {}
+        self.previous: Dict[str, Dict[str, Any]] = {}
+        self.resuming = False
+    
+    def _load_previous(self) -> Optional[Dict[str, Any]]:
+        """Load the last run's checkpoint, if readable"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            return load_json(self.path)
+        except (OSError, ValueError) as exc:
+            print(f"Warning: Ignoring unreadable checkpoint {self.path}: {exc}")
+            return None
+    
+    def begin(self, resume: bool = True) -> None:
+        """Start a run, resuming the previous one if it did not complete"""
+        previous = self._load_previous() if resume else None
+        now = datetime.now()
+        
+        self.previous = (previous or {}).get("stages", {})
+        self.resuming = False
+        if previous and previous.get("status") != "completed":
+            started_at = datetime.fromisoformat(previous["started_at"])
+            self.resuming = now - started_at <= timedelta(hours=self.RESUME_WINDOW_HOURS)
+        
+        self.state = {
+            "run_id": previous["run_id"] if self.resuming else now.strftime("%Y%m%d_%H%M%S"),
+            "status": "running",
+            "started_at": previous["started_at"] if self.resuming else now.isoformat(),
+            "updated_at": now.isoformat(),
+            "finished_at": None,
+            "stages": {}
+        }
+        if self.resuming:
+            print(f"[checkpoint] Resuming incomplete run {self.state['run_id']}")
+        self._save()
+    
+    def input_hash(self, inputs: List[str]) -> str:
+        """Hash the current content of a stage's inputs"""
+        digest = hashlib.sha1()
+        for path in sorted(inputs):
+            digest.update(f"{path}={path_hash(path)};".encode("utf-8"))
+        return digest.hexdigest()
+    
+    def reusable(self, name: str, inputs: List[str], outputs: List[str], input_hash: str,
+                 external: bool = False) -> bool:
+        """
+        Whether a stage's previous completion still holds
+        Stages that read external data (news, rankings) or declare no inputs
+        are only reused when resuming the run that produced them
+        """
+        record = self.previous.get(name)
+        if not record or record.get("status") != "completed" or record.get("input_hash") != input_hash:
+            return False
+        if (external or not inputs) and not self.resuming:
+            return False
+        return all(os.path.exists(path) for path in outputs)
+    
+    def reuse(self, name: str) -> None:
+        """Carry a stage's previous completion into this run"""
+        self.state["stages"][name] = dict(self.previous[name], reused=True)
+        self._save()
+    
+    def record(self, name: str, input_hash: str, result: Dict[str, Any]) -> None:
+        """Record a stage that ran in this run"""
+        self.state["stages"][name] = {
+            "status": result["status"],
+            "input_hash": input_hash,
+            "finished_at": datetime.now().isoformat(),
+            "duration_seconds": result.get("duration_seconds"),
+            "error": result.get("error")
+        }
+        self._save()
+    
+    def finish(self, completed: bool) -> None:
+        """Mark the run completed, or failed so the next run resumes it"""
+        self.state["status"] = "completed" if completed else "failed"
+        self.state["finished_at"] = datetime.now().isoformat()
+        self._save()
+    
+    def _save(self) -> None:
+        """Write the checkpoint atomically"""
+        self.state["updated_at"] = datetime.now().isoformat()
+        dump_json(self.state, self.path)
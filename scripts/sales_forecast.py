@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+EV Sales Forecaster - Projects next-quarter sales and rank from ranking history
+Fits a damped-trend exponential smoothing model to every model and manufacturer
+series at once, as a batch over a series x period matrix
+"""
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.history_store import get_history_store
+from scripts.json_backend import dump_json, load_json
+
+
+PERIOD_PATTERN = re.compile(r"^Q([1-4]) (\d{4})$")
+
+
+def parse_period(period: str) -> Optional[Tuple[int, int]]:
+    """Parse a 'Q4 2025' period label into (year, quarter)"""
+    match = PERIOD_PATTERN.match(period or "")
+    if not match:
+        return None
+    return int(match.group(2)), int(match.group(1))
+
+
+def following_quarter(period: Tuple[int, int]) -> Tuple[int, int]:
+    """Return the (year, quarter) after (year, quarter)"""
+    year, quarter = period
+    return (year + 1, 1) if quarter == 4 else (year, quarter + 1)
+
+
+def next_period(period: Tuple[int, int]) -> str:
+    """Return the label of the quarter after (year, quarter)"""
+    year, quarter = following_quarter(period)
+    return f"Q{quarter} {year}"
+
+
+def quarter_range(first: Tuple[int, int], last: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """Every (year, quarter) from first to last inclusive"""
+    periods = [first]
+    while periods[-1] < last:
+        periods.append(following_quarter(periods[-1]))
+    return periods
+
+
+def snapshots_by_quarter(snapshots: List[Tuple[datetime, Dict[str, Any]]]) -> List[Tuple[Tuple[int, int], Optional[Dict[str, Any]]]]:
+    """
+    One (quarter, snapshot) pair for every quarter from the first to the last
+    The latest snapshot of each quarter represents it, so same-day reruns and
+    compaction gaps do not change the spacing; quarters without one get None
+    """
+    by_period: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for _, snapshot in snapshots:
+        period = parse_period(snapshot.get("period"))
+        if period is not None:
+            by_period[period] = snapshot
+    if not by_period:
+        return []
+    return [(period, by_period.get(period)) for period in quarter_range(min(by_period), max(by_period))]
+
+
+def damped_trend_forecast(matrix: List[List[Optional[float]]], alpha: float, beta: float,
+                          phi: float) -> List[Optional[float]]:
+    """
+    One-step-ahead damped Holt forecast for every row of a series x period matrix
+    A missing value (None) advances a started series by its own forecast, so a
+    gap of several quarters is not fitted as a single step
+    """
+    n_series = len(matrix)
+    level: List[Optional[float]] = [None] * n_series
+    trend = [0.0] * n_series
+    
+    n_periods = len(matrix[0]) if matrix else 0
+    for t in range(n_periods):
+        column = [row[t] for row in matrix]
+        for i, value in enumerate(column):
+            if level[i] is not None and value is None:
+                level[i] += phi * trend[i]
+                trend[i] *= phi
+                continue
+            if value is None:
+                continue
+            if level[i] is None:
+                level[i] = float(value)
+                continue
+            previous_level = level[i]
+            level[i] = alpha * value + (1 - alpha) * (previous_level + phi * trend[i])
+            trend[i] = beta * (level[i] - previous_level) + (1 - beta) * phi * trend[i]
+    
+    return [
+        max(0.0, lvl + phi * trd) if lvl is not None else None
+        for lvl, trd in zip(level, trend)
+    ]
+
+
+class SalesForecaster:
+    """Forecasts next-quarter sales and rank for every tracked series"""
+    
+    # Smoothing parameters
+    ALPHA = 0.5  # Level
+    BETA = 0.3  # Trend
+    PHI = 0.9  # Trend damping
+    
+    def __init__(self, data_dir: str = None, history_dir: str = None):
+        """Initialize forecaster with data directories"""
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        
+        if data_dir is None:
+            data_dir = os.path.join(base_dir, "data")
+        if history_dir is None:
+            history_dir = os.path.join(base_dir, "history")
+        
+        self.data_dir = data_dir
+        self.history_dir = history_dir
+        self.output_path = os.path.join(data_dir, "ev_rankings_forecast.json")
+    
+    def build_matrix(self) -> Tuple[List[Tuple[str, str, Optional[str]]], List[str], List[List[Optional[float]]]]:
+        """
+        Build the series x period sales matrix from history, one column per quarter
+        Quarters without a snapshot between the first and last are kept as empty columns
+        """
+        quarters = snapshots_by_quarter(get_history_store(self.history_dir).load_all())
+        series_index: Dict[Tuple[str, str, Optional[str]], int] = {}
+        columns: List[Dict[int, float]] = []
+        
+        for _, snapshot in quarters:
+            snapshot = snapshot or {}
+            column = {}
+            for vehicle_type, key in (("BEV", "bev_rankings"), ("PHEV", "phev_rankings")):
+                for row in snapshot.get(key, []):
+                    series = (vehicle_type, row["manufacturer"], row["model"])
+                    column[series_index.setdefault(series, len(series_index))] = row["sales_units"]
+            for manufacturer, totals in snapshot.get("manufacturer_totals", {}).items():
+                series = ("manufacturer", manufacturer, None)
+                column[series_index.setdefault(series, len(series_index))] = totals["total"]
+            columns.append(column)
+        
+        matrix = [[column.get(i) for column in columns] for i in range(len(series_index))]
+        labels = [f"Q{quarter} {year}" for (year, quarter), _ in quarters]
+        return list(series_index), labels, matrix
+    
+    def forecast(self) -> Dict[str, Any]:
+        """Forecast every series and derive projected ranks"""
+        series, periods, matrix = self.build_matrix()
+        observed = [any(row[t] is not None for row in matrix) for t in range(len(periods))]
+        projected = damped_trend_forecast(matrix, self.ALPHA, self.BETA, self.PHI)
+        
+        groups: Dict[str, List[Dict[str, Any]]] = {"BEV": [], "PHEV": [], "manufacturer": []}
+        for (kind, manufacturer, model), values, value in zip(series, matrix, projected):
+            if value is None or values[-1] is None:
+                # Series that dropped out of the latest quarter are not projected
+                continue
+            entry = {
+                "manufacturer": manufacturer,
+                "last_actual": values[-1],
+                "projected_sales": int(round(value)),
+                "observations": sum(1 for v in values if v is not None)
+            }
+            if model is not None:
+                entry["model"] = model
+            groups[kind].append(entry)
+        
+        for entries in groups.values():
+            entries.sort(key=lambda e: e["projected_sales"], reverse=True)
+            for rank, entry in enumerate(entries, start=1):
+                entry["projected_rank"] = rank
+        
+        last_period = parse_period(periods[-1]) if periods else None
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "method": "damped_trend_exponential_smoothing",
+            "parameters": {"alpha": self.ALPHA, "beta": self.BETA, "phi": self.PHI},
+            "history_periods": periods,
+            "missing_periods": [period for period, seen in zip(periods, observed) if not seen],
+            "forecast_period": next_period(last_period) if last_period else None,
+            "bev_forecasts": groups["BEV"],
+            "phev_forecasts": groups["PHEV"],
+            "manufacturer_forecasts": groups["manufacturer"]
+        }
+    
+    def run(self) -> str:
+        """Main execution method"""
+        print("=" * 60)
+        print("EV Sales Forecaster - Starting")
+        print("=" * 60)
+        
+        history_version = get_history_store(self.history_dir).version()
+        
+        # Reuse the written forecast while the history has not changed
+        cached = None
+        if os.path.exists(self.output_path):
+            cached = load_json(self.output_path)
+        
+        if cached and cached.get("history_version") == history_version:
+            print(f"History unchanged, reusing forecast for {cached.get('forecast_period')}")
+        else:
+            forecast = self.forecast()
+            forecast["history_version"] = history_version
+            
+            dump_json(forecast, self.output_path)
+            
+            print(f"Forecast for {forecast['forecast_period']} from {len(forecast['history_periods'])} quarters")
+            print(f"  Series: {len(forecast['bev_forecasts'])} BEV, {len(forecast['phev_forecasts'])} PHEV, "
+                  f"{len(forecast['manufacturer_forecasts'])} manufacturers")
+        
+        print("=" * 60)
+        print("EV Sales Forecaster - Complete")
+        print(f"Output: {self.output_path}")
+        print("=" * 60)
+        
+        return self.output_path
+
+
+if __name__ == "__main__":
+    forecaster = SalesForecaster()
+    forecaster.run()
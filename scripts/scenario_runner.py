@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+EV Scenario Runner - Evaluates rankings and deltas under several market definitions
+The runner loads the current snapshot and the previous history snapshot once
+and hands them to every worker process, which builds its rankings generator and
+delta calculator once and runs its share of the scenarios (region groupings,
+thresholds, vehicle types) over that data, writing one output file per scenario
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.calculate_rankings_delta import RankingsDeltaCalculator
+from scripts.create_corrected_rankings import EVRankingsGenerator
+from scripts.json_backend import dump_json
+from scripts.market_share import group_regions
+
+
+VEHICLE_TYPES = {"BEV": "bev_rankings", "PHEV": "phev_rankings"}
+
+# Scenario threshold keys and the calculator attributes they override
+THRESHOLD_ATTRIBUTES = {
+    "sales_change": "SIGNIFICANT_SALES_CHANGE",
+    "rank_change": "SIGNIFICANT_RANK_CHANGE",
+    "growth_percent": "SIGNIFICANT_GROWTH_PERCENT"
+}
+
+# Snapshots and stage components shared by every scenario in a worker process
+_shared: Dict[str, Any] = {}
+
+
+def _init_worker(data_dir: str, history_dir: str, current: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    """Keep the runner's snapshots and build the generator and calculator once per worker process"""
+    _shared["current"] = current
+    _shared["previous"] = previous
+    _shared["generator"] = EVRankingsGenerator(output_dir=data_dir, history_dir=history_dir)
+    _shared["calculator"] = RankingsDeltaCalculator(data_dir=data_dir, history_dir=history_dir)
+
+
+def _scenario_rows(snapshot: Dict[str, Any], scenario: Dict[str, Any]) -> Dict[str, List[Dict]]:
+    """Copy a snapshot's ranking rows under a scenario's vehicle types and region groups"""
+    vehicle_types = scenario.get("vehicle_types", list(VEHICLE_TYPES))
+    region_groups = scenario.get("region_groups")
+    rows = {}
+    
+    for vehicle_type, key in VEHICLE_TYPES.items():
+        rows[key] = [
+            dict(row, regions=group_regions(row.get("regions", {}), region_groups))
+            for row in snapshot.get(key, [])
+        ] if vehicle_type in vehicle_types else []
+    
+    return rows
+
+
+def _build_snapshot(generator: EVRankingsGenerator, snapshot: Dict[str, Any],
+                    scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild a rankings snapshot under a scenario's market definition"""
+    rows = _scenario_rows(snapshot, scenario)
+    return generator.build_rankings(
+        rows["bev_rankings"],
+        rows["phev_rankings"],
+        snapshot.get("period"),
+        f"Scenario: {scenario['name']}"
+    )
+
+
+def evaluate_scenario(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate one scenario against the shared snapshots"""
+    generator, calculator = _shared["generator"], _shared["calculator"]
+    generator.market_share_calculator.region_groups = scenario.get("region_groups")
+    
+    # Thresholds not overridden by this scenario go back to the calculator's defaults
+    thresholds = scenario.get("thresholds", {})
+    unknown = set(thresholds) - set(THRESHOLD_ATTRIBUTES)
+    if unknown:
+        raise ValueError(f"Unknown threshold '{sorted(unknown)[0]}' in scenario {scenario['name']}")
+    for key, attribute in THRESHOLD_ATTRIBUTES.items():
+        setattr(calculator, attribute, thresholds.get(key, getattr(RankingsDeltaCalculator, attribute)))
+    
+    current = _build_snapshot(generator, _shared["current"], scenario)
+    previous = _shared["previous"]
+    if previous is not None:
+        delta = calculator.compare_rankings(current, _build_snapshot(generator, previous, scenario))
+    else:
+        delta = {
+            "generated_at": datetime.now().isoformat(),
+            "current_period": current.get("period"),
+            "previous_period": None,
+            "has_comparison": False,
+            "message": "No previous data available for comparison",
+            "alerts": []
+        }
+    
+    return {
+        "scenario": scenario,
+        "generated_at": datetime.now().isoformat(),
+        "rankings": current,
+        "delta": delta
+    }
+
+
+class ScenarioRunner:
+    """Runs scenario configurations over one loaded snapshot and history"""
+    
+    def __init__(self, data_dir: str = None, history_dir: str = None, config_path: str = None,
+                 max_workers: int = None):
+        """Initialize runner with data directories and the scenario configuration file"""
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        
+        if data_dir is None:
+            data_dir = os.path.join(base_dir, "data")
+        if history_dir is None:
+            history_dir = os.path.join(base_dir, "history")
+        if config_path is None:
+            config_path = os.path.join(data_dir, "reference", "scenarios.json")
+        
+        self.data_dir = data_dir
+        self.history_dir = history_dir
+        self.config_path = config_path
+        self.output_dir = os.path.join(data_dir, "scenarios")
+        self.max_workers = max_workers
+    
+    def load_scenarios(self, names: List[str] = None) -> List[Dict[str, Any]]:
+        """Load scenario configurations, optionally only the named ones"""
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            scenarios = json.load(f)["scenarios"]
+        
+        if names:
+            unknown = set(names) - {scenario["name"] for scenario in scenarios}
+            if unknown:
+                raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in scenarios if scenario["name"] in names]
+        
+        return scenarios
+    
+    def run(self, names: List[str] = None) -> Dict[str, str]:
+        """Evaluate scenarios in parallel and write one output per scenario"""
+        print("=" * 60)
+        print("EV Scenario Runner - Starting")
+        print("=" * 60)
+        
+        scenarios = self.load_scenarios(names)
+        
+        if not os.path.exists(os.path.join(self.data_dir, "ev_rankings_latest.json")):
+            raise FileNotFoundError(f"Current rankings not found in {self.data_dir}")
+        
+        # Snapshots are loaded once here and passed to each worker as it starts
+        loader = RankingsDeltaCalculator(data_dir=self.data_dir, history_dir=self.history_dir)
+        current = loader.load_current_rankings()
+        previous = loader.load_previous_rankings()
+        
+        outputs = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                 initargs=(self.data_dir, self.history_dir, current, previous)) as executor:
+            for scenario, result in zip(scenarios, executor.map(evaluate_scenario, scenarios)):
+                output_path = os.path.join(self.output_dir, f"{scenario['name']}.json")
+                dump_json(result, output_path)
+                outputs[scenario["name"]] = output_path
+                
+                summary = result["delta"].get("summary", {})
+                print(f"  {scenario['name']}: {summary.get('significant_changes', 0)} significant changes, "
+                      f"{summary.get('total_alerts', 0)} alerts")
+        
+        print("=" * 60)
+        print("EV Scenario Runner - Complete")
+        print(f"Output: {self.output_dir} ({len(outputs)} scenarios)")
+        print("=" * 60)
+        
+        return outputs
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run rankings and delta under several market definitions")
+    parser.add_argument("scenarios", nargs="*", help="Scenario names to run (default: all)")
+    parser.add_argument("--config", default=None, help="Scenario configuration file")
+    parser.add_argument("--workers", type=int, default=None, help="Maximum parallel scenarios")
+    args = parser.parse_args()
+    
+    runner = ScenarioRunner(config_path=args.config, max_workers=args.workers)
+    runner.run(args.scenarios)
+
+
+if __name__ == "__main__":
+    main()
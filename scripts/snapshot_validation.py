@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+EV Snapshot Validation - Checks rankings snapshots before any stage uses them
+Runs a fixed, precompiled set of column-wise checks (schema, rank uniqueness and
+contiguity, regional sums against sales_units, non-negative values) and reports
+every violation in one pass instead of stopping at the first. Invalid history
+snapshots are moved to history/quarantine/ so they cannot block later runs
+"""
+import os
+import shutil
+import sys
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.history_store import list_snapshots, load_index, write_index
+from scripts.json_backend import dump_json, load_json
+
+
+RANKING_SECTIONS = ["bev_rankings", "phev_rankings"]
+
+# Regional units may fall short of sales_units (unattributed sales) but not exceed it
+REGIONAL_SUM_TOLERANCE = 0.001
+
+_MISSING = object()
+
+
+def _is_number(value: Any) -> bool:
+    """True for int and float values, excluding bool"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_name(value: Any) -> bool:
+    """True for non-empty strings"""
+    return isinstance(value, str) and value != ""
+
+
+def _is_regions(value: Any) -> bool:
+    """True for a mapping of region name to numeric units"""
+    return isinstance(value, dict) and all(isinstance(k, str) and _is_number(v) for k, v in value.items())
+
+
+# Row schema compiled once: (field, required, check, expected description)
+ROW_SCHEMA: Tuple[Tuple[str, bool, Callable[[Any], bool], str], ...] = (
+    ("rank", True, lambda v: isinstance(v, int) and not isinstance(v, bool), "an integer"),
+    ("manufacturer", True, _is_name, "a non-empty string"),
+    ("model", True, _is_name, "a non-empty string"),
+    ("sales_units", True, _is_number, "a number"),
+    # Snapshots from before the regional breakdown have rows without regions
+    ("regions", False, _is_regions, "a mapping of region to units"),
+    ("revenue_usd_millions", False, _is_number, "a number"),
+    ("yoy_growth_percent", False, lambda v: v is None or _is_number(v), "a number or null"),
+    ("market_share_percent", False, lambda v: v is None or _is_number(v), "a number or null")
+)
+
+NON_NEGATIVE_FIELDS = ("sales_units", "revenue_usd_millions")
+
+QUARANTINE_DIRNAME = "quarantine"
+
+
+class SnapshotValidationError(ValueError):
+    """Raised when a snapshot fails validation; carries every violation"""
+    
+    def __init__(self, violations: List[Dict[str, Any]], source: str = None):
+        self.violations = violations
+        self.source = source
+        shown = "; ".join(format_violation(v) for v in violations[:5])
+        more = f" (and {len(violations) - 5} more)" if len(violations) > 5 else ""
+        super().__init__(f"{len(violations)} validation errors in {source or 'snapshot'}: {shown}{more}")
+
+
+def format_violation(violation: Dict[str, Any]) -> str:
+    """One-line description of a violation"""
+    location = violation["section"] or "snapshot"
+    if violation["row"] is not None:
+        location += f"[{violation['row']}]"
+    return f"{location}: {violation['message']}"
+
+
+def _check_section(section: str, rows: List[Any], add: Callable[..., None]) -> None:
+    """Run every row check over one ranking section's columns"""
+    is_mapping = [hasattr(row, "keys") for row in rows]
+    for index, ok in enumerate(is_mapping):
+        if not ok:
+            add(section, index, None, "schema", "row is not an object")
+    
+    # Schema: one column per field, with a validity vector reused by later checks
+    valid: Dict[str, List[bool]] = {}
+    columns: Dict[str, List[Any]] = {}
+    for field, required, check, expected in ROW_SCHEMA:
+        column = [row.get(field, _MISSING) if ok else _MISSING for row, ok in zip(rows, is_mapping)]
+        flags = []
+        for index, value in enumerate(column):
+            if value is _MISSING:
+                if required and is_mapping[index]:
+                    add(section, index, field, "schema", f"missing {field}")
+                flags.append(False)
+            elif check(value):
+                flags.append(True)
+            else:
+                add(section, index, field, "schema", f"{field} must be {expected}, got {value!r}")
+                flags.append(False)
+        columns[field] = column
+        valid[field] = flags
+    
+    # Ranks: unique and exactly 1..n
+    ranks = [rank for rank, ok in zip(columns["rank"], valid["rank"]) if ok]
+    counts = Counter(ranks)
+    for rank, count in sorted(counts.items()):
+        if count > 1:
+            add(section, None, "rank", "rank_unique", f"rank {rank} appears {count} times")
+    if len(ranks) == len(rows):
+        missing = sorted(set(range(1, len(rows) + 1)) - set(counts))
+        if missing:
+            add(section, None, "rank", "rank_contiguous",
+                f"ranks are not contiguous from 1 to {len(rows)} (missing {', '.join(map(str, missing))})")
+    
+    # Non-negative values
+    for field in NON_NEGATIVE_FIELDS:
+        for index, (value, ok) in enumerate(zip(columns[field], valid[field])):
+            if ok and value < 0:
+                add(section, index, field, "non_negative", f"{field} is negative ({value})")
+    
+    # Regional units: non-negative and summing to at most sales_units
+    for index, (regions, regions_ok, sales, sales_ok) in enumerate(
+        zip(columns["regions"], valid["regions"], columns["sales_units"], valid["sales_units"])
+    ):
+        if not regions_ok:
+            continue
+        for region, units in regions.items():
+            if units < 0:
+                add(section, index, "regions", "non_negative", f"regions.{region} is negative ({units})")
+        if sales_ok and sum(regions.values()) > sales * (1 + REGIONAL_SUM_TOLERANCE):
+            add(section, index, "regions", "regional_sum",
+                f"regional units {sum(regions.values()):,} exceed sales_units {sales:,}")
+
+
+def validate_snapshot(snapshot: Any) -> List[Dict[str, Any]]:
+    """Return every violation in a rankings snapshot (empty when valid)"""
+    violations: List[Dict[str, Any]] = []
+    
+    def add(section: Optional[str], row: Optional[int], field: Optional[str], check: str, message: str) -> None:
+        violations.append({"section": section, "row": row, "field": field, "check": check, "message": message})
+    
+    if not isinstance(snapshot, dict):
+        add(None, None, None, "schema", "snapshot is not an object")
+        return violations
+    if not _is_name(snapshot.get("period")):
+        add(None, None, "period", "schema", "missing period")
+    
+    for section in RANKING_SECTIONS:
+        rows = snapshot.get(section, _MISSING)
+        if rows is _MISSING:
+            add(section, None, None, "schema", f"missing {section}")
+        elif not isinstance(rows, list):
+            add(section, None, None, "schema", f"{section} must be a list")
+        else:
+            _check_section(section, rows, add)
+    
+    return violations
+
+
+def check_snapshot(snapshot: Any, source: str = None) -> None:
+    """Raise SnapshotValidationError if a snapshot has any violation"""
+    violations = validate_snapshot(snapshot)
+    if violations:
+        raise SnapshotValidationError(violations, source)
+
+
+def quarantine_snapshot(path: str) -> str:
+    """
+    Move a snapshot into the quarantine directory beside it, returning its new path
+    The history index is rewritten without the snapshot first, so it never
+    lists a missing file
+    """
+    history_dir = os.path.dirname(path)
+    index = load_index(history_dir)
+    entries = [entry for entry in index.get("snapshots", []) if entry.get("filename") != os.path.basename(path)]
+    if len(entries) != len(index.get("snapshots", [])):
+        write_index(history_dir, entries)
+    
+    quarantine_dir = os.path.join(history_dir, QUARANTINE_DIRNAME)
+    os.makedirs(quarantine_dir, exist_ok=True)
+    target = os.path.join(quarantine_dir, os.path.basename(path))
+    shutil.move(path, target)
+    return target
+
+
+class SnapshotValidator:
+    """Validates the current rankings and every history snapshot"""
+    
+    def __init__(self, data_dir: str = None, history_dir: str = None):
+        """Initialize validator with data directories"""
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        
+        if data_dir is None:
+            data_dir = os.path.join(base_dir, "data")
+        if history_dir is None:
+            history_dir = os.path.join(base_dir, "history")
+        
+        self.data_dir = data_dir
+        self.history_dir = history_dir
+        self.report_path = os.path.join(data_dir, "reports", "snapshot_validation.json")
+    
+    def validate_files(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Validate every snapshot file, returning violations per file"""
+        paths = [os.path.join(self.data_dir, "ev_rankings_latest.json")] + list_snapshots(self.history_dir)
+        results = {}
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            try:
+                snapshot = load_json(path)
+            except (OSError, ValueError) as exc:
+                results[path] = [{"section": None, "row": None, "field": None, "check": "parse",
+                                  "message": f"unreadable JSON: {exc}"}]
+                continue
+            results[path] = validate_snapshot(snapshot)
+        return results
+    
+    def run(self) -> str:
+        """
+        Validate all snapshots and write a report
+        Invalid history snapshots are quarantined with a warning; only an
+        invalid current snapshot fails the run
+        """
+        print("=" * 60)
+        print("EV Snapshot Validation - Starting")
+        print("=" * 60)
+        
+        current_path = os.path.join(self.data_dir, "ev_rankings_latest.json")
+        results = self.validate_files()
+        invalid = {path: violations for path, violations in results.items() if violations}
+        
+        quarantined = {}
+        for path in invalid:
+            if path != current_path:
+                quarantined[path] = quarantine_snapshot(path)
+        
+        root_dir = os.path.dirname(self.data_dir)
+        dump_json({
+            "generated_at": datetime.now().isoformat(),
+            "files_checked": len(results),
+            "files_invalid": len(invalid),
+            "violations": {os.path.relpath(path, root_dir): v for path, v in invalid.items()},
+            "quarantined": {os.path.relpath(path, root_dir): os.path.relpath(target, root_dir)
+                            for path, target in quarantined.items()}
+        }, self.report_path)
+        
+        print(f"Checked {len(results)} snapshots, {len(invalid)} invalid")
+        for path, violations in invalid.items():
+            print(f"  {os.path.basename(path)}: {len(violations)} violations")
+            for violation in violations[:10]:
+                print(f"    {format_violation(violation)}")
+        for path, target in quarantined.items():
+            print(f"Warning: Quarantined history snapshot {os.path.basename(path)} to {os.path.dirname(target)}")
+        
+        print("=" * 60)
+        print("EV Snapshot Validation - Complete")
+        print(f"Output: {self.report_path}")
+        print("=" * 60)
+        
+        if current_path in invalid:
+            raise SnapshotValidationError(invalid[current_path], current_path)
+        return self.report_path
+
+
+def main() -> int:
+    """Command line entry point"""
+    try:
+        SnapshotValidator().run()
+    except SnapshotValidationError:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
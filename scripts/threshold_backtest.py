@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+EV Threshold Backtest - Replays alert thresholds over ranking history
+Loads every history snapshot once, reduces each pair of consecutive quarters
+to columns of sales, rank and growth changes, and evaluates a grid of threshold
+configurations against those columns in parallel, reporting how many
+threshold-rule alerts each configuration would have raised and at which
+severities. Anomaly alerts do not depend on these thresholds and are not counted
+"""
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.calculate_rankings_delta import RankingsDeltaCalculator
+from scripts.history_store import get_history_store
+from scripts.json_backend import dump_json
+from scripts.sales_forecast import snapshots_by_quarter
+from scripts.scenario_runner import THRESHOLD_ATTRIBUTES
+from scripts.snapshot_validation import format_violation, validate_snapshot
+
+
+# Sales change above which a model sales alert is high severity (fixed in generate_alerts)
+HIGH_SALES_CHANGE = 50000
+
+DEFAULT_GRID = {
+    "sales_change": [5000, 10000, 20000, 50000],
+    "rank_change": [1, 2, 3],
+    "growth_percent": [25.0, 50.0, 100.0]
+}
+
+# Change columns shared by every configuration in a worker process
+_shared: Dict[str, Any] = {}
+
+
+def _init_worker(columns: Dict[str, Any]) -> None:
+    """Receive the change columns once per worker process"""
+    _shared.update(columns)
+
+
+def build_columns(snapshots: List[Dict[str, Any]], data_dir: str = None, history_dir: str = None) -> Dict[str, Any]:
+    """
+    Reduce consecutive quarters to threshold-independent change columns
+    Snapshots that fail validation are skipped; each quarter is represented by
+    its latest snapshot, so same-day reruns and compaction gaps do not add or
+    stretch pairs, and a quarter without a snapshot is in no pair. Model
+    columns hold absolute sales, rank and growth changes (None for new
+    entries); manufacturer columns hold absolute total changes
+    """
+    calculator = RankingsDeltaCalculator(data_dir=data_dir, history_dir=history_dir)
+    columns = {
+        "pairs": [], "invalid_snapshots": 0,
+        "model_pair": [], "model_new": [], "model_sales": [], "model_rank": [], "model_growth": [],
+        "manufacturer_pair": [], "manufacturer_new": [], "manufacturer_total": []
+    }
+    
+    valid = []
+    for snapshot in snapshots:
+        violations = validate_snapshot(snapshot)
+        if violations:
+            print(f"Warning: Skipping invalid snapshot for {snapshot.get('period')}: {format_violation(violations[0])}")
+            columns["invalid_snapshots"] += 1
+        else:
+            valid.append((None, snapshot))
+    quarters = [snapshot for _, snapshot in snapshots_by_quarter(valid)]
+    
+    for previous, current in zip(quarters, quarters[1:]):
+        if previous is None or current is None:
+            continue
+        index = len(columns["pairs"])
+        columns["pairs"].append(f"{previous.get('period')} → {current.get('period')}")
+        
+        for key, vehicle_type in (("bev_rankings", "BEV"), ("phev_rankings", "PHEV")):
+            for delta in calculator.calculate_model_deltas(current.get(key, []), previous.get(key, []), vehicle_type):
+                new = delta["is_new_entry"]
+                columns["model_pair"].append(index)
+                columns["model_new"].append(new)
+                columns["model_sales"].append(None if new else abs(delta["sales_change"]))
+                columns["model_rank"].append(None if new else abs(delta["rank_change"]))
+                columns["model_growth"].append(abs(delta["sales_change_percent"] or 0))
+        
+        for delta in calculator.calculate_manufacturer_deltas(
+            current.get("manufacturer_totals", {}), previous.get("manufacturer_totals", {})
+        ):
+            columns["manufacturer_pair"].append(index)
+            columns["manufacturer_new"].append(delta["is_new"])
+            columns["manufacturer_total"].append(abs(delta["total_change"]))
+    
+    return columns
+
+
+def evaluate_thresholds(thresholds: Dict[str, float]) -> Dict[str, Any]:
+    """Count the threshold-rule alerts one configuration raises across all history pairs"""
+    sales_limit = thresholds["sales_change"]
+    rank_limit = thresholds["rank_change"]
+    growth_limit = thresholds["growth_percent"]
+    
+    # Same rules as calculate_model_deltas/generate_alerts, applied column-wise
+    sales_hits = [s is not None and s > 0 and s >= sales_limit for s in _shared["model_sales"]]
+    rank_hits = [r is not None and r > 0 and r >= rank_limit for r in _shared["model_rank"]]
+    significant = [
+        new or sales or rank or (growth > 0 and growth >= growth_limit)
+        for new, sales, rank, growth in zip(_shared["model_new"], sales_hits, rank_hits, _shared["model_growth"])
+    ]
+    high_sales = [hit and s > HIGH_SALES_CHANGE for hit, s in zip(sales_hits, _shared["model_sales"])]
+    manufacturer_hits = [
+        not new and total >= sales_limit
+        for new, total in zip(_shared["manufacturer_new"], _shared["manufacturer_total"])
+    ]
+    
+    by_type = {
+        "new_entry": sum(_shared["model_new"]),
+        "rank_change": sum(rank_hits),
+        "sales_change": sum(sales_hits),
+        "new_manufacturer": sum(_shared["manufacturer_new"]),
+        "manufacturer_change": sum(manufacturer_hits)
+    }
+    by_severity = {
+        "high": sum(high_sales) + by_type["manufacturer_change"],
+        "medium": by_type["rank_change"] + by_type["sales_change"] - sum(high_sales),
+        "info": by_type["new_entry"] + by_type["new_manufacturer"]
+    }
+    
+    per_pair = [0] * len(_shared["pairs"])
+    for pair, new, sales, rank in zip(_shared["model_pair"], _shared["model_new"], sales_hits, rank_hits):
+        per_pair[pair] += new + sales + rank
+    for pair, new, hit in zip(_shared["manufacturer_pair"], _shared["manufacturer_new"], manufacturer_hits):
+        per_pair[pair] += new + hit
+    
+    return {
+        "thresholds": thresholds,
+        "threshold_alerts": sum(by_type.values()),
+        "alerts_by_severity": by_severity,
+        "alerts_by_type": by_type,
+        "significant_changes": sum(significant),
+        "alerts_per_pair": per_pair
+    }
+
+
+class ThresholdBacktester:
+    """Evaluates alert threshold grids against consecutive history snapshots"""
+    
+    def __init__(self, data_dir: str = None, history_dir: str = None, max_workers: int = None):
+        """Initialize backtester with data directories"""
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        
+        if data_dir is None:
+            data_dir = os.path.join(base_dir, "data")
+        if history_dir is None:
+            history_dir = os.path.join(base_dir, "history")
+        
+        self.data_dir = data_dir
+        self.history_dir = history_dir
+        self.max_workers = max_workers
+    
+    def build_grid(self, grid: Dict[str, List[float]] = None) -> List[Dict[str, float]]:
+        """Expand threshold value lists into every combination"""
+        grid = dict(DEFAULT_GRID, **(grid or {}))
+        unknown = set(grid) - set(THRESHOLD_ATTRIBUTES)
+        if unknown:
+            raise ValueError(f"Unknown thresholds: {', '.join(sorted(unknown))}")
+        
+        names = list(THRESHOLD_ATTRIBUTES)
+        return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    
+    def current_thresholds(self) -> Dict[str, float]:
+        """Thresholds the delta calculator uses today"""
+        return {name: getattr(RankingsDeltaCalculator, attribute) for name, attribute in THRESHOLD_ATTRIBUTES.items()}
+    
+    def run(self, grid: Dict[str, List[float]] = None, output_path: Optional[str] = None) -> str:
+        """Backtest every configuration in the grid and save the results"""
+        print("=" * 60)
+        print("EV Threshold Backtest - Starting")
+        print("=" * 60)
+        
+        configurations = self.build_grid(grid)
+        current = self.current_thresholds()
+        if current not in configurations:
+            configurations.append(current)
+        
+        # Load once; every configuration is evaluated against the same columns
+        snapshots = [snapshot for _, snapshot in get_history_store(self.history_dir).load_all()]
+        columns = build_columns(snapshots, self.data_dir, self.history_dir)
+        print(f"History: {len(snapshots)} snapshots ({columns['invalid_snapshots']} invalid), "
+              f"{len(columns['pairs'])} consecutive quarter pairs")
+        print(f"Configurations: {len(configurations)}")
+        
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                 initargs=(columns,)) as executor:
+            results = list(executor.map(evaluate_thresholds, configurations))
+        
+        for result in results:
+            result["is_current"] = result["thresholds"] == current
+        results.sort(key=lambda r: (r["threshold_alerts"], -r["thresholds"]["sales_change"]))
+        
+        print("\nThreshold-rule alerts (anomaly alerts are threshold-independent and not counted)")
+        print(f"{'sales':>7} {'rank':>5} {'growth':>7} {'alerts':>7} {'high':>5} {'medium':>7} {'info':>5} {'significant':>12}")
+        for result in results:
+            t, s = result["thresholds"], result["alerts_by_severity"]
+            marker = "  <- current" if result["is_current"] else ""
+            print(f"{t['sales_change']:>7,} {t['rank_change']:>5} {t['growth_percent']:>7} {result['threshold_alerts']:>7} "
+                  f"{s['high']:>5} {s['medium']:>7} {s['info']:>5} {result['significant_changes']:>12}{marker}")
+        
+        if output_path is None:
+            output_path = os.path.join(self.data_dir, "threshold_backtest.json")
+        dump_json({
+            "generated_at": datetime.now().isoformat(),
+            "snapshots": len(snapshots),
+            "invalid_snapshots": columns["invalid_snapshots"],
+            "pairs": columns["pairs"],
+            # Counts cover the model and manufacturer change rules these thresholds control
+            "alert_scope": "threshold_rules",
+            "current_thresholds": current,
+            "results": results
+        }, output_path)
+        
+        print("=" * 60)
+        print("EV Threshold Backtest - Complete")
+        print(f"Output: {output_path}")
+        print("=" * 60)
+        
+        return output_path
+
+
+def _values(text: str) -> List[float]:
+    """Parse a comma-separated list of threshold values"""
+    return [float(value) if "." in value else int(value) for value in text.split(",") if value]
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Backtest alert thresholds against ranking history")
+    parser.add_argument("--sales-change", type=_values, default=None, help="Sales change thresholds, e.g. 5000,10000")
+    parser.add_argument("--rank-change", type=_values, default=None, help="Rank change thresholds, e.g. 1,2,3")
+    parser.add_argument("--growth-percent", type=_values, default=None, help="Growth thresholds, e.g. 25.0,50.0")
+    parser.add_argument("--workers", type=int, default=None, help="Worker pool size")
+    parser.add_argument("--output", default=None, help="Output file (default: data/threshold_backtest.json)")
+    args = parser.parse_args()
+    
+    grid = {
+        name: values for name, values in (
+            ("sales_change", args.sales_change),
+            ("rank_change", args.rank_change),
+            ("growth_percent", args.growth_percent)
+        ) if values
+    }
+    ThresholdBacktester(max_workers=args.workers).run(grid, args.output)
+
+
+if __name__ == "__main__":
+    main()
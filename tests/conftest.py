@@ -0,0 +1,8 @@
+"""
+Shared test setup - puts the repository root on sys.path so tests import
+pipeline modules as scripts.<module>, the same way the scripts import each other
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,90 @@
+"""Tests for the robust anomaly detector"""
+import json
+import os
+
+from scripts.anomaly_detection import AnomalyDetector, robust_scores
+
+
+def _write_history(history_dir, series):
+    """Write one snapshot per value of a single BYD Seal series"""
+    for index, (units, regions) in enumerate(series):
+        row = {"rank": 1, "manufacturer": "BYD", "model": "Seal", "sales_units": units}
+        if regions is not None:
+            row["regions"] = regions
+        snapshot = {"period": f"Q{index % 4 + 1} {2020 + index // 4}", "bev_rankings": [row], "phev_rankings": []}
+        with open(os.path.join(history_dir, f"ev_rankings_202501{index + 1:02d}_000000.json"), "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+
+
+def test_scores_the_latest_change_against_the_baseline():
+    (score, center, spread), = robust_scores([[10, 12, 8, 11, 9, 60]], min_history=4)
+    assert center == 10
+    assert score > 3.5
+
+
+def test_short_or_flat_history_is_not_scored():
+    assert robust_scores([[10, 12, 30]], min_history=4) == [None]
+    assert robust_scores([[5, 5, 5, 5, 40]], min_history=4) == [None]
+    assert robust_scores([[10, 12, 8, 11, None]], min_history=4) == [None]
+
+
+def test_zero_mad_falls_back_to_mean_deviation():
+    (score, center, spread), = robust_scores([[5, 5, 5, 5, 25, 45]], min_history=4)
+    assert center == 5
+    assert spread > 0
+
+
+def test_detects_global_and_regional_jumps(tmp_path):
+    history = [(1000 + 100 * i + (10 if i % 2 else 0), {"China": 600 + 50 * i + (5 if i % 2 else 0)}) for i in range(6)]
+    history.append((3000, {"China": 2500}))
+    _write_history(tmp_path, history)
+    
+    detector = AnomalyDetector(history_dir=str(tmp_path))
+    anomalies = detector.detect()
+    
+    assert {a["region"] for a in anomalies} == {"global", "China"}
+    alerts = detector.generate_alerts(anomalies)
+    assert all(alert["type"] == "anomaly" for alert in alerts)
+    assert any("in China rose" in alert["message"] for alert in alerts)
+
+
+def test_snapshots_without_regions_are_scored_on_global_sales(tmp_path):
+    history = [(1000 + 100 * i + (10 if i % 2 else 0), None) for i in range(6)] + [(100, None)]
+    _write_history(tmp_path, history)
+    
+    anomalies = AnomalyDetector(history_dir=str(tmp_path)).detect()
+    assert [(a["region"], a["change"] < 0) for a in anomalies] == [("global", True)]
+
+
+
+def _write_snapshot(history_dir, stamp, period, units):
+    """Write a single-row snapshot with a China breakdown"""
+    row = {"rank": 1, "manufacturer": "BYD", "model": "Seal", "sales_units": units, "regions": {"China": units // 2}}
+    with open(os.path.join(history_dir, f"ev_rankings_{stamp}.json"), "w", encoding="utf-8") as f:
+        json.dump({"period": period, "bev_rankings": [row], "phev_rankings": []}, f)
+
+
+def test_baseline_uses_one_snapshot_per_quarter(tmp_path):
+    single, reruns = tmp_path / "single", tmp_path / "reruns"
+    single.mkdir()
+    reruns.mkdir()
+    units = [1000 + 100 * i + (10 if i % 2 else 0) for i in range(6)] + [3000]
+    for index, value in enumerate(units):
+        period = f"Q{index % 4 + 1} {2020 + index // 4}"
+        _write_snapshot(single, f"202501{index + 1:02d}_000000", period, value)
+        # Same-day reruns: an earlier snapshot of the quarter with stale numbers
+        _write_snapshot(reruns, f"202501{index + 1:02d}_000000", period, value // 2)
+        _write_snapshot(reruns, f"202501{index + 1:02d}_010000", period, value)
+    
+    expected = AnomalyDetector(history_dir=str(single)).detect()
+    assert AnomalyDetector(history_dir=str(reruns)).detect() == expected
+    assert {a["region"] for a in expected} == {"global", "China"}
+
+
+def test_missing_quarters_are_gaps_not_changes(tmp_path):
+    _write_snapshot(tmp_path, "20250101_000000", "Q1 2020", 100)
+    _write_snapshot(tmp_path, "20250102_000000", "Q3 2020", 200)
+    
+    _, changes, _ = AnomalyDetector(history_dir=str(tmp_path)).build_changes()
+    # Q1 -> Q2 and Q2 -> Q3, with Q2 empty
+    assert changes == [[None, None], [None, None]]
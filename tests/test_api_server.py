@@ -0,0 +1,115 @@
+"""Tests for the local HTTP API"""
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from scripts.api_server import APIServer, etag_matches, variant_etag
+
+
+def _write_data(data_dir):
+    rows = [
+        {"rank": i, "manufacturer": "BYD" if i % 2 else "Tesla", "model": f"Model {i}",
+         "sales_units": 1000 - i, "regions": {"China": i * 10, "Europe": 0}}
+        for i in range(1, 41)
+    ]
+    files = {
+        "ev_rankings_latest.json": {"period": "Q4 2026", "bev_rankings": rows, "phev_rankings": []},
+        "ev_rankings_delta.json": {"alerts": [{"severity": "high", "type": "rank_change"},
+                                              {"severity": "low", "type": "new_entry"}]},
+        "ev_news_latest.json": {"news_by_region": {"China": [{"title": "a", "manufacturer": "BYD"}]}}
+    }
+    for filename, data in files.items():
+        (data_dir / filename).write_text(json.dumps(data), encoding="utf-8")
+
+
+async def _request(port, path, headers=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"GET {path} HTTP/1.1", "Host: localhost"] + [f"{k}: {v}" for k, v in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    response_headers = {name.lower(): value.strip() for name, _, value in (h.partition(":") for h in header_lines)}
+    return int(status_line.split()[1]), response_headers, body
+
+
+def _serve(data_dir, requests):
+    """Run the server on a free port and make requests against it in order"""
+    async def scenario():
+        server = APIServer(str(data_dir))
+        server.cache.reload_if_changed()
+        listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return [await _request(port, path, headers) for path, headers in requests]
+        finally:
+            listener.close()
+            await listener.wait_closed()
+    return asyncio.run(scenario())
+
+
+def test_etag_matching_accepts_lists_weak_tags_and_wildcard():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abc-gzip"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert variant_etag('"abc"', "gzip") == '"abc-gzip"'
+    assert variant_etag('"abc"', None) == '"abc"'
+
+
+def test_gzip_and_identity_get_distinct_etags(tmp_path):
+    _write_data(tmp_path)
+    plain, zipped = _serve(tmp_path, [
+        ("/rankings/bev", {}),
+        ("/rankings/bev", {"Accept-Encoding": "gzip"})
+    ])
+    
+    assert plain[0] == zipped[0] == 200
+    assert zipped[1]["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(zipped[2])) == json.loads(plain[2])
+    assert plain[1]["etag"] != zipped[1]["etag"]
+    assert zipped[1]["etag"] == variant_etag(plain[1]["etag"], "gzip")
+
+
+def test_conditional_requests(tmp_path):
+    _write_data(tmp_path)
+    (first,) = _serve(tmp_path, [("/rankings/bev", {"Accept-Encoding": "gzip"})])
+    etag = first[1]["etag"]
+    
+    matched, weak, other_encoding, wildcard = _serve(tmp_path, [
+        ("/rankings/bev", {"Accept-Encoding": "gzip", "If-None-Match": f'"stale", {etag}'}),
+        ("/rankings/bev", {"Accept-Encoding": "gzip", "If-None-Match": f"W/{etag}"}),
+        ("/rankings/bev", {"If-None-Match": etag}),
+        ("/rankings/bev", {"If-None-Match": "*"})
+    ])
+    
+    assert matched[0] == 304 and matched[2] == b""
+    assert weak[0] == 304
+    assert other_encoding[0] == 200
+    assert wildcard[0] == 304
+
+
+@pytest.mark.parametrize("path,expected", [
+    ("/rankings/bev?region=China&limit=2", (40, ["Model 40", "Model 39"])),
+    ("/rankings/bev?manufacturer=tesla&limit=1", (20, ["Model 2"])),
+])
+def test_rankings_filters_and_pagination(tmp_path, path, expected):
+    _write_data(tmp_path)
+    ((status, _, body),) = _serve(tmp_path, [(path, {})])
+    payload = json.loads(body)
+    
+    assert status == 200
+    assert (payload["total"], [row["model"] for row in payload["items"]]) == expected
+
+
+def test_errors(tmp_path):
+    _write_data(tmp_path)
+    unknown, bad_limit = _serve(tmp_path, [("/nope", {}), ("/alerts?limit=x", {})])
+    
+    assert unknown[0] == 404
+    assert bad_limit[0] == 400
@@ -0,0 +1,150 @@
+"""Tests for the warm workspace update in bootstrap.sh"""
+import os
+import shutil
+import subprocess
+
+import pytest
+
+
+BOOTSTRAP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bootstrap.sh")
+
+# Stands in for the real update: rewrites a data file, adds a history snapshot
+# and commits both like the cron job does
+FAKE_UPDATE = """#!/bin/bash
+set -e
+cd "$PROJECT_DIR"
+echo "{\\"run\\": \\"$RUN_ID\\"}" > data/out.json
+mkdir -p history
+echo "{\\"run\\": \\"$RUN_ID\\"}" > "history/ev_rankings_$RUN_ID.json"
+git add -A
+git commit -qm "Auto-update: $RUN_ID"
+"""
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None or shutil.which("bash") is None,
+                                reason="needs git and bash")
+
+
+def _git(cwd, *args):
+    """Run git in cwd and return its stdout"""
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def _write(path, content):
+    """Write a file, creating its directory"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+@pytest.fixture
+def origin(tmp_path, monkeypatch):
+    """Bare origin repository plus a clone used to push upstream changes"""
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    
+    upstream = tmp_path / "upstream"
+    upstream.mkdir()
+    _git(upstream, "init", "-q", "-b", "main")
+    _write(str(upstream / "ev_intelligence_update.sh"), FAKE_UPDATE)
+    _write(str(upstream / "scripts" / "__init__.py"), "")
+    _write(str(upstream / "data" / "out.json"), "{}\n")
+    _write(str(upstream / "README.md"), "upstream\n")
+    _write(str(upstream / ".gitignore"), "__pycache__/\n")
+    _git(upstream, "add", "-A")
+    _git(upstream, "commit", "-qm", "initial")
+    
+    bare = tmp_path / "origin.git"
+    _git(tmp_path, "clone", "-q", "--bare", str(upstream), str(bare))
+    _git(upstream, "remote", "add", "origin", str(bare))
+    _git(upstream, "fetch", "-q", "origin")
+    return upstream, bare
+
+
+def _bootstrap(tmp_path, bare, run_id):
+    """Run bootstrap.sh in warm mode against the bare origin"""
+    env = dict(os.environ, REPO_URL=str(bare), WORKSPACE_DIR=str(tmp_path / "workspace"),
+               DASHBOARD_REPO_DIR=str(tmp_path / "no-dashboard"), RUN_ID=run_id)
+    return subprocess.run(["bash", BOOTSTRAP, "warm"], cwd=str(tmp_path), env=env,
+                          capture_output=True, text=True)
+
+
+def _push_upstream(upstream, path, content, message):
+    """Commit a change in the upstream clone and push it to origin"""
+    _write(str(upstream / path), content)
+    _git(upstream, "commit", "-qam", message)
+    _git(upstream, "push", "-q", "origin", "main")
+
+
+def test_unpushed_auto_updates_are_rebased_onto_upstream(tmp_path, origin):
+    upstream, bare = origin
+    assert _bootstrap(tmp_path, bare, "1").returncode == 0
+    
+    _push_upstream(upstream, "README.md", "changed upstream\n", "upstream change")
+    result = _bootstrap(tmp_path, bare, "2")
+    
+    assert result.returncode == 0, result.stdout + result.stderr
+    workspace = tmp_path / "workspace"
+    subjects = _git(workspace, "log", "--format=%s").splitlines()
+    assert subjects == ["Auto-update: 2", "Auto-update: 1", "upstream change", "initial"]
+    assert (workspace / "README.md").read_text() == "changed upstream\n"
+
+
+def test_conflicting_data_files_keep_local_history(tmp_path, origin):
+    upstream, bare = origin
+    assert _bootstrap(tmp_path, bare, "1").returncode == 0
+    
+    _push_upstream(upstream, "data/out.json", '{"run": "upstream"}\n', "upstream data")
+    result = _bootstrap(tmp_path, bare, "2")
+    
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Taking upstream's copy of regenerated files: data/out.json" in result.stdout
+    workspace = tmp_path / "workspace"
+    subjects = _git(workspace, "log", "--format=%s").splitlines()
+    assert subjects == ["Auto-update: 2", "Auto-update: 1", "upstream data", "initial"]
+    # The snapshot from the conflicting run survives the rebase
+    assert (workspace / "history" / "ev_rankings_1.json").exists()
+    assert (workspace / "data" / "out.json").read_text() == '{"run": "2"}\n'
+
+
+def test_conflict_outside_data_files_stops_the_run(tmp_path, origin):
+    upstream, bare = origin
+    assert _bootstrap(tmp_path, bare, "1").returncode == 0
+    
+    _write(str(upstream / "history" / "ev_rankings_1.json"), '{"run": "upstream"}\n')
+    _git(upstream, "add", "-A")
+    _git(upstream, "commit", "-qm", "upstream history")
+    _git(upstream, "push", "-q", "origin", "main")
+    result = _bootstrap(tmp_path, bare, "2")
+    
+    assert result.returncode != 0
+    assert "history/ev_rankings_1.json" in result.stderr
+    workspace = tmp_path / "workspace"
+    assert _git(workspace, "log", "-1", "--format=%s") == "Auto-update: 1"
+    assert _git(workspace, "status", "--porcelain") == ""
+
+
+def test_conflicting_manual_commit_stops_the_run(tmp_path, origin):
+    upstream, bare = origin
+    assert _bootstrap(tmp_path, bare, "1").returncode == 0
+    
+    workspace = tmp_path / "workspace"
+    _write(str(workspace / "README.md"), "local edit\n")
+    _git(workspace, "commit", "-qam", "local fix")
+    _push_upstream(upstream, "README.md", "changed upstream\n", "upstream change")
+    result = _bootstrap(tmp_path, bare, "2")
+    
+    assert result.returncode != 0
+    assert "conflict with" in result.stderr
+    assert _git(workspace, "log", "-1", "--format=%s") == "local fix"
+
+
+def test_uncommitted_changes_stop_the_run(tmp_path, origin):
+    _, bare = origin
+    assert _bootstrap(tmp_path, bare, "1").returncode == 0
+    
+    _write(str(tmp_path / "workspace" / "README.md"), "dirty\n")
+    result = _bootstrap(tmp_path, bare, "2")
+    
+    assert result.returncode != 0
+    assert "uncommitted changes" in result.stderr
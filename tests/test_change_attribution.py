@@ -0,0 +1,63 @@
+"""Tests for manufacturer and regional change attribution"""
+import json
+
+from scripts.change_attribution import UNALLOCATED, ChangeAttributor
+
+
+def _row(manufacturer, model, sales, regions=None):
+    row = {"manufacturer": manufacturer, "model": model, "sales_units": sales}
+    if regions is not None:
+        row["regions"] = regions
+    return row
+
+
+PREVIOUS = {"period": "Q3 2026", "bev_rankings": [
+    _row("BYD", "Seal", 100, {"China": 80, "Europe": 20}),
+    _row("Tesla", "Model 3", 90, {"USA": 60, "Europe": 30})
+], "phev_rankings": [_row("BYD", "Song", 50, {"China": 50})]}
+
+CURRENT = {"period": "Q4 2026", "bev_rankings": [
+    _row("BYD", "Seal", 150, {"China": 110, "Europe": 30}),
+    _row("Tesla", "Model 3", 70, {"USA": 50, "Europe": 20}),
+    _row("BYD", "Dolphin", 40, {"Europe": 40})
+], "phev_rankings": [_row("BYD", "Song", 45, {"China": 45})]}
+
+
+def test_contributions_sum_to_each_total_change():
+    attribution = ChangeAttributor().attribute(CURRENT, PREVIOUS)
+    
+    byd = attribution["manufacturers"]["BYD"]
+    assert byd["total_change"] == (150 + 40 + 45) - (100 + 50)
+    assert byd["region_changes"] == {"China": 25, "Europe": 50, UNALLOCATED: 10}
+    assert sum(entry["change"] for entry in byd["top_contributors"]) == byd["total_change"]
+    assert byd["top_contributors"][0] == {"vehicle_type": "BEV", "model": "Dolphin", "region": "Europe",
+                                          "change": 40, "share_of_change_percent": 47.1}
+
+
+def test_regions_rank_contributors_across_manufacturers():
+    regions = ChangeAttributor(top_contributors=2).attribute(CURRENT, PREVIOUS)["regions"]
+    
+    assert UNALLOCATED not in regions
+    assert regions["Europe"]["total_change"] == 40
+    assert [(e["manufacturer"], e["model"]) for e in regions["Europe"]["top_contributors"]] == [
+        ("BYD", "Dolphin"), ("BYD", "Seal")
+    ]
+
+
+def test_rows_without_regions_count_as_unallocated():
+    previous = {"bev_rankings": [_row("Tesla", "Model Y", 100)]}
+    current = {"bev_rankings": [_row("Tesla", "Model Y", 130, {"USA": 100})]}
+    
+    tesla = ChangeAttributor().attribute(current, previous)["manufacturers"]["Tesla"]
+    assert tesla["region_changes"] == {"USA": 100, UNALLOCATED: -70}
+    assert tesla["total_change"] == 30
+
+
+def test_run_compares_the_two_latest_snapshots(tmp_path):
+    for stamp, snapshot in (("20260701", PREVIOUS), ("20261001", CURRENT)):
+        (tmp_path / f"ev_rankings_{stamp}_000000.json").write_text(json.dumps(snapshot), encoding="utf-8")
+    
+    attribution = ChangeAttributor(history_dir=str(tmp_path)).run()
+    assert attribution["manufacturers"]["Tesla"]["total_change"] == -20
+    
+    assert ChangeAttributor(history_dir=str(tmp_path / "empty")).run() == {"manufacturers": {}, "regions": {}}
@@ -0,0 +1,98 @@
+"""Tests for FX rate lookup and revenue normalization"""
+import json
+import os
+
+import pytest
+
+from scripts.currency import CurrencyNormalizer, FXRateTable
+
+
+RATES = {
+    "version": "test",
+    "base": "USD",
+    "rates": {
+        "2025-01-01": {"USD": 1.0, "CNY": 8.0, "EUR": 0.5},
+        "2025-07-01": {"USD": 1.0, "CNY": 7.0, "EUR": 0.8}
+    }
+}
+
+
+@pytest.fixture
+def rates_path(tmp_path):
+    path = tmp_path / "fx_rates.json"
+    path.write_text(json.dumps(RATES), encoding="utf-8")
+    return str(path)
+
+
+def _rows():
+    return [
+        {"model": "Seal", "revenue_usd_millions": 0, "revenue_by_currency_millions": {"CNY": 70.0, "USD": 5.0}},
+        {"model": "ID.4", "revenue_usd_millions": 0, "revenue_by_currency_millions": {"EUR": 8.0}},
+        {"model": "Model Y", "revenue_usd_millions": 42}
+    ]
+
+
+def test_rates_in_effect_on_a_date(rates_path):
+    table = FXRateTable(rates_path)
+    
+    assert table.rates_for("2025-03-31")["CNY"] == 8.0
+    assert table.rates_for("2025-07-01")["CNY"] == 7.0
+    with pytest.raises(ValueError):
+        table.rates_for("2024-12-31")
+
+
+def test_normalize_converts_local_revenue(rates_path):
+    rows = CurrencyNormalizer(FXRateTable(rates_path)).normalize_rankings(_rows(), as_of="2025-08-01")
+    
+    assert [row["revenue_usd_millions"] for row in rows] == [15, 10, 42]
+
+
+def test_dates_past_coverage_warn(rates_path, capsys):
+    table = FXRateTable(rates_path)
+    assert table.valid_until == "2025-10-01"
+    
+    table.rates_for("2025-09-30")
+    assert "past the table's coverage" not in capsys.readouterr().out
+    table.rates_for("2026-10-19")
+    table.rates_for("2026-10-19")
+    assert capsys.readouterr().out.count("past the table's coverage") == 1
+
+
+def test_declared_valid_until_is_used(tmp_path):
+    path = tmp_path / "fx_rates.json"
+    path.write_text(json.dumps(dict(RATES, valid_until="2027-01-01")), encoding="utf-8")
+    
+    assert FXRateTable(str(path)).valid_until == "2027-01-01"
+
+
+def test_missing_table_warns_and_leaves_rows(tmp_path, capsys):
+    normalizer = CurrencyNormalizer(FXRateTable(str(tmp_path / "missing.json")))
+    rows = normalizer.normalize_rankings(_rows(), as_of="2025-08-01")
+    
+    assert [row["revenue_usd_millions"] for row in rows] == [0, 0, 42]
+    assert "FX rates not found" in capsys.readouterr().out
+
+
+def test_changed_table_is_reloaded_and_memo_invalidated(rates_path):
+    normalizer = CurrencyNormalizer(FXRateTable(rates_path))
+    assert normalizer.normalize_rankings(_rows(), "2025-08-01", snapshot_key="s")[1]["revenue_usd_millions"] == 10
+    
+    changed = json.loads(json.dumps(RATES))
+    changed["rates"]["2025-07-01"]["EUR"] = 0.4
+    with open(rates_path, "w", encoding="utf-8") as f:
+        json.dump(changed, f)
+    os.utime(rates_path, ns=(1, 1))
+    
+    assert normalizer.normalize_rankings(_rows(), "2025-08-01", snapshot_key="s")[1]["revenue_usd_millions"] == 20
+
+
+def test_caches_are_bounded(rates_path, monkeypatch):
+    monkeypatch.setattr(FXRateTable, "MAX_CACHED_DATES", 3)
+    monkeypatch.setattr(CurrencyNormalizer, "MAX_MEMO_ENTRIES", 2)
+    normalizer = CurrencyNormalizer(FXRateTable(rates_path))
+    
+    for day in range(1, 20):
+        normalizer.normalize_rankings(_rows(), f"2025-08-{day:02d}", snapshot_key=day)
+    
+    assert len(normalizer.table._by_date) <= 3
+    assert len(normalizer._memo) <= 2
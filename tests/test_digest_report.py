@@ -0,0 +1,102 @@
+"""Tests for the digest report and its section cache"""
+import json
+import os
+
+import pytest
+
+from scripts.digest_report import DigestReportGenerator
+from scripts.json_backend import write_atomic
+
+
+def _write(data_dir, filename, data):
+    (data_dir / filename).write_text(json.dumps(data), encoding="utf-8")
+
+
+def _write_sources(data_dir, news_title="BYD opens a plant"):
+    _write(data_dir, "ev_rankings_latest.json", {
+        "period": "Q4 2026",
+        "market_statistics": {"total_ev_sales": 1500, "bev_market_share": 60.0, "phev_market_share": 40.0},
+        "regional_breakdown": {"China": {"bev": 800, "phev": 500, "total": 1300}}
+    })
+    _write(data_dir, "ev_rankings_delta.json", {
+        "current_period": "Q4 2026",
+        "previous_period": "Q3 2026",
+        "summary": {"total_alerts": 2, "high_severity_alerts": 1},
+        "bev_model_deltas": [
+            {"manufacturer": "BYD", "model": "Seal", "vehicle_type": "BEV", "current_rank": 1, "rank_change": 1,
+             "current_sales": 900, "sales_change": 200, "sales_change_percent": 28.6},
+            {"manufacturer": "Tesla", "model": "Model 3", "vehicle_type": "BEV", "current_rank": 2, "rank_change": -1,
+             "current_sales": 600, "sales_change": -100, "sales_change_percent": -14.3}
+        ],
+        "alerts": [{"severity": "medium", "message": "Tesla <fell>"}, {"severity": "high", "message": "BYD rose"}]
+    })
+    _write(data_dir, "ev_news_latest.json", {
+        "total_articles": 1,
+        "regional_summaries": {"China": "Busy quarter"},
+        "news_by_region": {"China": [{"title": news_title, "url": "https://example.com/a", "source": "CnEVPost",
+                                      "date": "2026-10-01T08:00:00", "region": "China", "manufacturer": "BYD",
+                                      "category": "production", "impact": "high"}]}
+    })
+
+
+def test_first_run_renders_every_section(tmp_path):
+    _write_sources(tmp_path)
+    generator = DigestReportGenerator(data_dir=str(tmp_path))
+    
+    report = generator.render()
+    markdown_path, html_path = generator.write(report)
+    
+    assert report["rendered"] == ["overview", "movers", "alerts", "regions", "news"]
+    markdown = open(markdown_path, encoding="utf-8").read()
+    assert markdown.startswith("# EV Market Intelligence Digest — Q4 2026")
+    assert "Q3 2026 → Q4 2026" in markdown
+    assert markdown.index("**HIGH** BYD rose") < markdown.index("**MEDIUM** Tesla")
+    assert "| BYD Seal | BEV | #1 | +1 | 900 | +200 | +28.6% |" in markdown
+    assert "Tesla &lt;fell&gt;" in open(html_path, encoding="utf-8").read()
+
+
+def test_unchanged_sections_are_reused(tmp_path):
+    _write_sources(tmp_path)
+    generator = DigestReportGenerator(data_dir=str(tmp_path))
+    generator.write(generator.render())
+    
+    assert generator.render()["rendered"] == []
+    
+    _write_sources(tmp_path, news_title="BYD opens a second plant")
+    report = generator.render()
+    assert report["rendered"] == ["news"]
+    markdown_path, _ = generator.write(report)
+    assert "BYD opens a second plant" in open(markdown_path, encoding="utf-8").read()
+
+
+def test_missing_sources_render_empty_sections(tmp_path):
+    generator = DigestReportGenerator(data_dir=str(tmp_path))
+    markdown_path, _ = generator.write(generator.render())
+    
+    markdown = open(markdown_path, encoding="utf-8").read()
+    assert "No alerts this period." in markdown
+    assert "No news this period." in markdown
+
+
+def test_failed_write_keeps_previous_files_and_section_cache(tmp_path, monkeypatch):
+    _write_sources(tmp_path)
+    generator = DigestReportGenerator(data_dir=str(tmp_path))
+    markdown_path, html_path = generator.write(generator.render())
+    previous_html = open(html_path, encoding="utf-8").read()
+    
+    _write_sources(tmp_path, news_title="BYD opens a second plant")
+    report = generator.render()
+    
+    def fail_on_html(raw, path):
+        if path == html_path:
+            raise OSError("disk full")
+        return write_atomic(raw, path)
+    
+    monkeypatch.setattr("scripts.digest_report.write_atomic", fail_on_html)
+    with pytest.raises(OSError):
+        generator.write(report)
+    
+    assert open(html_path, encoding="utf-8").read() == previous_html
+    assert not [name for name in os.listdir(generator.output_dir) if name.startswith(".tmp-")]
+    # The cache was not updated, so the news section is rendered again next time
+    assert generator.render()["rendered"] == ["news"]
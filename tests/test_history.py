@@ -0,0 +1,123 @@
+"""Tests for history compaction and the shared history store"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from scripts.history_compaction import HistoryCompactor
+from scripts.history_store import HistoryStore, get_history_store, list_snapshots, load_index
+
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+def _snapshot(history_dir, timestamp, period="Q4 2026"):
+    path = os.path.join(history_dir, f"ev_rankings_{timestamp.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"period": period, "bev_rankings": [], "phev_rankings": []}, f)
+    return path
+
+
+def test_compaction_keeps_recent_and_one_per_bucket(tmp_path):
+    recent = [_snapshot(tmp_path, NOW - timedelta(days=d)) for d in (1, 3)]
+    # Saturday and Friday of the same ISO week, 10 weeks back: only the newest survives
+    weekly = [_snapshot(tmp_path, NOW - timedelta(days=72, hours=h)) for h in (0, 24)]
+    # Same month, a year back
+    monthly = [_snapshot(tmp_path, datetime(2025, 9, d)) for d in (2, 20)]
+    
+    result = HistoryCompactor(history_dir=str(tmp_path)).compact(now=NOW)
+    
+    kept = list_snapshots(str(tmp_path))
+    assert kept == sorted([monthly[1], weekly[0]] + recent)
+    assert sorted(result["dropped"]) == sorted(os.path.basename(p) for p in (weekly[1], monthly[0]))
+    index = load_index(str(tmp_path))
+    assert [entry["filename"] for entry in index["snapshots"]] == [os.path.basename(p) for p in kept]
+    assert all("mtime_ns" in entry and "size_bytes" in entry for entry in index["snapshots"])
+
+
+def test_two_newest_snapshots_are_always_kept(tmp_path):
+    old = [_snapshot(tmp_path, datetime(2024, 1, d)) for d in (1, 2, 3, 4)]
+    
+    HistoryCompactor(history_dir=str(tmp_path)).compact(now=NOW)
+    
+    # The protected pair does not claim the quarter, so its newest other snapshot stays too
+    assert list_snapshots(str(tmp_path)) == old[1:]
+
+
+def test_store_only_stats_snapshots_missing_from_index(tmp_path, monkeypatch):
+    for days in (5, 4, 3):
+        _snapshot(tmp_path, NOW - timedelta(days=days))
+    HistoryCompactor(history_dir=str(tmp_path)).compact(now=NOW)
+    
+    store = HistoryStore(str(tmp_path))
+    stat_calls = []
+    original = store._signature
+    monkeypatch.setattr(store, "_signature", lambda path: stat_calls.append(path) or original(path))
+    
+    assert len(store.load_all()) == 3
+    assert [os.path.basename(p) for p in stat_calls] == ["index.json"]
+    
+    # A snapshot written after the index makes the listing newer, so indexed files are checked too
+    stat_calls.clear()
+    _snapshot(tmp_path, NOW)
+    assert len(store.load_all()) == 4
+    assert len(stat_calls) == 5
+
+
+def test_store_rereads_indexed_snapshot_rewritten_in_place(tmp_path):
+    path = _snapshot(tmp_path, NOW - timedelta(days=1), period="Q3 2026")
+    HistoryCompactor(history_dir=str(tmp_path)).compact(now=NOW)
+    store = HistoryStore(str(tmp_path))
+    assert store.load_all()[0][1]["period"] == "Q3 2026"
+    version = store.version()
+    
+    # A checkout replaces the file under the same name
+    replacement = os.path.join(tmp_path, "checkout.tmp")
+    with open(replacement, "w", encoding="utf-8") as f:
+        json.dump({"period": "Q4 2026", "bev_rankings": [{"rank": 1}], "phev_rankings": []}, f)
+    os.replace(replacement, path)
+    
+    assert store.load_all()[0][1]["period"] == "Q4 2026"
+    assert store.version() != version
+
+
+def test_store_reloads_changed_and_forgets_removed_snapshots(tmp_path):
+    first = _snapshot(tmp_path, NOW - timedelta(days=1), period="Q3 2026")
+    second = _snapshot(tmp_path, NOW)
+    store = HistoryStore(str(tmp_path))
+    version = store.version()
+    assert [s["period"] for _, s in store.load_all()] == ["Q3 2026", "Q4 2026"]
+    
+    os.remove(first)
+    assert [s["period"] for _, s in store.load_all()] == ["Q4 2026"]
+    assert store.version() != version
+    assert list(store._cache) == [second]
+
+
+def test_shared_store_is_safe_across_threads(tmp_path):
+    for days in range(20):
+        _snapshot(tmp_path, NOW - timedelta(days=days))
+    store = get_history_store(str(tmp_path))
+    assert get_history_store(str(tmp_path) + "/") is store
+    errors = []
+    
+    def load():
+        try:
+            for _ in range(20):
+                store.load_all()
+        except Exception as exc:
+            errors.append(exc)
+    
+    def remove():
+        for path in list_snapshots(str(tmp_path))[:10]:
+            os.remove(path)
+    
+    threads = [threading.Thread(target=load) for _ in range(4)] + [threading.Thread(target=remove)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    # A load racing a removal may fail to open the file, but never corrupts the cache
+    assert all(isinstance(exc, FileNotFoundError) for exc in errors)
+    assert len(store.load_all()) == 10
@@ -0,0 +1,57 @@
+"""Tests for the shared JSON backend"""
+import json
+import os
+
+import pytest
+
+from scripts import json_backend
+from scripts.benchmark_json import generate_snapshot
+from scripts.json_backend import COMPACT, PRETTY, dump_json, dumps, load_json
+
+
+def _snapshot():
+    data = generate_snapshot(50)
+    data["bev_rankings"][0]["manufacturer"] = "Škoda"
+    data["notes"] = {"empty": {}, "none": None, "list": [], "flag": True, "ratio": -0.25}
+    return data
+
+
+@pytest.mark.skipif(json_backend.orjson is None, reason="orjson not installed")
+@pytest.mark.parametrize("mode", [PRETTY, COMPACT])
+def test_backends_write_identical_bytes(mode):
+    data = _snapshot()
+    assert dumps(data, mode, "orjson") == dumps(data, mode, "json")
+
+
+@pytest.mark.skipif(json_backend.orjson is None, reason="orjson not installed")
+@pytest.mark.parametrize("data", [{1: "int key"}, {"big": 2 ** 70}])
+def test_orjson_falls_back_for_unsupported_values(data):
+    assert dumps(data, COMPACT, "orjson") == dumps(data, COMPACT, "json")
+
+
+def test_exponent_floats_round_trip():
+    data = [1e16, 1e-7]
+    for backend in json_backend.BACKENDS:
+        assert json.loads(dumps(data, COMPACT, backend)) == data
+
+
+def test_pretty_output_matches_standard_library():
+    data = _snapshot()
+    assert dumps(data, PRETTY) == json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def test_unknown_mode_or_backend_is_rejected():
+    with pytest.raises(ValueError):
+        dumps({}, "wide")
+    with pytest.raises(ValueError):
+        dumps({}, PRETTY, "yaml")
+
+
+def test_dump_json_replaces_atomically(tmp_path):
+    path = str(tmp_path / "nested" / "out.json")
+    dump_json({"a": 1, "b": [2]}, path)
+    dump_json({"a": 3, "b": [4], "c": "x"}, path, mode=COMPACT)
+    
+    assert os.listdir(tmp_path / "nested") == ["out.json"]
+    assert oct(os.stat(path).st_mode & 0o777) == "0o644"
+    assert load_json(path) == {"a": 3, "b": [4], "c": "x"}
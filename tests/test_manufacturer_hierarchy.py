@@ -0,0 +1,93 @@
+"""Tests for the manufacturer ownership rollups"""
+import json
+import os
+import shutil
+
+from scripts.calculate_rankings_delta import RankingsDeltaCalculator
+from scripts.manufacturer_hierarchy import ManufacturerHierarchy
+from scripts.records import RankingRow
+
+
+REPO_REFERENCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "data", "reference", "manufacturer_hierarchy.json")
+
+
+def _reference(tmp_path):
+    path = tmp_path / "manufacturer_hierarchy.json"
+    path.write_text(json.dumps({"groups": {
+        "Geely Holding": {"Geely Auto": ["Geely", "Zeekr"], "Volvo Cars": ["Volvo"]}
+    }}), encoding="utf-8")
+    return str(path)
+
+
+def test_rolls_brands_up_to_manufacturers_and_groups(tmp_path):
+    hierarchy = ManufacturerHierarchy(_reference(tmp_path))
+    bev = [
+        {"manufacturer": "Zeekr", "sales_units": 100, "regions": {"China": 90, "Europe": 10}},
+        {"manufacturer": "Volvo", "sales_units": 50, "regions": {"Europe": 50}},
+        {"manufacturer": "Tesla", "sales_units": 70, "regions": {"USA": 70}}
+    ]
+    phev = [{"manufacturer": "Geely", "sales_units": 30, "regions": {"China": 30}}]
+    
+    tree = hierarchy.aggregate(bev, phev)
+    
+    assert hierarchy.resolve("Zeekr") == ("Geely Auto", "Geely Holding")
+    assert tree["manufacturers"]["Geely Auto"]["brands"] == ["Zeekr", "Geely"]
+    group = tree["groups"]["Geely Holding"]
+    assert (group["bev"], group["phev"], group["total"]) == (150, 30, 180)
+    assert group["regions"] == {"China": 120, "Europe": 60}
+    # Unlisted brands are their own manufacturer and group
+    assert tree["groups"]["Tesla"]["manufacturers"] == ["Tesla"]
+
+
+def test_rows_without_regions_are_aggregated(tmp_path):
+    hierarchy = ManufacturerHierarchy(_reference(tmp_path))
+    rows = [RankingRow.from_dict({"manufacturer": "Volvo", "sales_units": 50}),
+            {"manufacturer": "Volvo", "sales_units": 5, "regions": {"Europe": 5}}]
+    
+    tree = hierarchy.aggregate(rows, [])
+    assert tree["groups"]["Geely Holding"]["total"] == 55
+    assert tree["groups"]["Geely Holding"]["regions"] == {"Europe": 5}
+
+
+def test_delta_falls_back_to_aggregating_pre_regions_snapshots(tmp_path):
+    # Snapshots from before the regional breakdown (e.g. history/ev_rankings_20251025_021123.json)
+    # have neither regions on their rows nor a manufacturer_tree
+    path = tmp_path / "ev_rankings_20251025_021123.json"
+    path.write_text(json.dumps({
+        "period": "Q4 2025",
+        "bev_rankings": [{"rank": 1, "manufacturer": "BYD", "model": "Seagull", "sales_units": 425000,
+                          "revenue_usd_millions": 8500, "yoy_growth_percent": 145.5}],
+        "phev_rankings": [{"rank": 1, "manufacturer": "BYD", "model": "Song Plus DM-i", "sales_units": 300000,
+                           "revenue_usd_millions": 9000, "yoy_growth_percent": 20.0}],
+        "manufacturer_totals": {"BYD": {"bev": 425000, "phev": 300000, "total": 725000}}
+    }), encoding="utf-8")
+    (tmp_path / "reference").mkdir()
+    shutil.copy(REPO_REFERENCE, tmp_path / "reference")
+    calculator = RankingsDeltaCalculator(data_dir=str(tmp_path), history_dir=str(tmp_path))
+    
+    tree = calculator._manufacturer_tree(calculator._load_snapshot(str(path)))
+    
+    assert tree["groups"]["BYD Company"]["total"] == 725000
+    assert tree["groups"]["BYD Company"]["regions"] == {}
+
+
+def test_delta_reports_manufacturer_and_group_rollups(tmp_path):
+    (tmp_path / "reference").mkdir()
+    shutil.copy(REPO_REFERENCE, tmp_path / "reference")
+    calculator = RankingsDeltaCalculator(data_dir=str(tmp_path), history_dir=str(tmp_path))
+    
+    def snapshot(zeekr, volvo):
+        rows = [{"rank": 1, "manufacturer": "Geely", "model": "Geometry", "sales_units": 100},
+                {"rank": 2, "manufacturer": "Zeekr", "model": "001", "sales_units": zeekr},
+                {"rank": 3, "manufacturer": "Volvo", "model": "EX30", "sales_units": volvo}]
+        return {"period": "Q3 2026", "bev_rankings": rows, "phev_rankings": []}
+    
+    delta = calculator.compare_rankings(snapshot(zeekr=50, volvo=30), snapshot(zeekr=20, volvo=40))
+    
+    rollups = {d["manufacturer"]: d for d in delta["manufacturer_rollup_deltas"]}
+    assert (rollups["Geely Auto"]["previous_total"], rollups["Geely Auto"]["current_total"]) == (120, 150)
+    assert sorted(rollups["Geely Auto"]["brands"]) == ["Geely", "Zeekr"]
+    assert rollups["Volvo Cars"]["total_change"] == -10
+    groups = {d["group"]: d for d in delta["group_deltas"]}
+    assert groups["Geely Holding"]["total_change"] == 20
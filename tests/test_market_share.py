@@ -0,0 +1,71 @@
+"""Tests for market share tables"""
+import json
+
+import pytest
+
+from scripts.market_share import MarketShareCalculator, group_regions, share_matrix
+
+
+REFERENCE = {
+    "period": "Q4 2025",
+    "global": {"BEV": 1000, "PHEV": 500},
+    "regions": {"China": {"BEV": 400, "PHEV": 300}, "Europe": {"BEV": 200, "PHEV": 100},
+                "USA": {"BEV": 100, "PHEV": 0}}
+}
+
+
+@pytest.fixture
+def reference_path(tmp_path):
+    path = tmp_path / "market_totals.json"
+    path.write_text(json.dumps(REFERENCE), encoding="utf-8")
+    return str(path)
+
+
+def _row(manufacturer, model, units, regions=None):
+    return {"manufacturer": manufacturer, "model": model, "sales_units": units, "regions": regions or {}}
+
+
+def test_share_matrix_divides_columns_and_tolerates_zero():
+    assert share_matrix([[50, 10, 5]], [1000, 100, 0]) == [[5.0, 10.0, 0.0]]
+
+
+def test_group_regions_sums_numbers_and_dicts():
+    groups = {"Asia": ["China", "Japan"]}
+    assert group_regions({"China": 3, "Japan": 2, "USA": 1}, groups) == {"Asia": 5, "USA": 1}
+    assert group_regions({"China": {"BEV": 1}, "Japan": {"BEV": 2, "PHEV": 1}}, groups) == {
+        "Asia": {"BEV": 3, "PHEV": 1}
+    }
+    assert group_regions({"USA": 1}, None) == {"USA": 1}
+
+
+def test_apply_sets_global_share_and_builds_tables(reference_path):
+    bev = [_row("BYD", "Seal", 100, {"China": 80, "Europe": 20}), _row("BYD", "Dolphin", 50, {"China": 50})]
+    phev = [_row("BYD", "Song", 150, {"China": 150}), _row("BMW", "X5", 50)]
+    
+    tables = MarketShareCalculator(reference_path).apply(bev, phev)
+    
+    assert [row["market_share_percent"] for row in bev + phev] == [10.0, 5.0, 30.0, 10.0]
+    assert tables["columns"] == ["global", "China", "Europe", "USA"]
+    assert tables["models"]["BEV"][0]["shares"] == {"global": 10.0, "China": 20.0, "Europe": 10.0, "USA": 0.0}
+    assert tables["manufacturers"]["BEV"]["BYD"]["China"] == 32.5
+    # Combined share divides by the BEV + PHEV market
+    assert tables["manufacturers"]["total"]["BYD"]["global"] == 20.0
+    assert tables["manufacturers"]["total"]["BMW"]["China"] == 0.0
+
+
+def test_region_groups_merge_denominators(reference_path):
+    groups = {"West": ["Europe", "USA"]}
+    calculator = MarketShareCalculator(reference_path, region_groups=groups)
+    # Rows are regrouped by the caller (the scenario runner); denominators by the calculator
+    row = _row("Tesla", "Model Y", 60, group_regions({"Europe": 30, "USA": 30}, groups))
+    tables = calculator.compute([row], [])
+    
+    assert tables["columns"] == ["global", "China", "West"]
+    assert tables["models"]["BEV"][0]["shares"]["West"] == 20.0
+
+
+def test_missing_reference_leaves_rows_unchanged(tmp_path):
+    rows = [dict(_row("BYD", "Seal", 100), market_share_percent=8.2)]
+    
+    assert MarketShareCalculator(str(tmp_path / "missing.json")).apply(rows, []) is None
+    assert rows[0]["market_share_percent"] == 8.2
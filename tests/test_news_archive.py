@@ -0,0 +1,100 @@
+"""Tests for the compressed news archive"""
+import json
+import zlib
+
+from scripts.news_archive import NewsArchive
+
+
+def _article(title, date, region="China", url=None):
+    article = {"title": title, "date": date, "region": region}
+    if url is not None:
+        article["url"] = url
+    return article
+
+
+def test_query_seeks_only_matching_blocks(tmp_path):
+    archive = NewsArchive(data_dir=str(tmp_path), archive_dir=str(tmp_path / "archive"))
+    archive.append([_article("a", "2026-03-02"), _article("b", "2026-03-20", "Europe"),
+                    _article("c", "2026-04-05"), _article("d", "2026-04-28", "Japan")])
+    archive.append([_article("e", "2026-04-10", "Europe"), _article("f", "2026-04-29", "Japan")])
+    
+    assert [a["title"] for a in archive.query(region="Japan")] == ["d", "f"]
+    assert archive.blocks_read == 2
+    
+    # China (ends 04-05) and the second Japan block (starts 04-29) are never decompressed
+    assert sorted(a["title"] for a in archive.query(start="2026-04-06", end="2026-04-28")) == ["d", "e"]
+    assert archive.blocks_read == 2
+    
+    assert [a["title"] for a in archive.query(region="Europe", start="2026-04")] == ["e"]
+    assert archive.blocks_read == 1
+    
+    assert [a["title"] for a in archive.query(start="2026-05")] == []
+    assert archive.blocks_read == 0
+
+
+def test_duplicates_are_skipped_across_runs(tmp_path):
+    archive = NewsArchive(data_dir=str(tmp_path), archive_dir=str(tmp_path / "archive"))
+    first = archive.append([_article("a", "2026-03-02", url="https://example.com/a")])
+    second = archive.append([_article("a again", "2026-03-02", url="https://example.com/a"),
+                             _article("b", "2026-03-03")])
+    
+    assert (first["archived"], second["archived"], second["duplicates"]) == (1, 1, 1)
+    keys = archive.load_index("2026-03")["keys"]
+    assert len(keys) == len(set(keys)) == 2
+
+
+def test_undated_articles_keep_their_fallback_date(tmp_path):
+    archive = NewsArchive(data_dir=str(tmp_path), archive_dir=str(tmp_path / "archive"))
+    archive.append([{"title": "undated", "region": "USA"}], fallback_date="2026-06-15T09:00:00")
+    
+    (article,) = archive.query(start="2026-06-15")
+    assert article["date"] == "2026-06-15T09:00:00"
+    assert article["date_estimated"] is True
+    assert list(archive.query(start="2026-06-16")) == []
+    
+    # The same undated article is recognised on the next run
+    assert archive.append([{"title": "undated", "region": "USA"}], fallback_date="2026-06-15T10:00:00")["duplicates"] == 1
+
+
+def test_run_archives_the_latest_collection(tmp_path):
+    (tmp_path / "ev_news_latest.json").write_text(json.dumps({
+        "generated_at": "2026-07-01T08:00:00",
+        "news_by_region": {"China": [_article("a", "2026-06-30")], "Europe": [{"title": "b", "region": "Europe"}]}
+    }), encoding="utf-8")
+    archive = NewsArchive(data_dir=str(tmp_path), archive_dir=str(tmp_path / "archive"))
+    
+    assert archive.run() == {"archived": 2, "duplicates": 0, "blocks": 2}
+    assert archive.months() == ["2026-06", "2026-07"]
+
+
+def test_runs_write_new_segments_and_never_rewrite_old_ones(tmp_path):
+    archive = NewsArchive(data_dir=str(tmp_path), archive_dir=str(tmp_path / "archive"))
+    archive.append([_article("a", "2026-03-02")])
+    month_dir = tmp_path / "archive" / "2026-03"
+    first = {path.name: path.read_bytes() for path in month_dir.iterdir()}
+    
+    archive.append([_article("b", "2026-03-05")])
+    
+    files = {path.name: path.read_bytes() for path in month_dir.iterdir()}
+    assert len(files) == 4
+    assert all(files[name] == content for name, content in first.items())
+    assert [a["title"] for a in archive.query(start="2026-03")] == ["a", "b"]
+
+
+def test_legacy_monthly_segments_are_still_read(tmp_path):
+    archive_dir = tmp_path / "archive"
+    archive_dir.mkdir()
+    payload = json.dumps({"title": "old", "date": "2026-03-01", "region": "China"}).encode("utf-8")
+    block = zlib.compress(payload)
+    (archive_dir / "2026-03.seg").write_bytes(block)
+    (archive_dir / "2026-03.idx.json").write_text(json.dumps({"month": "2026-03", "keys": ["legacy"], "blocks": [{
+        "region": "China", "first_date": "2026-03-01", "last_date": "2026-03-01", "articles": 1,
+        "offset": 0, "length": len(block), "raw_length": len(payload)
+    }]}), encoding="utf-8")
+    archive = NewsArchive(data_dir=str(tmp_path), archive_dir=str(archive_dir))
+    
+    archive.append([_article("new", "2026-03-10")])
+    
+    assert archive.months() == ["2026-03"]
+    assert [a["title"] for a in archive.query(region="China")] == ["old", "new"]
+    assert archive.load_index("2026-03")["keys"][0] == "legacy"
@@ -0,0 +1,58 @@
+"""Tests for the batch news classifier"""
+import pytest
+
+from scripts.news_classifier import NewsBatchClassifier
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return NewsBatchClassifier()
+
+
+@pytest.mark.parametrize("item,category", [
+    ({"title": "Tesla recalls 200,000 vehicles over fire risk"}, "recall"),
+    ({"title": "BYD unveils new model Seal 07"}, "launch"),
+    ({"title": "EU tariffs on Chinese EVs"}, "policy"),
+    ({"title": "NIO opens 100 more battery swap stations"}, "infrastructure"),
+    ({"title": "比亚迪 销量 创新高"}, "sales"),
+    ({"title": "Weather today"}, "general"),
+    # Title phrases outweigh description phrases
+    ({"title": "Xpeng deliveries rise", "description": "The company also mentioned charging"}, "sales"),
+])
+def test_categories(classifier, item, category):
+    assert classifier.classify_batch([item])[0][0] == category
+
+
+def test_impact_follows_keyword_and_numeric_evidence(classifier):
+    (_, high), (_, low), (_, medium) = classifier.classify_batch([
+        {"title": "BYD sales hit record, surpasses Tesla globally with 40% growth"},
+        {"title": "Minor rumor about a small dealer considering a launch"},
+        {"title": "Li Auto deliveries rise"}
+    ])
+    
+    assert (high, low, medium) == ("high", "low", "medium")
+
+
+def test_label_sets_fields_in_place(classifier):
+    items = [{"title": "Toyota invests $1 billion in battery plant"}, {"title": ""}]
+    
+    assert classifier.label(items) is items
+    assert items[0]["category"] == "investment" and items[0]["impact"] == "high"
+    assert items[1]["category"] == "general"
+
+
+def test_batch_matches_single_article_results(classifier):
+    items = [{"title": f"Company {i} recalls cars", "description": "sales up 5%"} for i in range(50)]
+    
+    assert classifier.classify_batch(items) == [classifier.classify_batch([item])[0] for item in items]
+
+
+def test_term_matrix_has_one_column_per_matched_feature(classifier):
+    matrix = classifier.term_matrix([
+        {"title": "BYD recalls cars"},
+        {"title": "Weather today", "description": "Tesla recalls trucks"}
+    ])
+    
+    recall = classifier.vocabulary["recalls"]
+    assert matrix[recall] == {0: 2.0, 1: 1.0}
+    assert all(set(column) <= {0, 1} for column in matrix.values())
@@ -0,0 +1,88 @@
+"""Tests for linking rankings deltas to preceding news"""
+import json
+import os
+import shutil
+
+from scripts.news_correlation import NewsCorrelator, NewsIndex
+
+
+REPO_REFERENCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "data", "reference", "manufacturer_hierarchy.json")
+
+
+def _article(title, manufacturer, date, impact="medium", url=None):
+    return {"title": title, "manufacturer": manufacturer, "date": date, "impact": impact,
+            "url": url or f"https://example.com/{title.replace(' ', '-')}"}
+
+
+def _correlator(tmp_path, articles):
+    (tmp_path / "reference").mkdir()
+    shutil.copy(REPO_REFERENCE, tmp_path / "reference")
+    (tmp_path / "ev_news_latest.json").write_text(json.dumps({"news_by_region": {"China": articles}}),
+                                                  encoding="utf-8")
+    return NewsCorrelator(data_dir=str(tmp_path), archive_dir=str(tmp_path / "archive"))
+
+
+def test_window_compares_whole_days():
+    index = NewsIndex([_article("first day", "BYD", "2026-07-02"), _article("timestamped", "BYD", "2026-09-30T23:00:00"),
+                       _article("too early", "BYD", "2026-07-01T23:59:59")])
+    
+    titles = [a["title"] for a in index.between("byd", "2026-07-02T10:00:00", "2026-09-30T08:00:00")]
+    assert titles == ["first day", "timestamped"]
+
+
+def test_manufacturer_names_are_normalised_through_the_hierarchy(tmp_path):
+    correlator = _correlator(tmp_path, [
+        _article("BYD Auto expands", "BYD Auto", "2026-09-01", impact="high"),
+        _article("Seal price cut", "byd", "2026-09-15"),
+        _article("Tesla news", "Tesla", "2026-09-10")
+    ])
+    delta = {
+        "current_generated_at": "2026-09-30T10:00:00",
+        "bev_model_deltas": [{"manufacturer": "BYD", "model": "Seal"}],
+        "manufacturer_deltas": [{"manufacturer": "BYD Auto"}, {"manufacturer": "Nio"}]
+    }
+    
+    assert correlator.correlate(delta) == 2
+    
+    model_news = [a["title"] for a in delta["bev_model_deltas"][0]["related_news"]]
+    # The model mention outweighs the higher-impact article
+    assert model_news == ["Seal price cut", "BYD Auto expands"]
+    assert len(delta["manufacturer_deltas"][0]["related_news"]) == 2
+    assert delta["manufacturer_deltas"][1]["related_news"] == []
+
+
+def test_date_only_article_on_the_first_window_day_is_linked(tmp_path):
+    correlator = _correlator(tmp_path, [_article("edge", "BYD", "2026-07-02")])
+    delta = {"current_generated_at": "2026-09-30T10:00:00", "manufacturer_deltas": [{"manufacturer": "BYD"}]}
+    
+    # 90 days before 2026-09-30T10:00 is 2026-07-02T10:00
+    assert correlator.correlate(delta) == 1
+
+
+def test_window_ends_at_the_current_snapshot_not_the_run(tmp_path):
+    correlator = _correlator(tmp_path, [_article("before", "BYD", "2026-06-20"),
+                                        _article("after", "BYD", "2026-10-15")])
+    # Re-correlated weeks after the snapshot was taken
+    delta = {"generated_at": "2026-10-19T09:00:00", "current_generated_at": "2026-06-30T10:00:00",
+             "manufacturer_deltas": [{"manufacturer": "BYD"}]}
+    
+    correlator.correlate(delta)
+    
+    assert [a["title"] for a in delta["manufacturer_deltas"][0]["related_news"]] == ["before"]
+
+
+def test_older_deltas_fall_back_to_the_end_of_their_period(tmp_path):
+    correlator = _correlator(tmp_path, [])
+    
+    assert correlator.window_end({"current_period": "Q4 2025", "generated_at": "2026-10-19T09:00:00"}) == \
+        "2025-12-31T00:00:00"
+    assert correlator.window_end({"current_period": "Q1 2026"}) == "2026-03-31T00:00:00"
+
+
+def test_missing_news_files_leave_deltas_unlinked(tmp_path):
+    correlator = NewsCorrelator(data_dir=str(tmp_path), archive_dir=str(tmp_path / "archive"))
+    delta = {"current_generated_at": "2026-09-30T10:00:00", "manufacturer_deltas": [{"manufacturer": "BYD"}]}
+    
+    assert correlator.correlate(delta) == 0
+    assert delta["manufacturer_deltas"][0]["related_news"] == []
@@ -0,0 +1,99 @@
+"""Tests for the JSON Patch update feed"""
+import json
+import os
+
+import pytest
+
+from scripts import patch_feed
+from scripts.patch_feed import PatchFeedPublisher, apply_patch, make_patch
+
+
+def _write(data_dir, **documents):
+    for name, document in documents.items():
+        path = os.path.join(data_dir, PatchFeedPublisher.DOCUMENTS[name])
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(document, f)
+
+
+def test_patch_round_trip():
+    old = {"a": 1, "list": [1, 2, 3], "nested": {"x/y": "~", "drop": True}}
+    new = {"a": 2, "list": [1, 5], "nested": {"x/y": "~~"}, "added": [None]}
+    
+    patch = make_patch(old, new)
+    
+    assert apply_patch(old, patch) == new
+    assert old["list"] == [1, 2, 3]
+    assert make_patch(new, new) == []
+
+
+def test_client_catches_up_from_any_covered_version(tmp_path):
+    publisher = PatchFeedPublisher(data_dir=str(tmp_path))
+    versions = []
+    for week in range(3):
+        _write(tmp_path, rankings={"week": week, "rows": list(range(week + 5))}, news={"n": 1})
+        versions.append(publisher.publish()["version"])
+    assert versions == [1, 2, 3]
+    
+    assert publisher.catch_up({}, 0) == {"rankings": {"week": 2, "rows": list(range(7))}, "news": {"n": 1}}
+    documents = {"rankings": {"week": 1, "rows": list(range(6))}, "news": {"n": 1}}
+    assert publisher.catch_up(documents, 2)["rankings"] == {"week": 2, "rows": list(range(7))}
+    assert publisher.catch_up(documents, 4) is None
+    
+    # Unchanged data adds no version
+    assert publisher.publish()["version"] == 3
+
+
+def test_expired_versions_force_full_download(tmp_path, monkeypatch):
+    monkeypatch.setattr(PatchFeedPublisher, "MAX_VERSIONS", 2)
+    publisher = PatchFeedPublisher(data_dir=str(tmp_path))
+    for week in range(4):
+        _write(tmp_path, rankings={"week": week})
+        manifest = publisher.publish()
+    
+    assert manifest["oldest_version"] == 2
+    assert publisher.patches_since(1) is None
+    assert sorted(os.listdir(tmp_path / "feed" / "patches")) == ["000003.json", "000004.json"]
+    # Only the copy the manifest points to is kept
+    assert os.listdir(tmp_path / "feed" / "snapshots") == ["000004"]
+
+
+def test_failed_manifest_write_leaves_no_orphaned_version(tmp_path, monkeypatch):
+    publisher = PatchFeedPublisher(data_dir=str(tmp_path))
+    _write(tmp_path, rankings={"week": 0})
+    publisher.publish()
+    
+    original = patch_feed.dump_json
+    def failing_dump(data, path, *args, **kwargs):
+        if path == publisher.manifest_path:
+            raise OSError("disk full")
+        return original(data, path, *args, **kwargs)
+    
+    _write(tmp_path, rankings={"week": 1})
+    monkeypatch.setattr(patch_feed, "dump_json", failing_dump)
+    with pytest.raises(OSError):
+        publisher.publish()
+    monkeypatch.setattr(patch_feed, "dump_json", original)
+    
+    assert os.listdir(tmp_path / "feed" / "patches") == ["000001.json"]
+    assert os.listdir(tmp_path / "feed" / "snapshots") == ["000001"]
+    
+    # The retry diffs against the committed copy, so a version-1 client still catches up
+    assert publisher.publish()["version"] == 2
+    assert publisher.catch_up({"rankings": {"week": 0}}, 1) == {"rankings": {"week": 1}}
+
+
+def test_legacy_flat_snapshots_are_still_used(tmp_path):
+    feed_dir = tmp_path / "feed"
+    (feed_dir / "snapshots").mkdir(parents=True)
+    (feed_dir / "snapshots" / "ev_rankings_latest.json").write_text(json.dumps({"week": 0, "rows": [1] * 50}))
+    (feed_dir / "manifest.json").write_text(json.dumps(
+        {"version": 1, "oldest_version": 0, "patches": [{"version": 1, "file": "patches/000001.json"}]}
+    ))
+    _write(tmp_path, rankings={"week": 1, "rows": [1] * 50})
+    
+    manifest = PatchFeedPublisher(data_dir=str(tmp_path)).publish()
+    
+    # A small diff against the flat copy, not a whole-document replace
+    assert manifest["patches"][-1]["operations"] == 1
+    assert manifest["snapshots"] == {"rankings": os.path.join("snapshots", "000002", "ev_rankings_latest.json")}
+    assert os.listdir(feed_dir / "snapshots") == ["000002"]
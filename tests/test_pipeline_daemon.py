@@ -0,0 +1,67 @@
+"""Tests for the pipeline daemon's schedule and status endpoint"""
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from scripts.pipeline_daemon import PipelineDaemon, next_scheduled_run, parse_schedule
+
+
+def test_parse_schedule():
+    assert parse_schedule("tue,fri@09:00") == ([1, 4], 9, 0)
+    with pytest.raises(ValueError):
+        parse_schedule("someday@09:00")
+    with pytest.raises(ValueError):
+        parse_schedule("mon@25:00")
+
+
+def test_next_scheduled_run_is_strictly_after_now():
+    tuesday_nine = datetime(2026, 10, 20, 9, 0)
+    assert next_scheduled_run(tuesday_nine, [1, 4], 9, 0) == datetime(2026, 10, 23, 9, 0)
+    assert next_scheduled_run(datetime(2026, 10, 20, 8, 59), [1, 4], 9, 0) == tuesday_nine
+
+
+async def _request(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(body)
+
+
+def _serve(daemon, paths):
+    """Run the status endpoint on a free port and request each path in order"""
+    async def scenario():
+        listener = await asyncio.start_server(daemon.handle_connection, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return [await _request(port, path) for path in paths]
+        finally:
+            listener.close()
+            await listener.wait_closed()
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    return PipelineDaemon(base_dir=str(tmp_path), watch_paths=[], interval=60)
+
+
+def test_status_endpoints(daemon):
+    (health_status, health), (status_code, status), (missing, _) = _serve(daemon, ["/health", "/status", "/nope"])
+    
+    assert (health_status, health) == (200, {"status": "ok", "running": False})
+    assert status_code == 200 and status["run_count"] == 0
+    assert missing == 404
+
+
+def test_failing_handler_answers_500(daemon, monkeypatch):
+    def broken(path):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(daemon, "handle", broken)
+    
+    (status, body), = _serve(daemon, ["/status"])
+    assert (status, body) == (500, {"error": "Internal server error"})
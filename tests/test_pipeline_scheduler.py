@@ -0,0 +1,106 @@
+"""Tests for the DAG stage scheduler"""
+import threading
+
+import pytest
+
+from scripts.pipeline_scheduler import PipelineScheduler, PipelineStage, build_pipeline
+
+
+def _stage(name, calls, inputs=None, outputs=None, fail=False):
+    """A stage that records its name when run and optionally raises"""
+    def action():
+        calls.append(name)
+        if fail:
+            raise RuntimeError(f"{name} broke")
+    return PipelineStage(name, action, inputs=inputs, outputs=outputs)
+
+
+def test_dependencies_follow_declared_paths():
+    scheduler = PipelineScheduler()
+    scheduler.add_stage(PipelineStage("a", lambda: None, outputs=["x"]))
+    scheduler.add_stage(PipelineStage("b", lambda: None, inputs=["x", "external"], outputs=["y"]))
+    scheduler.add_stage(PipelineStage("c", lambda: None, inputs=["x", "y"]))
+    
+    assert scheduler.resolve_dependencies() == {"a": set(), "b": {"a"}, "c": {"a", "b"}}
+
+
+def test_duplicate_stage_and_output_are_rejected():
+    scheduler = PipelineScheduler()
+    scheduler.add_stage(PipelineStage("a", lambda: None, outputs=["x"]))
+    with pytest.raises(ValueError):
+        scheduler.add_stage(PipelineStage("a", lambda: None))
+    
+    scheduler.add_stage(PipelineStage("b", lambda: None, outputs=["x"]))
+    with pytest.raises(ValueError, match="produced by both"):
+        scheduler.resolve_dependencies()
+
+
+def test_cycle_is_rejected():
+    scheduler = PipelineScheduler()
+    scheduler.add_stage(PipelineStage("a", lambda: None, inputs=["y"], outputs=["x"]))
+    scheduler.add_stage(PipelineStage("b", lambda: None, inputs=["x"], outputs=["y"]))
+    with pytest.raises(ValueError, match="cycle"):
+        scheduler.resolve_dependencies()
+
+
+def test_stages_run_after_their_dependencies():
+    calls = []
+    scheduler = PipelineScheduler(max_workers=4)
+    scheduler.add_stage(_stage("delta", calls, inputs=["rankings", "news"], outputs=["delta"]))
+    scheduler.add_stage(_stage("news", calls, outputs=["news"]))
+    scheduler.add_stage(_stage("rankings", calls, outputs=["rankings"]))
+    scheduler.add_stage(_stage("summary", calls, inputs=["delta"]))
+    
+    results = scheduler.run()
+    
+    assert all(result["status"] == "completed" for result in results.values())
+    assert calls.index("delta") > max(calls.index("news"), calls.index("rankings"))
+    assert calls[-1] == "summary"
+
+
+def test_independent_stages_run_concurrently():
+    # Both stages wait for each other, so the run only finishes if they overlap
+    barrier = threading.Barrier(2, timeout=5)
+    scheduler = PipelineScheduler(max_workers=2)
+    scheduler.add_stage(PipelineStage("news", barrier.wait, outputs=["news"]))
+    scheduler.add_stage(PipelineStage("rankings", barrier.wait, outputs=["rankings"]))
+    
+    results = scheduler.run()
+    
+    assert {name: result["status"] for name, result in results.items()} == {
+        "news": "completed", "rankings": "completed"
+    }
+
+
+def test_failure_skips_only_dependents():
+    calls = []
+    scheduler = PipelineScheduler()
+    scheduler.add_stage(_stage("news", calls, outputs=["news"]))
+    scheduler.add_stage(_stage("rankings", calls, outputs=["rankings"], fail=True))
+    scheduler.add_stage(_stage("delta", calls, inputs=["rankings"], outputs=["delta"]))
+    scheduler.add_stage(_stage("summary", calls, inputs=["delta"]))
+    scheduler.add_stage(_stage("archive", calls, inputs=["news"]))
+    
+    results = scheduler.run()
+    
+    assert results["rankings"]["status"] == "failed"
+    assert "rankings broke" in results["rankings"]["error"]
+    assert results["delta"]["status"] == "skipped"
+    assert results["summary"]["status"] == "skipped"
+    assert results["news"]["status"] == "completed"
+    assert results["archive"]["status"] == "completed"
+    assert "delta" not in calls and "summary" not in calls
+
+
+def test_failed_news_collection_does_not_skip_delta(tmp_path):
+    scheduler = build_pipeline(base_dir=str(tmp_path))
+    calls = []
+    for name, stage in scheduler.stages.items():
+        stage.action = _stage(name, calls, fail=(name == "news")).action
+    
+    results = scheduler.run(resume=False)
+    
+    assert results["news"]["status"] == "failed"
+    assert results["archive_news"]["status"] == "skipped"
+    for name in ("rankings", "validate", "delta", "forecast", "compact_history", "summary"):
+        assert results[name]["status"] == "completed", name
@@ -0,0 +1,82 @@
+"""Tests for generation publishing and the dashboard copy"""
+import json
+import os
+
+import pytest
+
+from scripts.pipeline_scheduler import publish_dashboard
+from scripts.publisher import GenerationPublisher, PUBLISHED_DOCUMENTS
+
+
+def _write_outputs(data_dir, version):
+    data_dir.mkdir(exist_ok=True)
+    for filename in PUBLISHED_DOCUMENTS.values():
+        (data_dir / filename).write_text(json.dumps({"version": version}), encoding="utf-8")
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_publish_swaps_current_and_prunes_old_generations(tmp_path):
+    publisher = GenerationPublisher(data_dir=str(tmp_path))
+    for version in range(1, 6):
+        _write_outputs(tmp_path, version)
+        manifest = publisher.publish()
+    
+    assert manifest["generation"] == 5
+    assert publisher.current_generation() == 5
+    assert publisher.list_generations() == [3, 4, 5]
+    assert os.readlink(tmp_path / "current") == os.path.join("published", "000005")
+    assert _read(tmp_path / "current" / "ev_rankings_latest.json") == {"version": 5}
+
+
+def test_publish_without_outputs_leaves_current_alone(tmp_path):
+    publisher = GenerationPublisher(data_dir=str(tmp_path))
+    _write_outputs(tmp_path, 1)
+    publisher.publish()
+    os.remove(tmp_path / "ev_rankings_delta.json")
+    
+    with pytest.raises(FileNotFoundError):
+        publisher.publish()
+    assert publisher.current_generation() == 1
+    assert [entry for entry in os.listdir(tmp_path / "published") if entry.startswith(".staging")] == []
+
+
+def test_dashboard_receives_the_generation_through_one_pointer(tmp_path):
+    data_dir = tmp_path / "data"
+    dashboard_dir = tmp_path / "dashboard"
+    public_dir = dashboard_dir / "client" / "public"
+    public_dir.mkdir(parents=True)
+    # A flat copy left by an older dashboard publish
+    (public_dir / "ev_news_latest.json").write_text("{}", encoding="utf-8")
+    
+    publisher = GenerationPublisher(data_dir=str(data_dir))
+    _write_outputs(data_dir, 1)
+    publisher.publish()
+    (data_dir / "ev_rankings_forecast.json").write_text('{"forecast": true}', encoding="utf-8")
+    publish_dashboard(str(data_dir), str(dashboard_dir))
+    
+    assert os.readlink(public_dir / "current") == os.path.join("published", "000001")
+    assert _read(public_dir / "ev_rankings_forecast.json") == {"forecast": True}
+    for filename in PUBLISHED_DOCUMENTS.values():
+        assert os.readlink(public_dir / filename) == os.path.join("current", filename)
+        assert _read(public_dir / filename) == {"version": 1}
+    assert _read(public_dir / "generation.json")["generation"] == 1
+    
+    # Outputs written after the generation are not copied past it
+    _write_outputs(data_dir, 2)
+    publish_dashboard(str(data_dir), str(dashboard_dir))
+    assert _read(public_dir / "ev_rankings_latest.json") == {"version": 1}
+    
+    publisher.publish()
+    publish_dashboard(str(data_dir), str(dashboard_dir))
+    assert _read(public_dir / "ev_rankings_latest.json") == {"version": 2}
+    assert _read(public_dir / "generation.json")["generation"] == 2
+    assert sorted(os.listdir(public_dir / "published")) == ["000001", "000002"]
+
+
+def test_missing_dashboard_is_skipped(tmp_path):
+    publish_dashboard(str(tmp_path), str(tmp_path / "missing"))
+    assert os.listdir(tmp_path) == []
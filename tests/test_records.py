@@ -0,0 +1,96 @@
+"""Tests for the slotted record types"""
+import copy
+import json
+import pickle
+import sys
+
+import pytest
+
+from scripts.json_backend import dumps
+from scripts.records import NewsItem, RankingRow
+from scripts.snapshot_validation import validate_snapshot
+
+
+def _row(**overrides):
+    data = {"rank": 1, "manufacturer": "BYD", "model": "Seal", "sales_units": 100}
+    data.update(overrides)
+    return data
+
+
+def test_unset_fields_are_absent_like_missing_keys():
+    row = RankingRow.from_dict(_row())
+    
+    assert row.get("regions", {}) == {}
+    assert row.get("sales_units", 0) == 100
+    assert row.get("no_such_field", "x") == "x"
+    assert "regions" not in row
+    with pytest.raises(KeyError):
+        row["regions"]
+    assert row.to_dict() == _row()
+    
+    # A field set to None is present, as in a dict
+    row["yoy_growth_percent"] = None
+    assert "yoy_growth_percent" in row
+    assert row.get("yoy_growth_percent", 0) is None
+
+
+def test_dict_form_round_trips():
+    minimal = _row()
+    full = _row(revenue_usd_millions=12.5, yoy_growth_percent=None, market_share_percent=3.1,
+                regions={"China": 80, "Europe": 20}, revenue_by_currency_millions={"CNY": 90.0}, brand="BYD Auto")
+    for data in (minimal, full):
+        assert RankingRow.from_dict(data).to_dict() == data
+        assert json.loads(dumps(RankingRow.from_dict(data))) == data
+    
+    article = {"title": "Seal launch", "region": "Europe", "impact": "high"}
+    assert NewsItem.from_dict(article).to_dict() == article
+
+
+def test_round_tripped_rows_pass_validation():
+    snapshot = {"period": "Q3 2026", "phev_rankings": [],
+                "bev_rankings": [RankingRow.from_dict(_row()).to_dict()]}
+    assert validate_snapshot(snapshot) == []
+
+
+def test_unknown_keys_survive_a_round_trip():
+    data = _row(brand="BYD Auto", regions={"China": 80})
+    row = RankingRow.from_dict(data)
+    
+    assert row["brand"] == "BYD Auto"
+    assert row.get("brand") == "BYD Auto"
+    assert "brand" in row
+    assert json.loads(dumps(row))["brand"] == "BYD Auto"
+    assert dict(row) == row.to_dict()
+    
+    row["note"] = "added"
+    assert row.to_dict()["note"] == "added"
+
+
+def test_constructor_still_rejects_unknown_fields():
+    with pytest.raises(TypeError):
+        RankingRow(rank=1, brand="BYD")
+    with pytest.raises(KeyError):
+        RankingRow.from_dict(_row())["brand"]
+
+
+def test_optional_fields_are_left_out_while_unset():
+    row = RankingRow.from_dict(_row())
+    assert "revenue_by_currency_millions" not in row.to_dict()
+    row["revenue_by_currency_millions"] = {"CNY": 1.0}
+    assert "revenue_by_currency_millions" in row.to_dict()
+
+
+def test_values_are_interned():
+    first = NewsItem.from_dict({"region": "".join(["Eu", "rope"])})
+    second = NewsItem.from_dict({"region": "".join(["Euro", "pe"])})
+    assert first.region is second.region
+    
+    row = RankingRow.from_dict(_row(regions={"".join(["Chi", "na"]): 1}))
+    assert next(iter(row.regions)) is sys.intern("China")
+
+
+def test_records_copy_and_pickle():
+    row = RankingRow.from_dict(_row(brand="BYD Auto"))
+    for clone in (copy.deepcopy(row), pickle.loads(pickle.dumps(row))):
+        assert clone.to_dict() == row.to_dict()
+        assert "regions" not in clone
@@ -0,0 +1,98 @@
+"""Tests for the registration export bulk loader"""
+import os
+
+from scripts.create_corrected_rankings import EVRankingsGenerator
+from scripts.pipeline_scheduler import build_pipeline
+from scripts.registration_ingest import RegistrationBulkLoader, cache_path_beside, ingest_file
+
+
+HEADER = "make,model,fuel_type,country,registrations,price,currency\n"
+
+
+def _write(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER + "".join(rows))
+
+
+def test_ingest_file_classifies_and_aggregates(tmp_path):
+    path = tmp_path / "export.csv"
+    _write(path, [
+        "BYD,Seal,BEV,China,10,20000,CNY\n",
+        "BYD,Seal,electric,de,5,30000,EUR\n",
+        "BYD,Song,PHEV,us,2,25000,\n",
+        "Ford,Focus,petrol,us,99,,\n",
+        "short,row\n"
+    ])
+    
+    result = ingest_file(str(path), chunk_size=2)
+    
+    assert result["rows_read"] == 5
+    assert result["rows_skipped"] == 2
+    seal = result["aggregates"][("BEV", "BYD", "Seal")]
+    assert seal["units"] == 15
+    assert seal["regions"]["China"] == 10 and seal["regions"]["Europe"] == 5
+    assert seal["revenue"] == {"CNY": 200000.0, "EUR": 150000.0}
+    assert result["aggregates"][("PHEV", "BYD", "Song")]["revenue"] == {"USD": 50000.0}
+
+
+def test_unchanged_files_come_from_cache(tmp_path):
+    ingest_dir = tmp_path / "ingest"
+    ingest_dir.mkdir()
+    _write(ingest_dir / "a.csv", ["BYD,Seal,BEV,China,10,,\n"])
+    _write(ingest_dir / "b.csv", ["Tesla,Model Y,BEV,us,7,,\n"])
+    cache_path = str(tmp_path / "state" / "cache.json")
+    
+    loader = RegistrationBulkLoader(max_workers=1, cache_path=cache_path)
+    files = loader.find_files(str(ingest_dir))
+    first = loader.ingest(files)
+    assert loader.stats["files_cached"] == 0
+    assert os.path.exists(cache_path)
+    
+    # A new loader reads the cache from disk; no file has changed
+    loader = RegistrationBulkLoader(max_workers=1, cache_path=cache_path)
+    assert loader.ingest(files) == first
+    assert loader.stats["files_cached"] == 2
+    
+    # Merging must not have changed the cached per-file aggregates
+    assert loader.ingest(files) == first
+    
+    _write(ingest_dir / "b.csv", ["Tesla,Model Y,BEV,us,7,,\n", "Tesla,Model Y,BEV,us,3,,\n"])
+    merged = loader.ingest(files)
+    assert loader.stats["files_cached"] == 1
+    assert merged[("BEV", "Tesla", "Model Y")]["units"] == 10
+
+
+def test_removed_files_leave_the_cache(tmp_path):
+    _write(tmp_path / "a.csv", ["BYD,Seal,BEV,China,10,,\n"])
+    _write(tmp_path / "b.csv", ["BYD,Han,BEV,China,4,,\n"])
+    loader = RegistrationBulkLoader(max_workers=1, cache_path=str(tmp_path / "cache.json"))
+    loader.ingest([str(tmp_path / "a.csv"), str(tmp_path / "b.csv")])
+    
+    merged = loader.ingest([str(tmp_path / "a.csv")])
+    
+    assert list(merged) == [("BEV", "BYD", "Seal")]
+    assert list(loader._load_cache()) == [str(tmp_path / "a.csv")]
+
+
+def test_cache_path_follows_the_configured_directories(tmp_path):
+    generator = EVRankingsGenerator(output_dir=str(tmp_path / "data"), ingest_dir=str(tmp_path / "exports"),
+                                    history_dir=str(tmp_path / "history"))
+    assert generator.registration_loader.cache_path == str(tmp_path / "state" / "registration_cache.json")
+    assert cache_path_beside(str(tmp_path / "exports")) == generator.registration_loader.cache_path
+    
+    # A pipeline built on another base directory reads its own exports and cache
+    rankings = build_pipeline(base_dir=str(tmp_path / "run")).stages["rankings"].action.__self__
+    assert rankings.ingest_dir == str(tmp_path / "run" / "ingest")
+    assert rankings.registration_loader.cache_path == str(tmp_path / "run" / "state" / "registration_cache.json")
+
+
+def test_build_rankings_orders_by_units():
+    loader = RegistrationBulkLoader(top_n=1)
+    regions = {"China": 0.0, "Asia_ex_China": 0.0, "Europe": 0.0, "USA": 0.0}
+    bev, phev = loader.build_rankings({
+        ("BEV", "BYD", "Seal"): {"units": 5.0, "revenue": {}, "regions": dict(regions)},
+        ("BEV", "Tesla", "Model Y"): {"units": 15.0, "revenue": {}, "regions": dict(regions)}
+    })
+    
+    assert [(row["rank"], row["model"], row["market_share_percent"]) for row in bev] == [(1, "Model Y", 75.0)]
+    assert phev == []
@@ -0,0 +1,74 @@
+"""Tests for the resumable run checkpoint and stage reuse"""
+import os
+
+from scripts.pipeline_scheduler import PipelineScheduler, PipelineStage, build_pipeline
+from scripts.run_checkpoint import RunCheckpoint, path_hash
+
+
+def test_directory_hash_follows_names_sizes_and_mtimes(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    first = path_hash(str(tmp_path))
+    assert path_hash(str(tmp_path)) == first
+    
+    (tmp_path / "b.json").write_text("{}")
+    second = path_hash(str(tmp_path))
+    assert second != first
+    
+    stat = os.stat(tmp_path / "b.json")
+    os.utime(tmp_path / "b.json", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert path_hash(str(tmp_path)) != second
+    assert path_hash(str(tmp_path / "missing")) != path_hash(str(tmp_path / "a.json"))
+
+
+def _pipeline(tmp_path, calls):
+    """Two-stage pipeline: an external source stage and a derived stage"""
+    reference = tmp_path / "reference.json"
+    source = tmp_path / "source.json"
+    derived = tmp_path / "derived.json"
+    
+    def produce():
+        calls.append("source")
+        source.write_text(reference.read_text())
+    
+    def derive():
+        calls.append("derived")
+        derived.write_text(source.read_text())
+    
+    scheduler = PipelineScheduler(max_workers=1, checkpoint=RunCheckpoint(str(tmp_path / "checkpoint.json")))
+    scheduler.add_stage(PipelineStage("source", produce, inputs=[str(reference)], outputs=[str(source)],
+                                      external=True))
+    scheduler.add_stage(PipelineStage("derived", derive, inputs=[str(source)], outputs=[str(derived)]))
+    return scheduler, reference
+
+
+def test_external_stages_rerun_and_derived_stages_are_reused(tmp_path):
+    calls = []
+    scheduler, reference = _pipeline(tmp_path, calls)
+    reference.write_text('{"rate": 1}')
+    
+    scheduler.run()
+    scheduler.run()
+    
+    # The source stage reads undeclared data, so it runs again; its output is unchanged
+    assert calls == ["source", "derived", "source"]
+
+
+def test_changed_reference_reruns_dependents(tmp_path):
+    calls = []
+    scheduler, reference = _pipeline(tmp_path, calls)
+    reference.write_text('{"rate": 1}')
+    scheduler.run()
+    
+    reference.write_text('{"rate": 2}')
+    scheduler.run()
+    assert calls == ["source", "derived", "source", "derived"]
+
+
+def test_reference_files_are_stage_inputs(tmp_path):
+    stages = build_pipeline(base_dir=str(tmp_path), checkpoint_path=str(tmp_path / "checkpoint.json")).stages
+    reference_dir = os.path.join(str(tmp_path), "data", "reference")
+    
+    rankings_inputs = {os.path.basename(path) for path in stages["rankings"].inputs}
+    assert rankings_inputs == {"fx_rates.json", "market_totals.json", "manufacturer_hierarchy.json"}
+    assert stages["rankings"].external and stages["news"].external
+    assert os.path.join(reference_dir, "manufacturer_hierarchy.json") in stages["delta"].inputs
@@ -0,0 +1,70 @@
+"""Tests for the batched sales forecaster"""
+import json
+import os
+
+from scripts.sales_forecast import SalesForecaster, damped_trend_forecast, next_period, quarter_range
+
+
+def _snapshot(history_dir, stamp, period, units):
+    rows = [{"rank": 1, "manufacturer": "BYD", "model": "Seal", "sales_units": units}]
+    data = {"period": period, "bev_rankings": rows, "phev_rankings": [],
+            "manufacturer_totals": {"BYD": {"bev": units, "phev": 0, "total": units}}}
+    with open(os.path.join(history_dir, f"ev_rankings_{stamp}_000000.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_quarter_helpers():
+    assert quarter_range((2025, 3), (2026, 2)) == [(2025, 3), (2025, 4), (2026, 1), (2026, 2)]
+    assert next_period((2025, 4)) == "Q1 2026"
+
+
+def test_forecast_follows_a_linear_series():
+    (value,) = damped_trend_forecast([[100, 200, 300, 400, 500, 600]], alpha=0.5, beta=0.3, phi=0.9)
+    assert 600 < value < 700
+
+
+def test_gap_advances_the_series():
+    adjacent = damped_trend_forecast([[100, 200]], alpha=0.5, beta=0.3, phi=0.9)[0]
+    with_gap = damped_trend_forecast([[100, 200, None]], alpha=0.5, beta=0.3, phi=0.9)[0]
+    
+    # A missing quarter moves the series on by one step of its damped trend
+    assert with_gap > adjacent
+    assert damped_trend_forecast([[100, 200, None, None, 500]], 0.5, 0.3, 0.9) != \
+        damped_trend_forecast([[100, 200, 500]], 0.5, 0.3, 0.9)
+
+
+def test_series_not_started_stays_empty():
+    assert damped_trend_forecast([[None, None], [None, 5]], 0.5, 0.3, 0.9) == [None, 5.0]
+
+
+def test_missing_quarters_become_empty_columns(tmp_path):
+    history_dir = tmp_path / "history"
+    history_dir.mkdir()
+    _snapshot(history_dir, "20251101", "Q4 2025", 100)
+    _snapshot(history_dir, "20261101", "Q4 2026", 500)
+    
+    forecaster = SalesForecaster(data_dir=str(tmp_path / "data"), history_dir=str(history_dir))
+    series, periods, matrix = forecaster.build_matrix()
+    
+    assert periods == ["Q4 2025", "Q1 2026", "Q2 2026", "Q3 2026", "Q4 2026"]
+    assert matrix[series.index(("BEV", "BYD", "Seal"))] == [100, None, None, None, 500]
+    
+    forecast = forecaster.forecast()
+    assert forecast["missing_periods"] == ["Q1 2026", "Q2 2026", "Q3 2026"]
+    assert forecast["forecast_period"] == "Q1 2027"
+
+
+def test_run_writes_atomically_and_reuses_unchanged_history(tmp_path, capsys):
+    history_dir = tmp_path / "history"
+    history_dir.mkdir()
+    _snapshot(history_dir, "20251101", "Q4 2025", 100)
+    _snapshot(history_dir, "20260201", "Q1 2026", 150)
+    forecaster = SalesForecaster(data_dir=str(tmp_path / "data"), history_dir=str(history_dir))
+    
+    path = forecaster.run()
+    written = json.loads(open(path, encoding="utf-8").read())
+    assert written["bev_forecasts"][0]["projected_rank"] == 1
+    assert os.listdir(tmp_path / "data") == ["ev_rankings_forecast.json"]
+    
+    forecaster.run()
+    assert "History unchanged" in capsys.readouterr().out
@@ -0,0 +1,105 @@
+"""Tests for the scenario runner"""
+import json
+import os
+import shutil
+
+import pytest
+
+from scripts import scenario_runner
+from scripts.calculate_rankings_delta import RankingsDeltaCalculator
+from scripts.scenario_runner import ScenarioRunner
+
+
+REPO_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def _setup(tmp_path):
+    """Data and history directories built from the repository's current rankings"""
+    data_dir = tmp_path / "data"
+    history_dir = tmp_path / "history"
+    shutil.copytree(os.path.join(REPO_DATA, "reference"), data_dir / "reference")
+    history_dir.mkdir()
+    
+    with open(os.path.join(REPO_DATA, "ev_rankings_latest.json"), encoding="utf-8") as f:
+        current = json.load(f)
+    with open(data_dir / "ev_rankings_latest.json", "w", encoding="utf-8") as f:
+        json.dump(current, f)
+    
+    previous = dict(current, period="Q1 2001")
+    previous["bev_rankings"] = [dict(row, sales_units=row["sales_units"] // 2, regions={})
+                                for row in current["bev_rankings"]]
+    for stamp, snapshot in (("20010101", previous), ("20010401", current)):
+        with open(history_dir / f"ev_rankings_{stamp}_000000.json", "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+    
+    with open(data_dir / "reference" / "scenarios.json", "w", encoding="utf-8") as f:
+        json.dump({"scenarios": [
+            {"name": "baseline"},
+            {"name": "bev_only", "vehicle_types": ["BEV"], "thresholds": {"sales_change": 1}}
+        ]}, f)
+    return data_dir, history_dir
+
+
+def test_scenarios_use_the_given_directories(tmp_path):
+    data_dir, history_dir = _setup(tmp_path)
+    runner = ScenarioRunner(data_dir=str(data_dir), history_dir=str(history_dir), max_workers=2)
+    
+    outputs = runner.run()
+    
+    assert sorted(outputs) == ["baseline", "bev_only"]
+    for name, path in outputs.items():
+        assert path == str(data_dir / "scenarios" / f"{name}.json")
+        with open(path, encoding="utf-8") as f:
+            result = json.load(f)
+        # The previous snapshot comes from the given history, not the repository's
+        assert result["delta"]["previous_period"] == "Q1 2001"
+    
+    with open(outputs["bev_only"], encoding="utf-8") as f:
+        bev_only = json.load(f)
+    assert bev_only["rankings"]["phev_rankings"] == []
+    assert sorted(os.listdir(history_dir)) == ["ev_rankings_20010101_000000.json", "ev_rankings_20010401_000000.json"]
+
+
+def test_unknown_threshold_is_rejected(tmp_path):
+    data_dir, history_dir = _setup(tmp_path)
+    with open(data_dir / "reference" / "scenarios.json", "w", encoding="utf-8") as f:
+        json.dump({"scenarios": [{"name": "bad", "thresholds": {"speed": 1}}]}, f)
+    
+    runner = ScenarioRunner(data_dir=str(data_dir), history_dir=str(history_dir), max_workers=1)
+    with pytest.raises(ValueError, match="Unknown threshold 'speed'"):
+        runner.run()
+
+
+def test_missing_current_rankings_fail_before_starting_workers(tmp_path):
+    data_dir, history_dir = _setup(tmp_path)
+    os.remove(data_dir / "ev_rankings_latest.json")
+    
+    runner = ScenarioRunner(data_dir=str(data_dir), history_dir=str(history_dir))
+    with pytest.raises(FileNotFoundError):
+        runner.run()
+
+
+def test_workers_reuse_the_given_snapshots_and_components(tmp_path, monkeypatch):
+    data_dir, history_dir = _setup(tmp_path)
+    loader = RankingsDeltaCalculator(data_dir=str(data_dir), history_dir=str(history_dir))
+    current, previous = loader.load_current_rankings(), loader.load_previous_rankings()
+    
+    built = []
+    original_init = scenario_runner.EVRankingsGenerator.__init__
+    monkeypatch.setattr(scenario_runner.EVRankingsGenerator, "__init__",
+                        lambda self, *args, **kwargs: built.append(1) or original_init(self, *args, **kwargs))
+    # Workers never read snapshots themselves
+    monkeypatch.setattr(RankingsDeltaCalculator, "load_current_rankings", lambda self: pytest.fail("reloaded"))
+    
+    scenario_runner._init_worker(str(data_dir), str(history_dir), current, previous)
+    strict = scenario_runner.evaluate_scenario({"name": "strict", "thresholds": {"sales_change": 10 ** 9, "growth_percent": 10 ** 6},
+                                                "region_groups": {"West": ["Europe", "USA"]}})
+    baseline = scenario_runner.evaluate_scenario({"name": "baseline"})
+    
+    assert built == [1]
+    # Overrides and region groups from one scenario do not leak into the next
+    calculator = scenario_runner._shared["calculator"]
+    assert calculator.SIGNIFICANT_SALES_CHANGE == RankingsDeltaCalculator.SIGNIFICANT_SALES_CHANGE
+    assert strict["delta"]["summary"]["significant_changes"] < baseline["delta"]["summary"]["significant_changes"]
+    assert "West" in strict["rankings"]["regional_breakdown"]
+    assert "West" not in baseline["rankings"]["regional_breakdown"]
@@ -0,0 +1,109 @@
+"""Tests for rankings snapshot validation"""
+import json
+import os
+import shutil
+
+import pytest
+
+from scripts.calculate_rankings_delta import RankingsDeltaCalculator
+from scripts.create_corrected_rankings import EVRankingsGenerator
+from scripts.history_compaction import HistoryCompactor
+from scripts.history_store import HistoryStore, load_index
+from scripts.snapshot_validation import SnapshotValidationError, SnapshotValidator, validate_snapshot
+
+
+REPO_REFERENCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "reference")
+
+
+def _snapshot(units=100, rank=1):
+    return {"period": "Q3 2026", "phev_rankings": [],
+            "bev_rankings": [{"rank": rank, "manufacturer": "BYD", "model": "Seal", "sales_units": units,
+                              "regions": {"China": units}}]}
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_violations_are_collected_in_one_pass():
+    snapshot = _snapshot(units=-5, rank=2)
+    snapshot["bev_rankings"][0]["regions"] = {"China": 0}
+    checks = sorted(v["check"] for v in validate_snapshot(snapshot))
+    assert checks == ["non_negative", "rank_contiguous", "regional_sum"]
+    assert validate_snapshot(_snapshot()) == []
+
+
+def test_invalid_history_is_quarantined_and_does_not_fail(tmp_path, capsys):
+    data_dir, history_dir = tmp_path / "data", tmp_path / "history"
+    _write(str(data_dir / "ev_rankings_latest.json"), _snapshot())
+    _write(str(history_dir / "ev_rankings_20260701_000000.json"), _snapshot(units=-1))
+    _write(str(history_dir / "ev_rankings_20260901_000000.json"), _snapshot())
+    
+    report_path = SnapshotValidator(data_dir=str(data_dir), history_dir=str(history_dir)).run()
+    
+    assert sorted(os.listdir(history_dir)) == ["ev_rankings_20260901_000000.json", "quarantine"]
+    assert os.listdir(history_dir / "quarantine") == ["ev_rankings_20260701_000000.json"]
+    with open(report_path, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["files_invalid"] == 1
+    assert report["quarantined"] == {
+        os.path.join("history", "ev_rankings_20260701_000000.json"):
+            os.path.join("history", "quarantine", "ev_rankings_20260701_000000.json")
+    }
+    assert "Warning: Quarantined history snapshot ev_rankings_20260701_000000.json" in capsys.readouterr().out
+    
+    # The next run no longer sees the quarantined snapshot
+    SnapshotValidator(data_dir=str(data_dir), history_dir=str(history_dir)).run()
+
+
+def test_invalid_current_snapshot_fails(tmp_path):
+    data_dir, history_dir = tmp_path / "data", tmp_path / "history"
+    _write(str(data_dir / "ev_rankings_latest.json"), _snapshot(rank=3))
+    _write(str(history_dir / "ev_rankings_20260901_000000.json"), _snapshot())
+    
+    with pytest.raises(SnapshotValidationError):
+        SnapshotValidator(data_dir=str(data_dir), history_dir=str(history_dir)).run()
+    # The current snapshot is reported, not moved
+    assert os.path.exists(data_dir / "ev_rankings_latest.json")
+    assert not os.path.exists(history_dir / "quarantine")
+
+
+def test_delta_skips_an_invalid_previous_snapshot(tmp_path):
+    data_dir, history_dir = tmp_path / "data", tmp_path / "history"
+    shutil.copytree(REPO_REFERENCE, data_dir / "reference")
+    _write(str(history_dir / "ev_rankings_20260601_000000.json"), _snapshot(units=80))
+    _write(str(history_dir / "ev_rankings_20260701_000000.json"), _snapshot(units=-1))
+    _write(str(history_dir / "ev_rankings_20260901_000000.json"), _snapshot())
+    calculator = RankingsDeltaCalculator(data_dir=str(data_dir), history_dir=str(history_dir),
+                                         archive_dir=str(tmp_path / "archive"))
+    
+    previous = calculator.load_previous_rankings()
+    
+    assert previous["bev_rankings"][0]["sales_units"] == 80
+
+
+def test_generator_validates_before_writing_history(tmp_path):
+    history_dir = tmp_path / "history"
+    generator = EVRankingsGenerator(output_dir=str(tmp_path / "data"), history_dir=str(history_dir))
+    
+    with pytest.raises(SnapshotValidationError):
+        generator.save_rankings(_snapshot(units=-1))
+    assert not os.path.exists(history_dir) or os.listdir(history_dir) == []
+
+
+def test_quarantine_removes_the_snapshot_from_the_history_index(tmp_path):
+    data_dir, history_dir = tmp_path / "data", tmp_path / "history"
+    _write(str(data_dir / "ev_rankings_latest.json"), _snapshot())
+    _write(str(history_dir / "ev_rankings_20260701_000000.json"), _snapshot(units=-1))
+    _write(str(history_dir / "ev_rankings_20260901_000000.json"), _snapshot())
+    HistoryCompactor(history_dir=str(history_dir)).compact()
+    assert len(load_index(str(history_dir))["snapshots"]) == 2
+    
+    SnapshotValidator(data_dir=str(data_dir), history_dir=str(history_dir)).run()
+    
+    assert [entry["filename"] for entry in load_index(str(history_dir))["snapshots"]] == [
+        "ev_rankings_20260901_000000.json"
+    ]
+    assert len(HistoryStore(str(history_dir)).load_all()) == 1
@@ -0,0 +1,77 @@
+"""Tests for the alert threshold backtest"""
+import json
+
+import pytest
+
+from scripts import threshold_backtest
+from scripts.threshold_backtest import ThresholdBacktester, build_columns, evaluate_thresholds
+
+
+def _snapshot(period, seal, dolphin=None):
+    rows = [{"rank": 1, "manufacturer": "BYD", "model": "Seal", "sales_units": seal, "yoy_growth_percent": 0}]
+    if dolphin is not None:
+        rows.append({"rank": 2, "manufacturer": "BYD", "model": "Dolphin", "sales_units": dolphin,
+                     "yoy_growth_percent": 0})
+    total = seal + (dolphin or 0)
+    return {"period": period, "bev_rankings": rows, "phev_rankings": [],
+            "manufacturer_totals": {"BYD": {"bev": total, "phev": 0, "total": total}}}
+
+
+HISTORY = [_snapshot("Q2 2026", 100000), _snapshot("Q3 2026", 112000, 5000), _snapshot("Q4 2026", 170000, 5500)]
+
+
+def test_columns_and_counts_follow_the_delta_rules(monkeypatch):
+    columns = build_columns(HISTORY)
+    assert columns["pairs"] == ["Q2 2026 → Q3 2026", "Q3 2026 → Q4 2026"]
+    assert columns["model_sales"] == [12000, None, 58000, 500]
+    
+    monkeypatch.setattr(threshold_backtest, "_shared", dict(columns))
+    result = evaluate_thresholds({"sales_change": 10000, "rank_change": 1, "growth_percent": 50.0})
+    
+    assert result["alerts_by_type"]["new_entry"] == 1
+    assert result["alerts_by_type"]["sales_change"] == 2
+    assert result["alerts_by_severity"]["high"] == 1 + result["alerts_by_type"]["manufacturer_change"]
+    assert result["alerts_per_pair"][0] >= 2
+
+
+def test_unknown_threshold_in_grid_is_rejected():
+    with pytest.raises(ValueError):
+        ThresholdBacktester().build_grid({"speed": [1]})
+
+
+def test_run_reads_the_given_directories(tmp_path):
+    history_dir = tmp_path / "history"
+    history_dir.mkdir()
+    for index, snapshot in enumerate(HISTORY):
+        (history_dir / f"ev_rankings_2026010{index + 1}_000000.json").write_text(json.dumps(snapshot), encoding="utf-8")
+    
+    backtester = ThresholdBacktester(data_dir=str(tmp_path / "data"), history_dir=str(history_dir), max_workers=1)
+    output_path = backtester.run({"sales_change": [10000], "rank_change": [1], "growth_percent": [50.0]})
+    
+    assert output_path == str(tmp_path / "data" / "threshold_backtest.json")
+    with open(output_path, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["snapshots"] == 3
+    assert len(report["results"]) == 2
+    assert sum(result["is_current"] for result in report["results"]) == 1
+    assert report["alert_scope"] == "threshold_rules"
+    assert all("threshold_alerts" in result for result in report["results"])
+
+
+def test_pairs_are_consecutive_quarters():
+    rerun = _snapshot("Q3 2026", 90000, 4000)
+    gap = _snapshot("Q2 2027", 180000, 6000)
+    columns = build_columns([HISTORY[0], rerun, HISTORY[1], HISTORY[2], gap])
+    
+    # The earlier Q3 rerun is replaced by the quarter's latest snapshot; Q1 2027 is missing
+    assert columns["pairs"] == ["Q2 2026 → Q3 2026", "Q3 2026 → Q4 2026"]
+    assert columns["model_sales"] == [12000, None, 58000, 500]
+
+
+def test_invalid_snapshots_are_skipped(capsys):
+    broken = _snapshot("Q3 2026", -5)
+    columns = build_columns([HISTORY[0], HISTORY[1], broken, HISTORY[2]])
+    
+    assert columns["invalid_snapshots"] == 1
+    assert columns["pairs"] == ["Q2 2026 → Q3 2026", "Q3 2026 → Q4 2026"]
+    assert "Skipping invalid snapshot for Q3 2026" in capsys.readouterr().out